@@ -0,0 +1,85 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+"""Run the engine benchmark suite and compare its results with a baseline.
+
+Run from the top-level directory with:
+
+    python3 -m benchmarks run --output baseline.json
+    python3 -m benchmarks compare baseline.json
+"""
+import argparse
+import sys
+
+from .engine import SUITE
+from .harness import compare_results, load_results, run_suite, save_results
+
+
+def run(args) -> None:
+    """Run the benchmark suite and optionally save the results."""
+    results = run_suite(SUITE, args.repeat, args.scale, args.filter)
+    if args.output:
+        save_results(args.output, results)
+
+
+def compare(args) -> None:
+    """Compare results with a baseline and exit with a non-zero status if any benchmark regressed."""
+    baseline = load_results(args.baseline)
+    if args.current:
+        current = load_results(args.current)
+    else:
+        current = {r.name: r.best for r in run_suite(SUITE, args.repeat, args.scale, args.filter)}
+        baseline = {k: v for k, v in baseline.items() if k in current}
+        print()
+    regressions = compare_results(baseline, current, args.threshold)
+    if regressions:
+        print("%d benchmark(s) slower than the baseline by more than %.0f%%" % (regressions, args.threshold * 100.0))
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the core of the Ready Trader Go engine.")
+    subparsers = parser.add_subparsers(title="command", dest="command")
+    subparsers.required = True
+
+    def add_run_arguments(subparser) -> None:
+        subparser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+        subparser.add_argument("--repeat", default=5, type=int, help="times to run each benchmark (default: 5)")
+        subparser.add_argument("--scale", default=1.0, type=float,
+                               help="multiply the operation count of each benchmark by this (default: 1.0)")
+
+    run_parser = subparsers.add_parser("run", description="Run the benchmark suite.", help="run the benchmarks")
+    add_run_arguments(run_parser)
+    run_parser.add_argument("--output", help="save the results to this JSON file")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser("compare", help="compare results with a baseline",
+                                           description="Compare results with a baseline. If no current results "
+                                                       "file is given, the benchmark suite is run first.")
+    add_run_arguments(compare_parser)
+    compare_parser.add_argument("baseline", help="baseline results file")
+    compare_parser.add_argument("current", nargs="?", help="current results file")
+    compare_parser.add_argument("--threshold", default=0.1, type=float,
+                                help="fractional slowdown counted as a regression (default: 0.1)")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+"""Benchmarks of the core engine.
+
+Every fixture is built from a fixed random seed, so each run measures
+exactly the same operations.
+"""
+import asyncio
+import functools
+import random
+import time
+
+from typing import List, Tuple
+
+from ready_trader_go.account import CompetitorAccount
+from ready_trader_go.limiter import FREQUENCY_LIMITERS
+from ready_trader_go.messages import HEADER, INSERT_MESSAGE, INSERT_MESSAGE_SIZE, ORDER_BOOK_HEADER, \
+    ORDER_BOOK_HEADER_SIZE, ORDER_BOOK_MESSAGE, ORDER_BOOK_MESSAGE_SIZE, Connection, MessageType
+from ready_trader_go.order_book import TOP_LEVEL_COUNT, Order, OrderBook
+from ready_trader_go.pubsub import BUFFER_SIZE, Publisher
+from ready_trader_go.types import Instrument, Lifespan, Side
+
+from .harness import BenchmarkFunction
+from .limiter import measure as measure_limiter
+
+SEED = 42
+TICK_SIZE = 100
+MID_PRICE = 10000 * TICK_SIZE
+
+
+def make_book() -> OrderBook:
+    """Return an empty ETF order book with the usual fees."""
+    return OrderBook(Instrument.ETF, -0.0001, 0.0002)
+
+
+def make_passive_orders(count: int, depth: int, first_id: int = 1) -> List[Order]:
+    """Return orders on both sides of the book spread over depth price levels."""
+    rng = random.Random(SEED)
+    orders: List[Order] = list()
+    for i in range(count):
+        side = Side.BUY if rng.random() < 0.5 else Side.SELL
+        offset = rng.randrange(depth) + 1
+        price = MID_PRICE - offset * TICK_SIZE if side == Side.BUY else MID_PRICE + offset * TICK_SIZE
+        orders.append(Order(first_id + i, Instrument.ETF, Lifespan.GOOD_FOR_DAY, side, price, rng.randint(1, 50)))
+    return orders
+
+
+def order_book_insert(depth: int, count: int) -> float:
+    """Insert passive orders into a book depth levels deep."""
+    book = make_book()
+    book_insert = book.insert
+    orders = make_passive_orders(count, depth)
+    start = time.perf_counter_ns()
+    for order in orders:
+        book_insert(0.0, order)
+    return (time.perf_counter_ns() - start) / count
+
+
+def order_book_cancel(depth: int, count: int) -> float:
+    """Cancel resting orders, in random order, from a book depth levels deep."""
+    book = make_book()
+    orders = make_passive_orders(count, depth)
+    for order in orders:
+        book.insert(0.0, order)
+    random.Random(SEED).shuffle(orders)
+    book_cancel = book.cancel
+    start = time.perf_counter_ns()
+    for order in orders:
+        book_cancel(0.0, order)
+    return (time.perf_counter_ns() - start) / count
+
+
+def order_book_amend(depth: int, count: int) -> float:
+    """Reduce the volume of resting orders in a book depth levels deep."""
+    book = make_book()
+    orders = [o for o in make_passive_orders(count, depth) if o.volume > 1]
+    for order in orders:
+        book.insert(0.0, order)
+    book_amend = book.amend
+    start = time.perf_counter_ns()
+    for order in orders:
+        book_amend(0.0, order, order.volume - 1)
+    return (time.perf_counter_ns() - start) / len(orders)
+
+
+def order_book_sweep(depth: int, count: int) -> float:
+    """Trade an aggressive order through every level of a book depth levels deep."""
+    book = make_book()
+    elapsed = 0
+    order_id = 1
+    for _ in range(count):
+        for level in range(depth):
+            book.insert(0.0, Order(order_id, Instrument.ETF, Lifespan.GOOD_FOR_DAY, Side.SELL,
+                                   MID_PRICE + level * TICK_SIZE, 10))
+            order_id += 1
+        aggressor = Order(order_id, Instrument.ETF, Lifespan.FILL_AND_KILL, Side.BUY,
+                          MID_PRICE + depth * TICK_SIZE, 10 * depth)
+        order_id += 1
+        start = time.perf_counter_ns()
+        book.insert(0.0, aggressor)
+        elapsed += time.perf_counter_ns() - start
+    return elapsed / count
+
+
+def order_book_top_levels(count: int) -> float:
+    """Take a snapshot of the top levels of a book."""
+    book = make_book()
+    for order in make_passive_orders(1000, 20):
+        book.insert(0.0, order)
+    lists = [[0] * TOP_LEVEL_COUNT for _ in range(4)]
+    top_levels = book.top_levels
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        top_levels(*lists)
+    return (time.perf_counter_ns() - start) / count
+
+
+def order_book_trade_ticks(count: int) -> float:
+    """Take a snapshot of the trade ticks of a book after a few trades."""
+    book = make_book()
+    lists = [[0] * TOP_LEVEL_COUNT for _ in range(4)]
+    elapsed = 0
+    order_id = 1
+    for _ in range(count):
+        for level in range(3):
+            for side in (Side.BUY, Side.SELL):
+                price = MID_PRICE + level * TICK_SIZE * (1 if side == Side.SELL else -1)
+                book.insert(0.0, Order(order_id, Instrument.ETF, Lifespan.GOOD_FOR_DAY, side, price, 5))
+                book.insert(0.0, Order(order_id + 1, Instrument.ETF, Lifespan.FILL_AND_KILL, Side(1 - side), price, 5))
+                order_id += 2
+        start = time.perf_counter_ns()
+        book.trade_ticks(*lists)
+        elapsed += time.perf_counter_ns() - start
+    return elapsed / count
+
+
+def messages_encode(count: int) -> float:
+    """Encode an insert order message into a reusable buffer."""
+    message = bytearray(INSERT_MESSAGE_SIZE)
+    header_pack_into = HEADER.pack_into
+    insert_pack_into = INSERT_MESSAGE.pack_into
+    start = time.perf_counter_ns()
+    for i in range(count):
+        header_pack_into(message, 0, INSERT_MESSAGE_SIZE, MessageType.INSERT_ORDER)
+        insert_pack_into(message, HEADER.size, i, Side.BUY, MID_PRICE, 10, Lifespan.GOOD_FOR_DAY)
+    return (time.perf_counter_ns() - start) / count
+
+
+def messages_decode(count: int) -> float:
+    """Decode an order book update message."""
+    message = bytearray(ORDER_BOOK_MESSAGE_SIZE)
+    ORDER_BOOK_MESSAGE.pack_into(message, ORDER_BOOK_HEADER_SIZE, *range(4 * TOP_LEVEL_COUNT))
+    header_unpack_from = ORDER_BOOK_HEADER.unpack_from
+    book_unpack_from = ORDER_BOOK_MESSAGE.unpack_from
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        header_unpack_from(message, HEADER.size)
+        book_unpack_from(message, ORDER_BOOK_HEADER_SIZE)
+    return (time.perf_counter_ns() - start) / count
+
+
+class CountingConnection(Connection):
+    """A connection that counts the messages it receives."""
+
+    def __init__(self):
+        """Initialise a new instance of the CountingConnection class."""
+        super().__init__()
+        self.count: int = 0
+
+    def on_message(self, typ: int, data: bytes, start: int, length: int) -> None:
+        """Count a message."""
+        self.count += 1
+
+
+def connection_framing(chunk_size: int, count: int) -> float:
+    """Pass a stream of insert messages to Connection.data_received in fragments of up to chunk_size bytes."""
+    message = bytearray(INSERT_MESSAGE_SIZE)
+    HEADER.pack_into(message, 0, INSERT_MESSAGE_SIZE, MessageType.INSERT_ORDER)
+    # One extra message ensures the last real message is complete when it is framed
+    stream = bytes(message) * (count + 1)
+    rng = random.Random(SEED)
+    chunks: List[bytes] = list()
+    position = 0
+    while position < len(stream):
+        size = rng.randint(1, chunk_size)
+        chunks.append(stream[position:position + size])
+        position += size
+
+    connection = CountingConnection()
+    data_received = connection.data_received
+    start = time.perf_counter_ns()
+    for chunk in chunks:
+        data_received(chunk)
+    return (time.perf_counter_ns() - start) / connection.count
+
+
+class NullProtocol(asyncio.DatagramProtocol):
+    """A protocol that ignores everything."""
+
+
+def pubsub_write(count: int) -> float:
+    """Write order book update messages to a shared memory ring."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        publisher = Publisher(memoryview(bytearray(BUFFER_SIZE)), NullProtocol())
+        message = bytearray(ORDER_BOOK_MESSAGE_SIZE)
+        HEADER.pack_into(message, 0, ORDER_BOOK_MESSAGE_SIZE, MessageType.ORDER_BOOK_UPDATE)
+        write = publisher.write
+        start = time.perf_counter_ns()
+        for _ in range(count):
+            write(message)
+        return (time.perf_counter_ns() - start) / count
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def account_update(count: int) -> float:
+    """Revalue a competitor account with changing prices."""
+    account = CompetitorAccount(1.0, 0.002)
+    account.transact(Instrument.ETF, Side.BUY, MID_PRICE, 10, 20)
+    account.transact(Instrument.FUTURE, Side.SELL, MID_PRICE, 10, 0)
+    rng = random.Random(SEED)
+    prices: List[Tuple[int, int]] = [(MID_PRICE + rng.randint(-50, 50) * TICK_SIZE,
+                                      MID_PRICE + rng.randint(-50, 50) * TICK_SIZE) for _ in range(count)]
+    update = account.update
+    start = time.perf_counter_ns()
+    for future_price, etf_price in prices:
+        update(future_price, etf_price)
+    return (time.perf_counter_ns() - start) / count
+
+
+# Each entry is the benchmark's name, the function and the default operation count
+SUITE: List[Tuple[str, BenchmarkFunction, int]] = [
+    *(("order_book.insert[depth=%d]" % d, functools.partial(order_book_insert, d), 50_000) for d in (1, 10, 100)),
+    *(("order_book.cancel[depth=%d]" % d, functools.partial(order_book_cancel, d), 50_000) for d in (1, 10, 100)),
+    *(("order_book.amend[depth=%d]" % d, functools.partial(order_book_amend, d), 50_000) for d in (1, 10, 100)),
+    *(("order_book.sweep[depth=%d]" % d, functools.partial(order_book_sweep, d), 2_000) for d in (1, 10, 50)),
+    ("order_book.top_levels", order_book_top_levels, 200_000),
+    ("order_book.trade_ticks", order_book_trade_ticks, 5_000),
+    ("messages.encode_insert", messages_encode, 200_000),
+    ("messages.decode_order_book", messages_decode, 200_000),
+    *(("connection.framing[chunk=%d]" % c, functools.partial(connection_framing, c), 50_000) for c in (8, 64, 1024)),
+    ("pubsub.write", pubsub_write, 200_000),
+    *(("limiter.check_event[%s]" % t, functools.partial(measure_limiter, t, 1000.0), 200_000)
+      for t in sorted(FREQUENCY_LIMITERS)),
+    ("account.update", account_update, 200_000),
+]
@@ -0,0 +1,128 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+"""Run benchmarks, save their results as JSON and compare two sets of results."""
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# A benchmark is called with an operation count and returns the average
+# time in nanoseconds taken by one operation
+BenchmarkFunction = Callable[[int], float]
+
+RESULTS_VERSION = 1
+
+
+class BenchmarkResult(object):
+    """The timings of repeated runs of one benchmark."""
+
+    def __init__(self, name: str, count: int, timings: List[float]):
+        """Initialise a new instance of the BenchmarkResult class."""
+        self.count: int = count
+        self.name: str = name
+        self.timings: List[float] = timings
+
+    @property
+    def best(self) -> float:
+        """Return the fastest time per operation, which is the least disturbed by other activity."""
+        return min(self.timings)
+
+    @property
+    def median(self) -> float:
+        """Return the median time per operation."""
+        return statistics.median(self.timings)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return this result as a dictionary suitable for JSON."""
+        return {"Name": self.name, "Count": self.count, "Best": self.best, "Median": self.median,
+                "Timings": self.timings}
+
+
+def run_benchmark(name: str, function: BenchmarkFunction, count: int, repeat: int) -> BenchmarkResult:
+    """Run a benchmark a number of times with the garbage collector disabled."""
+    timings: List[float] = list()
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            timings.append(function(count))
+        finally:
+            gc.enable()
+    return BenchmarkResult(name, count, timings)
+
+
+def run_suite(suite: List[Tuple[str, BenchmarkFunction, int]], repeat: int, scale: float = 1.0,
+              name_filter: Optional[str] = None) -> List[BenchmarkResult]:
+    """Run every benchmark in a suite whose name contains the filter, printing the results."""
+    results: List[BenchmarkResult] = list()
+    for name, function, count in suite:
+        if name_filter is None or name_filter in name:
+            result = run_benchmark(name, function, max(1, int(count * scale)), repeat)
+            print("%-40s %12.1f ns %12.1f ns" % (name, result.best, result.median))
+            sys.stdout.flush()
+            results.append(result)
+    return results
+
+
+def save_results(filename: str, results: List[BenchmarkResult]) -> None:
+    """Save results, along with a description of the environment, to a JSON file."""
+    with open(filename, "w") as results_file:
+        json.dump({"Version": RESULTS_VERSION,
+                   "Time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                   "Python": platform.python_version(),
+                   "Implementation": platform.python_implementation(),
+                   "Machine": platform.machine(),
+                   "Platform": platform.platform(),
+                   "Results": [r.to_dict() for r in results]}, results_file, indent=2)
+
+
+def load_results(filename: str) -> Dict[str, float]:
+    """Return the best time of each benchmark in a results file."""
+    with open(filename) as results_file:
+        data = json.load(results_file)
+    if data.get("Version") != RESULTS_VERSION:
+        raise ValueError("%s is not a benchmark results file" % filename)
+    return {r["Name"]: r["Best"] for r in data["Results"]}
+
+
+def compare_results(baseline: Dict[str, float], current: Dict[str, float], threshold: float) -> int:
+    """Print a comparison of two sets of results and return the number of regressions.
+
+    A benchmark has regressed if it is slower than the baseline by more than
+    the threshold, which is a fraction of the baseline time.
+    """
+    regressions: int = 0
+    print("%-40s %12s %12s %8s" % ("Benchmark", "Baseline", "Current", "Change"))
+    for name in sorted(set(baseline) | set(current)):
+        if name not in baseline or name not in current:
+            print("%-40s %12s %12s" % (name, "%.1f" % baseline[name] if name in baseline else "-",
+                                       "%.1f" % current[name] if name in current else "-"))
+            continue
+        change: float = current[name] / baseline[name] - 1.0
+        verdict: str = ""
+        if change > threshold:
+            verdict = "  slower"
+            regressions += 1
+        elif change < -threshold:
+            verdict = "  faster"
+        print("%-40s %12.1f %12.1f %+7.1f%%%s" % (name, baseline[name], current[name], change * 100.0, verdict))
+    return regressions
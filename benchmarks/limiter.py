@@ -0,0 +1,64 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+"""Measure the cost of checking an event with each message frequency limiter.
+
+Run from the top-level directory with:
+
+    python3 -m benchmarks.limiter
+"""
+import argparse
+import time
+
+from typing import List
+
+from ready_trader_go.limiter import FREQUENCY_LIMITERS
+
+INTERVAL = 1.0
+LIMIT = 50
+
+
+def measure(limiter_type: str, rate: float, count: int) -> float:
+    """Return the average time in nanoseconds taken to check one event."""
+    limiter = FREQUENCY_LIMITERS[limiter_type](INTERVAL, LIMIT)
+    # Use a limit that is never breached so that every limiter does all its work
+    limiter.limit = count
+    step: float = 1.0 / rate
+    times: List[float] = [i * step for i in range(count)]
+
+    check_event = limiter.check_event
+    start: int = time.perf_counter_ns()
+    for now in times:
+        check_event(now)
+    return (time.perf_counter_ns() - start) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the message frequency limiters.")
+    parser.add_argument("--count", default=1_000_000, type=int, help="number of events to check (default: 1000000)")
+    parser.add_argument("--rates", default="50,1000,100000", help="comma separated event rates per second")
+    args = parser.parse_args()
+
+    rates = [float(r) for r in args.rates.split(",")]
+    print("%-10s" % "Limiter" + "".join("%16s" % ("%g/s" % r) for r in rates))
+    for limiter_type in sorted(FREQUENCY_LIMITERS):
+        costs = [measure(limiter_type, rate, args.count) for rate in rates]
+        print("%-10s" % limiter_type + "".join("%13.1f ns" % c for c in costs))
+
+
+if __name__ == "__main__":
+    main()
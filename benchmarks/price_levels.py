@@ -0,0 +1,99 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+"""Compare the cost of tracking a competitor's best bid with a sorted list,
+a SortedPriceList and a PriceLevelCounter.
+
+Run from the top-level directory with:
+
+    python3 -m benchmarks.price_levels
+"""
+import argparse
+import bisect
+import random
+import time
+
+from typing import List, Tuple, Type, Union
+
+from ready_trader_go.price_levels import PriceLevelCounter, SortedPriceList
+from ready_trader_go.types import Side
+
+TICK_SIZE = 100
+
+
+def make_operations(order_count: int, step_count: int) -> Tuple[List[int], List[Tuple[int, int]]]:
+    """Return the initial prices and a sequence of (removed, added) prices.
+
+    Orders are removed best first half of the time, as happens when they are
+    filled, and at random otherwise, as happens when they are cancelled.
+    """
+    rng = random.Random(42)
+    prices: List[int] = sorted(rng.randrange(9000, 11000) * TICK_SIZE for _ in range(order_count))
+    initial: List[int] = list(prices)
+    operations: List[Tuple[int, int]] = list()
+    for _ in range(step_count):
+        removed: int = prices.pop() if rng.random() < 0.5 else prices.pop(rng.randrange(len(prices)))
+        added: int = rng.randrange(9000, 11000) * TICK_SIZE
+        bisect.insort(prices, added)
+        operations.append((removed, added))
+    return initial, operations
+
+
+def measure_sorted_list(initial: List[int], operations: List[Tuple[int, int]]) -> float:
+    """Return the average time in nanoseconds per step using a sorted list."""
+    prices: List[int] = list(initial)
+    best: int = 0
+    start: int = time.perf_counter_ns()
+    for removed, added in operations:
+        prices.pop(bisect.bisect(prices, removed) - 1)
+        bisect.insort(prices, added)
+        best = prices[-1]
+    return (time.perf_counter_ns() - start) / len(operations) if best else 0.0
+
+
+def measure_levels(levels_type: Type[Union[SortedPriceList, PriceLevelCounter]], initial: List[int],
+                   operations: List[Tuple[int, int]]) -> float:
+    """Return the average time in nanoseconds per step using the given price tracker."""
+    levels = levels_type(Side.BUY)
+    for price in initial:
+        levels.add(price)
+    best: int = 0
+    start: int = time.perf_counter_ns()
+    for removed, added in operations:
+        levels.remove(removed)
+        levels.add(added)
+        best = levels.best
+    return (time.perf_counter_ns() - start) / len(operations) if best else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the tracking of a competitor's price levels.")
+    parser.add_argument("--steps", default=200_000, type=int, help="number of remove and add steps (default: 200000)")
+    parser.add_argument("--order-counts", default="10,100,1000,10000",
+                        help="comma separated active order counts to test")
+    args = parser.parse_args()
+
+    print("%12s%16s%16s%16s" % ("Orders", "SortedList", "SortedPriceList", "Counter"))
+    for order_count in (int(c) for c in args.order_counts.split(",")):
+        initial, operations = make_operations(order_count, args.steps)
+        print("%12d%13.1f ns%13.1f ns%13.1f ns" % (order_count, measure_sorted_list(initial, operations),
+                                                   measure_levels(SortedPriceList, initial, operations),
+                                                   measure_levels(PriceLevelCounter, initial, operations)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+"""Measure the tick-to-trade latency of the exchange and an auto-trader.
+
+Run from the top-level directory with:
+
+    python3 -m benchmarks.tick_to_trade
+
+For each configuration (event loop, information wait strategy and speed) an
+exchange and a probe auto-trader are started in separate processes. The
+probe answers every ETF order book update with an insert order that cannot
+trade, so that the exchange immediately replies with an order status. Both
+processes take timestamps with the system-wide monotonic clock, which are
+joined by sequence number and client order id to measure each stage:
+
+    Publish   - from the exchange writing the update to the probe's callback
+    Insert    - from the probe's callback to the exchange accepting the order
+    Status    - from the exchange accepting the order to the probe receiving
+                the order status
+    TickToTrade and RoundTrip cover the first two and all three stages.
+"""
+import argparse
+import asyncio
+import importlib.util
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+
+from typing import Any, Dict, List, Optional
+
+import ready_trader_go.exchange as exchange
+
+from ready_trader_go.application import Application
+from ready_trader_go.base_auto_trader import BaseAutoTrader
+from ready_trader_go.controller import Controller
+from ready_trader_go.latency import LatencyHistogram
+from ready_trader_go.match_events import MatchEvent, MatchEventOperation
+from ready_trader_go.pubsub import SubscriberFactory
+from ready_trader_go.types import Instrument, Lifespan, Side
+
+PROBE_TEAM_NAME = "Probe"
+PROBE_SECRET = "probe"
+
+# One tick (in cents), far below any price in the synthetic market, so probe orders never trade
+PROBE_PRICE = 100
+
+STAGES = ("Publish", "Insert", "Status", "TickToTrade", "RoundTrip")
+STAGE_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+# Poll intervals of the information subscriber for each wait strategy
+WAIT_STRATEGIES = {"Spin": 0.0, "Sleep": 0.001}
+
+EVENT_LOOPS = ("asyncio", "uvloop")
+
+
+def install_event_loop(loop_type: str) -> None:
+    """Arrange for the named type of event loop to be used by this process."""
+    if loop_type == "uvloop":
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+class ExchangeRecorder(object):
+    """A recorder of the times at which the exchange publishes updates and accepts probe orders."""
+
+    def __init__(self, controller: Controller):
+        """Initialise a new instance of the ExchangeRecorder class."""
+        self.accepted: Dict[int, int] = dict()
+        self.published: Dict[int, int] = dict()
+
+        controller.information_publisher.order_book_published.append(self.on_order_book_published)
+        controller.market_events_reader.match_events.event_occurred.append(self.on_match_event)
+
+    def on_match_event(self, event: MatchEvent) -> None:
+        """Called when a match event occurs."""
+        if event.operation == MatchEventOperation.INSERT and event.competitor == PROBE_TEAM_NAME:
+            self.accepted[event.order_id] = time.monotonic_ns()
+
+    def on_order_book_published(self, publisher: Any, instrument: int, sequence_number: int) -> None:
+        """Called when an order book update has been written to the information channel."""
+        if instrument == Instrument.ETF:
+            self.published[sequence_number] = time.monotonic_ns()
+
+
+class ProbeAutoTrader(BaseAutoTrader):
+    """An auto-trader that answers every ETF order book update with an insert order."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, team_name: str, secret: str):
+        """Initialise a new instance of the ProbeAutoTrader class."""
+        super().__init__(loop, team_name, secret)
+        self.callbacks: Dict[int, int] = dict()
+        self.error_count: int = 0
+        self.order_ids = itertools.count(1)
+        self.orders: Dict[int, int] = dict()
+        self.statuses: Dict[int, int] = dict()
+
+    def on_error_message(self, client_order_id: int, error_message: bytes) -> None:
+        """Called when the matching engine detects an error."""
+        self.error_count += 1
+        self.logger.warning("error with order %d: %s", client_order_id, error_message.decode())
+
+    def on_order_book_update_message(self, instrument: int, sequence_number: int, ask_prices: List[int],
+                                     ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
+        """Called periodically to report the status of an order book."""
+        if instrument == Instrument.ETF:
+            self.callbacks[sequence_number] = time.monotonic_ns()
+            client_order_id = next(self.order_ids)
+            self.orders[client_order_id] = sequence_number
+            self.send_insert_order(client_order_id, Side.BUY, PROBE_PRICE, 1, Lifespan.FILL_AND_KILL)
+
+    def on_order_status_message(self, client_order_id: int, fill_volume: int, remaining_volume: int,
+                                fees: int) -> None:
+        """Called when the status of one of the probe's orders changes."""
+        if client_order_id not in self.statuses:
+            self.statuses[client_order_id] = time.monotonic_ns()
+
+
+def run_exchange(directory: str, loop_type: str, ready_event: Any) -> None:
+    """Run the exchange and save its timestamps (the target of the exchange process)."""
+    os.chdir(directory)
+    install_event_loop(loop_type)
+    # The configuration is written by the harness, so it is not validated here
+    app = Application("exchange")
+    controller = exchange.setup(app)
+    controller.exchange_ready.append(ready_event.set)
+    recorder = ExchangeRecorder(controller)
+    app.run()
+    controller.cleanup()
+
+    with open("exchange_timings.json", "w") as timings:
+        json.dump({"Published": recorder.published, "Accepted": recorder.accepted}, timings)
+
+
+async def start_probe(probe: ProbeAutoTrader, config: Dict[str, Any], poll_interval: float) -> None:
+    """Connect the probe to the exchange."""
+    loop = asyncio.get_running_loop()
+    await loop.create_connection(lambda: probe, config["Execution"]["Host"], config["Execution"]["Port"])
+    SubscriberFactory(config["Information"]["Type"], config["Information"]["Name"], poll_interval).create(probe)
+
+
+def run_probe(directory: str, loop_type: str, poll_interval: float) -> None:
+    """Run the probe auto-trader and save its timestamps (the target of the probe process)."""
+    os.chdir(directory)
+    install_event_loop(loop_type)
+    app = Application("probe")
+    probe = ProbeAutoTrader(app.event_loop, PROBE_TEAM_NAME, PROBE_SECRET)
+    app.event_loop.create_task(start_probe(probe, app.config, poll_interval))
+    app.run()
+
+    with open("probe_timings.json", "w") as timings:
+        json.dump({"Callbacks": probe.callbacks, "Orders": probe.orders, "Statuses": probe.statuses,
+                   "Errors": probe.error_count}, timings)
+
+
+def find_free_port() -> int:
+    """Return a TCP port on the local host that is not in use."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write_configuration(directory: str, speed: float, duration: float, tick_interval: float) -> None:
+    """Write the exchange and probe configuration files for a run lasting duration seconds of market time."""
+    execution = {"Host": "127.0.0.1", "Port": find_free_port()}
+    information = {"Type": "mmap", "Name": os.path.join(directory, "info.dat")}
+    config = {
+        "Engine": {"MarketDataSource": "Synthetic", "MarketEventInterval": 0.05, "MarketOpenDelay": 1.0,
+                   "MatchEventsFile": "match_events.csv", "ScoreBoardFile": "score_board.csv", "Speed": speed,
+                   "TickInterval": tick_interval},
+        "Execution": execution,
+        "Fees": {"Maker": -0.0001, "Taker": 0.0002},
+        "Information": information,
+        "Instrument": {"EtfClamp": 0.002, "TickSize": 1.0},
+        # The probe sends one message per tick, which must never breach the frequency limit
+        "Limits": {"ActiveOrderCountLimit": 10, "ActiveVolumeLimit": 200, "MessageFrequencyInterval": 1.0,
+                   "MessageFrequencyLimit": 1_000_000, "PositionLimit": 100},
+        "SyntheticMarket": {"Duration": duration},
+        "Traders": {PROBE_TEAM_NAME: PROBE_SECRET},
+    }
+    with open(os.path.join(directory, "exchange.json"), "w") as exchange_config:
+        json.dump(config, exchange_config, indent=2)
+    with open(os.path.join(directory, "probe.json"), "w") as probe_config:
+        json.dump({"Execution": execution, "Information": information, "TeamName": PROBE_TEAM_NAME,
+                   "Secret": PROBE_SECRET}, probe_config, indent=2)
+
+
+def wait_for_exchange(process: multiprocessing.Process, ready_event: Any, timeout: float) -> bool:
+    """Wait until the exchange is accepting auto-trader connections and return True if it is."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and process.is_alive():
+        if ready_event.wait(0.01):
+            return True
+    return False
+
+
+def load_timings(filename: str) -> Dict[str, Any]:
+    """Load timings saved by the exchange or probe, converting keys back to integers."""
+    with open(filename) as timings_file:
+        timings = json.load(timings_file)
+    return {k: {int(i): t for i, t in v.items()} if type(v) is dict else v for k, v in timings.items()}
+
+
+def measure(loop_type: str, wait_strategy: str, speed: float, duration: float,
+            tick_interval: float) -> Optional[Dict[str, Any]]:
+    """Run the exchange and probe with one configuration and return the latency of each stage."""
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="rtg-tick-to-trade-") as directory:
+        write_configuration(directory, speed, duration, tick_interval)
+        ready_event = context.Event()
+        exchange_process = context.Process(target=run_exchange, args=(directory, loop_type, ready_event),
+                                           name="exchange")
+        exchange_process.start()
+        if not wait_for_exchange(exchange_process, ready_event, 30.0):
+            print("the exchange failed to start; see %s" % os.path.join(directory, "exchange.log"))
+            exchange_process.terminate()
+            exchange_process.join()
+            return None
+
+        probe_process = context.Process(target=run_probe, args=(directory, loop_type, WAIT_STRATEGIES[wait_strategy]),
+                                        name="probe")
+        probe_process.start()
+        exchange_process.join(duration / speed + 60.0)
+        probe_process.join(10.0)
+        for process in (exchange_process, probe_process):
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+        try:
+            exchange_timings = load_timings(os.path.join(directory, "exchange_timings.json"))
+            probe_timings = load_timings(os.path.join(directory, "probe_timings.json"))
+        except OSError:
+            print("the exchange or probe did not finish cleanly")
+            return None
+
+    published = exchange_timings["Published"]
+    accepted = exchange_timings["Accepted"]
+    callbacks = probe_timings["Callbacks"]
+    statuses = probe_timings["Statuses"]
+
+    histograms = {s: LatencyHistogram(s) for s in STAGES}
+    for order_id, sequence_number in probe_timings["Orders"].items():
+        if sequence_number in published and order_id in accepted and order_id in statuses:
+            histograms["Publish"].record(callbacks[sequence_number] - published[sequence_number])
+            histograms["Insert"].record(accepted[order_id] - callbacks[sequence_number])
+            histograms["Status"].record(statuses[order_id] - accepted[order_id])
+            histograms["TickToTrade"].record(accepted[order_id] - published[sequence_number])
+            histograms["RoundTrip"].record(statuses[order_id] - published[sequence_number])
+
+    return {"Loop": loop_type, "WaitStrategy": wait_strategy, "Speed": speed,
+            "Published": len(published), "Missed": len(published) - len(callbacks), "Errors": probe_timings["Errors"],
+            "Stages": {name: dict({"Count": h.count, "Min": h.minimum, "Max": h.maximum},
+                                  **{"P%g" % p: h.percentile(p) for p in STAGE_PERCENTILES})
+                       for name, h in histograms.items()}}
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    """Print the latency of each stage in microseconds."""
+    print("\nloop=%s wait=%s speed=%g: %d updates published, %d missed by the probe, %d errors"
+          % (result["Loop"], result["WaitStrategy"], result["Speed"], result["Published"], result["Missed"],
+             result["Errors"]))
+    print("%-12s %8s" % ("Stage", "Count") + "".join("%10s" % ("p%g" % p) for p in STAGE_PERCENTILES)
+          + "%10s" % "max")
+    for name, stage in result["Stages"].items():
+        print("%-12s %8d" % (name, stage["Count"])
+              + "".join("%10.1f" % (stage["P%g" % p] / 1000.0) for p in STAGE_PERCENTILES)
+              + "%10.1f" % (stage["Max"] / 1000.0))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the tick-to-trade latency of the exchange and an "
+                                                 "auto-trader. Latencies are reported in microseconds.")
+    parser.add_argument("--duration", default=20.0, type=float,
+                        help="seconds of market time to run each configuration for (default: 20)")
+    parser.add_argument("--loops", default=",".join(EVENT_LOOPS),
+                        help="comma separated event loop types (default: %s)" % ",".join(EVENT_LOOPS))
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--speeds", default="1,10", help="comma separated exchange speeds (default: 1,10)")
+    parser.add_argument("--tick-interval", default=0.25, type=float,
+                        help="market time between order book updates (default: 0.25)")
+    parser.add_argument("--wait-strategies", default=",".join(WAIT_STRATEGIES),
+                        help="comma separated information wait strategies (default: %s)"
+                             % ",".join(WAIT_STRATEGIES))
+    args = parser.parse_args()
+
+    loop_types = args.loops.split(",")
+    wait_strategies = args.wait_strategies.split(",")
+    if any(t not in EVENT_LOOPS for t in loop_types) or any(w not in WAIT_STRATEGIES for w in wait_strategies):
+        parser.error("unknown event loop type or wait strategy")
+    if "uvloop" in loop_types and importlib.util.find_spec("uvloop") is None:
+        print("uvloop is not installed, so it will not be measured")
+        loop_types.remove("uvloop")
+
+    results: List[Dict[str, Any]] = list()
+    for loop_type, wait_strategy, speed in itertools.product(loop_types, wait_strategies,
+                                                             [float(s) for s in args.speeds.split(",")]):
+        result = measure(loop_type, wait_strategy, speed, args.duration, args.tick_interval)
+        if result is not None:
+            print_result(result)
+            results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"Configurations": results}, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,10 @@
 #     <https://www.gnu.org/licenses/>.
 from .types import Instrument, Side
 
+# When competitor accounts are revalued after a fill: immediately, at the end
+# of the current event loop iteration or only on the next timer tick
+ACCOUNT_REVALUATION_MODES = ("Deferred", "Fill", "Tick")
+
 
 class CompetitorAccount(object):
     """A competitors account."""
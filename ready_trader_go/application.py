@@ -22,7 +22,9 @@ import pathlib
 import signal
 import sys
 
-from typing import Callable, Optional
+from typing import Any, Callable, Optional
+
+from .profiler import SamplingProfiler
 
 
 class Application(object):
@@ -31,18 +33,19 @@ class Application(object):
     def __init__(self, name: str, config_validator: Optional[Callable] = None):
         """Initialise a new instance of the Application class."""
         self.event_loop: asyncio.AbstractEventLoop = asyncio.get_event_loop()
+        self.interrupted: bool = False
         self.logger = logging.getLogger("APP")
         self.name: str = name
+        self.profiler: SamplingProfiler = SamplingProfiler(name)
 
         # Turn on debugging if you're having trouble with the event loop
         # self.event_loop.set_debug(True)
 
-        try:
-            self.event_loop.add_signal_handler(signal.SIGINT, self.on_signal, signal.SIGINT)
-            self.event_loop.add_signal_handler(signal.SIGTERM, self.on_signal, signal.SIGTERM)
-        except NotImplementedError:
-            # Signal handlers are only implemented on Unix
-            pass
+        self.add_signal_handler(signal.SIGINT, self.on_signal, signal.SIGINT)
+        self.add_signal_handler(signal.SIGTERM, self.on_signal, signal.SIGTERM)
+        if hasattr(signal, "SIGUSR2"):
+            # Send SIGUSR2 to start the sampling profiler and again to stop it
+            self.add_signal_handler(signal.SIGUSR2, self.profiler.toggle)
 
         logging.basicConfig(filename=name + ".log", format="%(asctime)s [%(levelname)-7s] [%(name)s] %(message)s",
                             level=logging.INFO)
@@ -61,24 +64,49 @@ class Application(object):
         if self.config is not None:
             self.logger.info("configuration=%s", json.dumps(self.config, separators=(',', ':')))
 
+    def add_signal_handler(self, signum: int, callback: Callable[..., Any], *args: Any) -> None:
+        """Arrange for a callback to be called on the event loop when a signal is received.
+
+        This has no effect on platforms without signal handler support.
+        """
+        try:
+            self.event_loop.add_signal_handler(signum, callback, *args)
+        except (NotImplementedError, AttributeError, ValueError):
+            # Signal handlers are only implemented on Unix
+            pass
+
     def on_signal(self, signum: int) -> None:
         """Called when a signal is received."""
         sig_name = "SIGINT" if signum == signal.SIGINT else "SIGTERM"
         self.logger.info("%s signal received - shutting down...", sig_name)
+        self.interrupted = True
         self.event_loop.stop()
 
-    def run(self) -> None:
-        """Start the application's event loop."""
+    def close(self) -> None:
+        """Close the application's event loop."""
         loop = self.event_loop
 
+        self.profiler.stop()
+        self.logger.info("closing event loop")
         try:
-            loop.run_forever()
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+    def run(self) -> None:
+        """Start the application's event loop and close it when it stops."""
+        try:
+            self.run_until_stopped()
+        finally:
+            self.close()
+
+    def run_until_stopped(self) -> None:
+        """Run the application's event loop until it is stopped.
+
+        The event loop is left open, so that it may be run again.
+        """
+        try:
+            self.event_loop.run_forever()
         except Exception as e:
             self.logger.error("application raised an exception:", exc_info=e)
             raise
-        finally:
-            self.logger.info("closing event loop")
-            try:
-                loop.run_until_complete(loop.shutdown_asyncgens())
-            finally:
-                loop.close()
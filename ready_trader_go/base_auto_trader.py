@@ -23,10 +23,12 @@ from typing import List, Optional
 from .messages import (AMEND_MESSAGE, AMEND_MESSAGE_SIZE, CANCEL_MESSAGE, CANCEL_MESSAGE_SIZE,
                        ERROR_MESSAGE, ERROR_MESSAGE_SIZE, HEDGE_MESSAGE, HEDGE_MESSAGE_SIZE,
                        HEDGE_FILLED_MESSAGE, HEDGE_FILLED_MESSAGE_SIZE, INSERT_MESSAGE, INSERT_MESSAGE_SIZE,
-                       LOGIN_MESSAGE, LOGIN_MESSAGE_SIZE, ORDER_BOOK_HEADER, ORDER_BOOK_HEADER_SIZE,
-                       ORDER_BOOK_MESSAGE_SIZE, BOOK_PART, ORDER_FILLED_MESSAGE, ORDER_FILLED_MESSAGE_SIZE,
-                       ORDER_STATUS_MESSAGE, ORDER_STATUS_MESSAGE_SIZE, TRADE_TICKS_HEADER,
-                       TRADE_TICKS_HEADER_SIZE, TRADE_TICKS_MESSAGE_SIZE, TICKS_PART,
+                       LOGIN_MESSAGE, LOGIN_MESSAGE_SIZE, MASS_CANCEL_BOTH_SIDES, MASS_CANCEL_MESSAGE,
+                       MASS_CANCEL_MESSAGE_SIZE, MASS_QUOTE_MESSAGE, MASS_QUOTE_MESSAGE_SIZE, ORDER_BOOK_HEADER,
+                       ORDER_BOOK_HEADER_SIZE, ORDER_BOOK_MESSAGE_SIZE, BOOK_PART, ORDER_FILLED_MESSAGE,
+                       ORDER_FILLED_MESSAGE_SIZE, ORDER_FILL_STATUS_MESSAGE, ORDER_FILL_STATUS_MESSAGE_SIZE,
+                       ORDER_STATUS_MESSAGE, ORDER_STATUS_MESSAGE_SIZE, REPLACE_MESSAGE, REPLACE_MESSAGE_SIZE,
+                       TRADE_TICKS_HEADER, TRADE_TICKS_HEADER_SIZE, TRADE_TICKS_MESSAGE_SIZE, TICKS_PART,
                        Connection, MessageType, Subscription)
 from .types import Lifespan, Side
 
@@ -95,6 +97,11 @@ class BaseAutoTrader(Connection, Subscription):
             self.on_order_filled_message(*ORDER_FILLED_MESSAGE.unpack_from(data, start))
         elif typ == MessageType.ORDER_STATUS and length == ORDER_STATUS_MESSAGE_SIZE:
             self.on_order_status_message(*ORDER_STATUS_MESSAGE.unpack_from(data, start))
+        elif typ == MessageType.ORDER_FILL_STATUS and length == ORDER_FILL_STATUS_MESSAGE_SIZE:
+            client_order_id, price, volume, fill_volume, remaining_volume, fees = \
+                ORDER_FILL_STATUS_MESSAGE.unpack_from(data, start)
+            self.on_order_filled_message(client_order_id, price, volume)
+            self.on_order_status_message(client_order_id, fill_volume, remaining_volume, fees)
         else:
             self.logger.error("received invalid execution message: length=%d type=%d", length, typ)
             self.event_loop.stop()
@@ -173,3 +180,40 @@ class BaseAutoTrader(Connection, Subscription):
         self.send_message(MessageType.INSERT_ORDER,
                           INSERT_MESSAGE.pack(client_order_id, side, price, volume, lifespan),
                           INSERT_MESSAGE_SIZE)
+
+    def send_mass_cancel(self, side: Optional[Side] = None) -> None:
+        """Cancel all of your orders on the specified side, or on both sides if side is None.
+
+        An order status message will be received for each order cancelled.
+        """
+        self.send_message(MessageType.MASS_CANCEL,
+                          MASS_CANCEL_MESSAGE.pack(MASS_CANCEL_BOTH_SIDES if side is None else side),
+                          MASS_CANCEL_MESSAGE_SIZE)
+
+    def send_mass_quote(self, bid_client_order_id: int, bid_price: int, bid_volume: int, ask_client_order_id: int,
+                        ask_price: int, ask_volume: int) -> None:
+        """Replace all of your orders with a new bid and a new ask.
+
+        All of your existing orders are cancelled and good-for-day orders
+        are inserted for the bid and the ask in a single step. A side with
+        zero volume is not quoted, in which case its client order id is
+        ignored. The bid client order id must be less than the ask client
+        order id when both sides are quoted. If the quote is rejected, an
+        error message is received and your existing orders are unchanged.
+        """
+        self.send_message(MessageType.MASS_QUOTE,
+                          MASS_QUOTE_MESSAGE.pack(bid_client_order_id, bid_price, bid_volume, ask_client_order_id,
+                                                  ask_price, ask_volume),
+                          MASS_QUOTE_MESSAGE_SIZE)
+
+    def send_replace_order(self, client_order_id: int, price: int, volume: int) -> None:
+        """Move the specified order to a new price and volume in a single step.
+
+        The order keeps its client order id but loses its time priority, and
+        the same checks are applied as for a new order. Subsequent order
+        status messages count fill volume and fees from the replacement
+        only. If the order has already completely filled or been cancelled
+        this request has no effect.
+        """
+        self.send_message(MessageType.REPLACE_ORDER, REPLACE_MESSAGE.pack(client_order_id, price, volume),
+                          REPLACE_MESSAGE_SIZE)
@@ -15,14 +15,18 @@
 #     You should have received a copy of the GNU Affero General Public
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
-import bisect
+import asyncio
 import logging
+import time
 
-from typing import Any, Callable, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 
+from . import latency
 from .account import AccountFactory, CompetitorAccount
 from .match_events import MatchEvents
+from .messages import MASS_CANCEL_BOTH_SIDES
 from .order_book import IOrderListener, Order, OrderBook
+from .price_levels import PriceLevelCounter, SortedPriceList, create_price_levels
 from .score_board import ScoreBoardWriter
 from .timer import Timer
 from .types import ICompetitor, IController, IExecutionConnection, Instrument, Lifespan, Side
@@ -35,29 +39,38 @@ class Competitor(ICompetitor, IOrderListener):
     def __init__(self, name: str, exec_channel: IExecutionConnection, etf_book: OrderBook, future_book: OrderBook,
                  account: CompetitorAccount, match_events: MatchEvents, score_board: ScoreBoardWriter,
                  position_limit: int, order_count_limit: int, active_volume_limit: int, tick_size: float,
-                 unhedged_lots_factory: UnhedgedLotsFactory, controller: IController):
+                 unhedged_lots_factory: UnhedgedLotsFactory, controller: IController,
+                 account_revaluation: str = "Fill"):
         """Initialise a new instance of the Competitor class."""
         self.account: CompetitorAccount = account
+        self.account_dirty: bool = False
         self.active_volume: int = 0
         self.active_volume_limit: int = active_volume_limit
         self.controller: IController = controller
         self.etf_book: OrderBook = etf_book
         self.future_book: OrderBook = future_book
-        self.buy_prices: List[int] = list()
+        self.buy_levels: Union[SortedPriceList, PriceLevelCounter] = create_price_levels(Side.BUY, order_count_limit)
         self.exec_connection: IExecutionConnection = exec_channel
         self.last_client_order_id: int = -1
         self.logger: logging.Logger = logging.getLogger("COMPETITOR")
         self.match_events: MatchEvents = match_events
+        self.messages_received: int = 0
         self.order_count_limit: int = order_count_limit
         self.name: str = name
         self.orders: Dict[int, Order] = dict()
         self.position_limit: int = position_limit
+        self.revalue_deferred: bool = account_revaluation == "Deferred"
+        self.revalue_on_fill: bool = account_revaluation == "Fill"
         self.score_board: ScoreBoardWriter = score_board
-        self.sell_prices: List[int] = list()
+        self.sell_levels: Union[SortedPriceList, PriceLevelCounter] = create_price_levels(Side.SELL, order_count_limit)
         self.status: str = "OK"
         self.tick_size: int = int(tick_size * 100.0)  # convert tick size to cents
         self.unhedged_etf_lots: UnhedgedLots = unhedged_lots_factory.create(self.on_unhedged_lots_expiry)
 
+        self.__account_latency = latency.get_histogram("Stage.AccountUpdate")
+        self.__book_latency = latency.get_histogram("Stage.BookMatch")
+        self.__latency_enabled: bool = latency.is_enabled()
+
     def disconnect(self, now: float) -> None:
         """Disconnect this competitor."""
         if self.exec_connection is not None:
@@ -68,12 +81,14 @@ class Competitor(ICompetitor, IOrderListener):
         """Handle a hard breach by this competitor."""
         self.status = "BREACH"
         self.send_error_and_close(now, client_order_id, message)
+        self.revalue_account()
         self.score_board.breach(now, self.name, self.account, self.etf_book.last_traded_price(),
                                 self.future_book.last_traded_price())
 
     def on_connection_lost(self, now: float) -> None:
         """Called when the connection to the matching engine is lost."""
         self.exec_connection = None
+        self.revalue_account()
         self.score_board.disconnect(now, self.name, self.account, self.etf_book.last_traded_price(),
                                     self.future_book.last_traded_price())
         for o in tuple(self.orders.values()):
@@ -92,9 +107,9 @@ class Competitor(ICompetitor, IOrderListener):
         if order.remaining_volume == 0:
             del self.orders[order.client_order_id]
             if order.side == Side.BUY:
-                self.buy_prices.pop(bisect.bisect(self.buy_prices, order.price) - 1)
+                self.buy_levels.remove(order.price)
             else:
-                self.sell_prices.pop(bisect.bisect(self.sell_prices, -order.price) - 1)
+                self.sell_levels.remove(order.price)
 
     def on_order_cancelled(self, now: float, order: Order, volume_removed: int) -> None:
         """Called when an order is cancelled."""
@@ -107,9 +122,9 @@ class Competitor(ICompetitor, IOrderListener):
 
         del self.orders[order.client_order_id]
         if order.side == Side.BUY:
-            self.buy_prices.pop(bisect.bisect(self.buy_prices, order.price) - 1)
+            self.buy_levels.remove(order.price)
         else:
-            self.sell_prices.pop(bisect.bisect(self.sell_prices, -order.price) - 1)
+            self.sell_levels.remove(order.price)
 
     def on_order_placed(self, now: float, order: Order) -> None:
         """Called when a good-for-day order is placed in the order book."""
@@ -117,6 +132,24 @@ class Competitor(ICompetitor, IOrderListener):
         if order.volume == order.remaining_volume and self.exec_connection is not None:
             self.exec_connection.send_order_status(order.client_order_id, 0, order.remaining_volume, order.total_fees)
 
+    def on_order_replaced(self, now: float, order: Order, volume_removed: int, new_order: Order) -> None:
+        """Called when an order has been removed from the book before its replacement is inserted."""
+        self.match_events.cancel(now, self.name, order.client_order_id, -volume_removed)
+        self.active_volume -= volume_removed
+        if order.side == Side.BUY:
+            self.buy_levels.remove(order.price)
+        else:
+            self.sell_levels.remove(order.price)
+
+        self.orders[new_order.client_order_id] = new_order
+        if new_order.side == Side.BUY:
+            self.buy_levels.add(new_order.price)
+        else:
+            self.sell_levels.add(new_order.price)
+        self.match_events.insert(now, self.name, new_order.client_order_id, new_order.instrument, new_order.side,
+                                 new_order.volume, new_order.price, new_order.lifespan)
+        self.active_volume += new_order.volume
+
     def on_order_filled(self, now: float, order: Order, price: int, volume: int, fee: int) -> None:
         """Called when an order is partially or completely filled."""
         self.active_volume -= volume
@@ -124,21 +157,27 @@ class Competitor(ICompetitor, IOrderListener):
         if order.remaining_volume == 0:
             del self.orders[order.client_order_id]
             if order.side == Side.BUY:
-                self.buy_prices.pop()
+                self.buy_levels.remove(order.price)
             else:
-                self.sell_prices.pop()
+                self.sell_levels.remove(order.price)
 
         self.unhedged_etf_lots.apply_position_delta(volume if order.side == Side.BUY else -volume)
 
         self.match_events.fill(now, self.name, order.client_order_id, order.instrument, order.side, price, volume, fee)
-        last_traded: int = self.future_book.last_traded_price() or round(self.future_book.midpoint_price())
+        start = time.perf_counter_ns() if self.__latency_enabled else 0
         self.account.transact(Instrument.ETF, order.side, price, volume, fee)
-        self.account.update(last_traded, price)
+        if self.revalue_on_fill:
+            last_traded: int = self.future_book.last_traded_price() or round(self.future_book.midpoint_price())
+            self.account.update(last_traded, price)
+        else:
+            self.mark_account_dirty()
+        if self.__latency_enabled:
+            self.__account_latency.record(time.perf_counter_ns() - start)
 
         if self.exec_connection is not None:
-            self.exec_connection.send_order_filled(order.client_order_id, price, volume)
-            self.exec_connection.send_order_status(order.client_order_id, order.volume - order.remaining_volume,
-                                                   order.remaining_volume, order.total_fees)
+            self.exec_connection.send_order_fill(order.client_order_id, price, volume,
+                                                 order.volume - order.remaining_volume, order.remaining_volume,
+                                                 order.total_fees)
             if not (-self.position_limit <= self.account.etf_position <= self.position_limit):
                 self.hard_breach(now, order.client_order_id, b"ETF position limit breached")
 
@@ -204,8 +243,11 @@ class Competitor(ICompetitor, IOrderListener):
             self.match_events.hedge(now, self.name, client_order_id, Instrument.FUTURE, side_, average_price,
                                     volume_traded)
             self.account.transact(Instrument.FUTURE, side_, average_price, volume_traded, 0)
-            self.account.update(self.future_book.last_traded_price() or self.future_book.midpoint_price(),
-                                self.etf_book.last_traded_price() or self.etf_book.midpoint_price())
+            if self.revalue_on_fill:
+                self.account.update(self.future_book.last_traded_price() or self.future_book.midpoint_price(),
+                                    self.etf_book.last_traded_price() or self.etf_book.midpoint_price())
+            else:
+                self.mark_account_dirty()
 
         if self.exec_connection is not None:
             self.exec_connection.send_hedge_filled(client_order_id, average_price, volume_traded)
@@ -249,27 +291,146 @@ class Competitor(ICompetitor, IOrderListener):
             self.send_error(now, client_order_id, b"order rejected: market not yet open")
             return
 
-        if ((side == Side.BUY and self.sell_prices and price >= -self.sell_prices[-1])
-                or (side == Side.SELL and self.buy_prices and price <= self.buy_prices[-1])):
+        best_ask: Optional[int] = self.sell_levels.best
+        best_bid: Optional[int] = self.buy_levels.best
+        if ((side == Side.BUY and best_ask is not None and price >= best_ask)
+                or (side == Side.SELL and best_bid is not None and price <= best_bid)):
             self.send_error(now, client_order_id, b"order rejected: in cross with an existing order")
             return
 
-        order = self.orders[client_order_id] = Order(client_order_id, Instrument.ETF, Lifespan(lifespan), Side(side),
-                                                     price, volume, self)
+        self.__insert_order(now, client_order_id, Side(side), price, volume, Lifespan(lifespan))
+
+    def on_mass_cancel_message(self, now: float, side: int) -> None:
+        """Called when a mass cancel request is received from the competitor."""
+        if side != Side.BUY and side != Side.SELL and side != MASS_CANCEL_BOTH_SIDES:
+            self.send_error(now, 0, b"%d is not a valid side" % side)
+            return
+
+        for order in tuple(self.orders.values()):
+            if side == MASS_CANCEL_BOTH_SIDES or order.side == side:
+                self.etf_book.cancel(now, order)
+
+    def on_mass_quote_message(self, now: float, bid_client_order_id: int, bid_price: int, bid_volume: int,
+                              ask_client_order_id: int, ask_price: int, ask_volume: int) -> None:
+        """Called when a mass quote request is received from the competitor.
+
+        All checks are made before any existing order is cancelled, so a
+        rejected quote leaves the competitor's orders unchanged.
+        """
+        quotes = [q for q in ((bid_client_order_id, Side.BUY, bid_price, bid_volume),
+                              (ask_client_order_id, Side.SELL, ask_price, ask_volume)) if q[3] > 0]
+        if not quotes:
+            self.send_error(now, bid_client_order_id, b"order rejected: invalid volume")
+            return
+
+        first_client_order_id: int = quotes[0][0]
+        if (first_client_order_id <= self.last_client_order_id
+                or (len(quotes) == 2 and quotes[1][0] <= first_client_order_id)):
+            self.send_error(now, first_client_order_id, b"duplicate or out-of-order client_order_id")
+            return
+
+        self.last_client_order_id = quotes[-1][0]
+
+        if any(price % self.tick_size != 0 for _, _, price, _ in quotes):
+            self.send_error(now, first_client_order_id, b"price is not a multiple of tick size")
+            return
+
+        if len(quotes) > self.order_count_limit:
+            self.send_error(now, first_client_order_id, b"order rejected: active order count limit breached")
+            return
+
+        if sum(volume for _, _, _, volume in quotes) > self.active_volume_limit:
+            self.send_error(now, first_client_order_id, b"order rejected: active order volume limit breached")
+            return
+
+        if now == 0.0:
+            self.send_error(now, first_client_order_id, b"order rejected: market not yet open")
+            return
+
+        if len(quotes) == 2 and bid_price >= ask_price:
+            self.send_error(now, first_client_order_id, b"order rejected: bid and ask prices are in cross")
+            return
+
+        for order in tuple(self.orders.values()):
+            self.etf_book.cancel(now, order)
+
+        for client_order_id, side, price, volume in quotes:
+            self.__insert_order(now, client_order_id, side, price, volume, Lifespan.GOOD_FOR_DAY)
+
+    def __insert_order(self, now: float, client_order_id: int, side: Side, price: int, volume: int,
+                       lifespan: Lifespan) -> None:
+        """Insert a new order that has passed all checks into the ETF order book."""
+        order = self.orders[client_order_id] = Order(client_order_id, Instrument.ETF, lifespan, side, price, volume,
+                                                     self)
         if side == Side.BUY:
-            bisect.insort(self.buy_prices, price)
+            self.buy_levels.add(price)
         else:
-            bisect.insort(self.sell_prices, -price)
+            self.sell_levels.add(price)
         self.match_events.insert(now, self.name, order.client_order_id, order.instrument, order.side, order.volume,
                                  order.price, order.lifespan)
         self.active_volume += volume
+        start = time.perf_counter_ns() if self.__latency_enabled else 0
         self.etf_book.insert(now, order)
+        if self.__latency_enabled:
+            self.__book_latency.record(time.perf_counter_ns() - start)
+
+    def mark_account_dirty(self) -> None:
+        """Note that the account needs revaluing after a transaction."""
+        if not self.account_dirty:
+            self.account_dirty = True
+            if self.revalue_deferred:
+                asyncio.get_running_loop().call_soon(self.revalue_account)
 
     def on_timer_tick(self, now: float, future_price: int, etf_price: int) -> None:
         """Called on each timer tick to update the auto-trader."""
+        self.account_dirty = False
         self.account.update(future_price or 0, etf_price or 0)
         self.score_board.tick(now, self.name, self.account, etf_price, future_price, self.status)
 
+    def revalue_account(self) -> None:
+        """Revalue the account if there have been transactions since it was last valued."""
+        if self.account_dirty:
+            start = time.perf_counter_ns() if self.__latency_enabled else 0
+            self.account_dirty = False
+            future_price = self.future_book.last_traded_price() or self.future_book.midpoint_price()
+            etf_price = self.etf_book.last_traded_price() or self.etf_book.midpoint_price()
+            self.account.update(round(future_price or 0), round(etf_price or 0))
+            if self.__latency_enabled:
+                self.__account_latency.record(time.perf_counter_ns() - start)
+
+    def on_replace_message(self, now: float, client_order_id: int, price: int, volume: int) -> None:
+        """Called when a replace order request is received from the competitor."""
+        if client_order_id > self.last_client_order_id:
+            self.send_error(now, client_order_id, b"out-of-order client_order_id in replace message")
+            return
+
+        if client_order_id not in self.orders:
+            return
+
+        order = self.orders[client_order_id]
+
+        if price % self.tick_size != 0:
+            self.send_error(now, client_order_id, b"price is not a multiple of tick size")
+            return
+
+        if volume < 1:
+            self.send_error(now, client_order_id, b"order rejected: invalid volume")
+            return
+
+        if self.active_volume - order.remaining_volume + volume > self.active_volume_limit:
+            self.send_error(now, client_order_id, b"order rejected: active order volume limit breached")
+            return
+
+        best_ask: Optional[int] = self.sell_levels.best
+        best_bid: Optional[int] = self.buy_levels.best
+        if ((order.side == Side.BUY and best_ask is not None and price >= best_ask)
+                or (order.side == Side.SELL and best_bid is not None and price <= best_bid)):
+            self.send_error(now, client_order_id, b"order rejected: in cross with an existing order")
+            return
+
+        self.etf_book.replace(now, order, Order(client_order_id, Instrument.ETF, order.lifespan, order.side, price,
+                                                volume, self))
+
     def send_error(self, now: float, client_order_id: int, message: bytes) -> None:
         """Send an error message to the auto-trader and shut down the match."""
         self.exec_connection.send_error(client_order_id, message)
@@ -289,9 +450,10 @@ class CompetitorManager:
     def __init__(self, limits_config: Dict[str, Any], traders_config: Dict[str, str], account_factory: AccountFactory,
                  etf_book: OrderBook, future_book: OrderBook, match_events: MatchEvents,
                  score_board_writer: ScoreBoardWriter, tick_size: float, timer: Timer,
-                 unhedged_lots_factory: UnhedgedLotsFactory):
+                 unhedged_lots_factory: UnhedgedLotsFactory, account_revaluation: str = "Fill"):
         """Initialise a new instance of the CompetitorManager class."""
         self.__account_factory: AccountFactory = account_factory
+        self.__account_revaluation: str = account_revaluation
         self.__active_volume_limit: int = limits_config["ActiveVolumeLimit"]
         self.__competitors: Dict[str, Competitor] = dict()
         self.__etf_book: OrderBook = etf_book
@@ -307,6 +469,7 @@ class CompetitorManager:
         self.__tick_size: float = tick_size
 
         self.active_competitor_count: int = 0
+        self.frequency_limit_breach_count: int = 0
         self.controller: Optional[IController] = None
         self.competitor_logged_in: List[Callable[[str], None]] = list()
 
@@ -326,7 +489,8 @@ class CompetitorManager:
         competitor = Competitor(name, exec_channel, self.__etf_book, self.__future_book,
                                 self.__account_factory.create(), self.__match_events, self.__score_board_writer,
                                 self.__position_limit, self.__order_count_limit, self.__active_volume_limit,
-                                self.__tick_size, self.__unhedged_lots_factory, self.controller)
+                                self.__tick_size, self.__unhedged_lots_factory, self.controller,
+                                self.__account_revaluation)
         self.__competitors[name] = competitor
 
         if self.__start_time != 0.0:
@@ -345,6 +509,10 @@ class CompetitorManager:
         """Notify this competitor manager that a competitor has disconnected."""
         self.active_competitor_count -= 1
 
+    def on_frequency_limit_breached(self) -> None:
+        """Notify this competitor manager that a connection breached the message frequency limit."""
+        self.frequency_limit_breach_count += 1
+
     def on_timer_started(self, _: Timer, start_time: float) -> None:
         """Called when the market opens."""
         self.__start_time = start_time
@@ -18,16 +18,18 @@
 import asyncio
 import logging
 
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, List, Optional, Set
 
 from .execution import ExecutionServer
 from .heads_up import HeadsUpDisplayServer
 from .information import InformationPublisher
 from .market_events import MarketEventsReader
 from .match_events import MatchEventsWriter
+from .metrics import MetricsServer
 from .score_board import ScoreBoardWriter
 from .timer import Timer
 from .types import IController
+from .util import GarbageCollectionMonitor
 
 
 class Controller(IController):
@@ -35,20 +37,44 @@ class Controller(IController):
 
     def __init__(self, market_open_delay: float, exec_server: ExecutionServer, info_publisher: InformationPublisher,
                  market_events_reader: MarketEventsReader, match_events_writer: MatchEventsWriter,
-                 score_board_writer: ScoreBoardWriter, market_timer: Timer, tick_timer: Timer):
-        """Initialise a new instance of the Controller class."""
+                 score_board_writer: ScoreBoardWriter, market_timer: Timer, tick_timer: Timer, timeout_timer: Timer,
+                 market_event_batch_window: Optional[float] = None, expected_competitors: Iterable[str] = ()):
+        """Initialise a new instance of the Controller class.
+
+        If market_event_batch_window is None, market events are processed on
+        each tick of the market timer. Otherwise, the controller sleeps until
+        the next market event is due, but wakes no more often than once per
+        batch window.
+
+        The market opens as soon as every expected competitor has logged in,
+        or when the market open delay expires if that is sooner. If no
+        competitors are expected, the market opens without delay.
+        """
+        self.garbage_collection_monitor: Optional[GarbageCollectionMonitor] = None
         self.heads_up_display_server: Optional[HeadsUpDisplayServer] = None
+        self.metrics_server: Optional[MetricsServer] = None
 
+        self.__awaited_competitors: Set[str] = set(expected_competitors)
+        self.__competitors_ready: asyncio.Event = asyncio.Event()
+        if not self.__awaited_competitors:
+            self.__competitors_ready.set()
         self.__done: bool = False
         self.__execution_server: ExecutionServer = exec_server
         self.__information_publisher: InformationPublisher = info_publisher
         self.__logger: logging.Logger = logging.getLogger("CONTROLLER")
         self.__market_events_reader = market_events_reader
         self.__market_open_delay: float = market_open_delay
+        self.__market_event_batch_window: Optional[float] = market_event_batch_window
+        self.__market_event_handle: Optional[asyncio.TimerHandle] = None
+        self.__market_event_wakeups: int = 0
         self.__market_timer: Timer = market_timer
         self.__match_events_writer = match_events_writer
         self.__score_board_writer = score_board_writer
         self.__tick_timer: Timer = tick_timer
+        self.__timeout_timer: Timer = timeout_timer
+
+        # Signals
+        self.exchange_ready: List[Callable[[], None]] = list()
 
         # Connect signals
         self.__match_events_writer.task_complete.append(self.on_task_complete)
@@ -58,6 +84,21 @@ class Controller(IController):
         self.__tick_timer.timer_stopped.append(self.on_tick_timer_stopped)
         self.__tick_timer.timer_ticked.append(self.on_tick_timer_ticked)
 
+    @property
+    def execution_server(self) -> ExecutionServer:
+        """Return the server for auto-trader execution connections."""
+        return self.__execution_server
+
+    @property
+    def information_publisher(self) -> InformationPublisher:
+        """Return the publisher of order book updates and trade ticks."""
+        return self.__information_publisher
+
+    @property
+    def market_events_reader(self) -> MarketEventsReader:
+        """Return the source of market events."""
+        return self.__market_events_reader
+
     def advance_time(self):
         """Return the current time after accounting for events."""
         now: float = self.__market_timer.advance()
@@ -72,17 +113,45 @@ class Controller(IController):
         if self.__score_board_writer:
             self.__score_board_writer.finish()
 
+        # Another match may be run on the same event loop
+        self.__market_timer.stop()
+        self.__timeout_timer.stop()
+
+    def on_competitor_logged_in(self, name: str) -> None:
+        """Called when a competitor logs in."""
+        if name in self.__awaited_competitors:
+            self.__awaited_competitors.discard(name)
+            if not self.__awaited_competitors:
+                self.__competitors_ready.set()
+
+    def on_market_events_due(self) -> None:
+        """Called when the next market event is expected to be due."""
+        self.__market_event_wakeups += 1
+        now: float = self.__market_timer.advance()
+        self.__market_events_reader.process_market_events(now)
+        self.__schedule_market_events(now)
+
     def on_market_timer_ticked(self, timer: Timer, now: float, _: int):
         """Called when it is time to process market events."""
+        self.__market_event_wakeups += 1
         self.__market_events_reader.process_market_events(now)
 
+    def __schedule_market_events(self, now: float) -> None:
+        """Arrange to wake up when the next market event is due."""
+        evt = self.__market_events_reader.next_event
+        if evt is not None:
+            earliest: float = now + self.__market_event_batch_window
+            self.__market_event_handle = self.__market_timer.call_at(evt.time if evt.time > earliest else earliest,
+                                                                     self.on_market_events_due)
+
     def on_task_complete(self, task: Any) -> None:
         """Called when a reader or writer task is complete"""
         if task is self.__match_events_writer:
             self.__match_events_writer = None
         elif task is self.__score_board_writer:
             self.__score_board_writer = None
-        elif task is self.__market_events_reader:
+        elif task is self.__market_events_reader and not self.__done:
+            self.__logger.info("market events processed after %d wakeups", self.__market_event_wakeups)
             self.__done = True
 
         if self.__match_events_writer is None and self.__score_board_writer is None:
@@ -90,6 +159,9 @@ class Controller(IController):
 
     def on_tick_timer_stopped(self, timer: Timer, now: float) -> None:
         """Shut down the match."""
+        self.__execution_server.close()
+        if self.__market_event_handle is not None:
+            self.__market_event_handle.cancel()
         self.__match_events_writer.finish()
         self.__score_board_writer.finish()
 
@@ -103,6 +175,7 @@ class Controller(IController):
         """Start running the match."""
         self.__logger.info("starting the match")
 
+        self.__timeout_timer.start()
         await self.__execution_server.start()
         await self.__information_publisher.start()
         if self.heads_up_display_server:
@@ -112,10 +185,22 @@ class Controller(IController):
         self.__match_events_writer.start()
         self.__score_board_writer.start()
 
+        for callback in self.exchange_ready:
+            callback()
+
         # Give the auto-traders time to start up and connect
-        await asyncio.sleep(self.__market_open_delay)
+        try:
+            await asyncio.wait_for(self.__competitors_ready.wait(), self.__market_open_delay)
+        except asyncio.TimeoutError:
+            if self.__awaited_competitors:
+                self.__logger.warning("opening the market without competitors: names=%s",
+                                      ", ".join(sorted(self.__awaited_competitors)))
+        else:
+            self.__logger.info("every expected competitor has logged in")
         # self.__execution_server.close()
 
         self.__logger.info("market open")
         self.__market_timer.start()
+        if self.__market_event_batch_window is not None:
+            self.__schedule_market_events(0.0)
         self.__tick_timer.start()
@@ -175,6 +175,11 @@ class DemoClient:
             self.__on_order_filled_message(*ORDER_FILLED_MESSAGE.unpack_from(data, start))
         elif typ == MessageType.ORDER_STATUS and length == ORDER_STATUS_MESSAGE_SIZE:
             self.__on_order_status_message(*ORDER_STATUS_MESSAGE.unpack_from(data, start))
+        elif typ == MessageType.ORDER_FILL_STATUS and length == ORDER_FILL_STATUS_MESSAGE_SIZE:
+            order_id, price, volume, fill_volume, remaining_volume, fees = \
+                ORDER_FILL_STATUS_MESSAGE.unpack_from(data, start)
+            self.__on_order_filled_message(order_id, price, volume)
+            self.__on_order_status_message(order_id, fill_volume, remaining_volume, fees)
         else:
             print("received invalid message: length=%d type=%d", length, typ)
 
@@ -15,24 +15,40 @@
 #     You should have received a copy of the GNU Affero General Public
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
+import signal
 import socket
 
-from .account import AccountFactory
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import latency, tracing
+from .account import ACCOUNT_REVALUATION_MODES, AccountFactory
 from .application import Application
 from .competitor import CompetitorManager
 from .controller import Controller
 from .execution import ExecutionServer
 from .heads_up import HeadsUpDisplayServer
 from .information import InformationPublisher
-from .limiter import FrequencyLimiterFactory
+from .limiter import FREQUENCY_LIMITERS, FrequencyLimiterFactory
+from .load_test import load_test_team_names, validate_load_test_config
+from .market_data_index import MarketDataIndex
 from .market_events import MarketEventsReader
 from .match_events import MatchEvents, MatchEventsWriter
+from .metrics import ExchangeMetricsCollector, create_metrics_server, validate_metrics_config
 from .order_book import OrderBook
 from .pubsub import PublisherFactory
 from .score_board import ScoreBoardWriter
+from .synthetic_market import SYNTHETIC_MARKET_PARAMETERS, SyntheticMarketEventsReader
 from .timer import Timer
+from .timer_wheel import TIMER_WHEEL_RESOLUTION, TimerWheel
 from .types import Instrument
 from .unhedged_lots import UnhedgedLotsFactory
+from .util import GarbageCollectionMonitor
+
+DEFAULT_MARKET_EVENT_BATCH_WINDOW = 0.001
+
+# Settings that each entry in the Engine's Matches list may change
+MATCH_SETTINGS = ("MarketDataFile", "MarketDataStartTime", "MarketDataEndTime", "MatchEventsFile", "ScoreBoardFile",
+                  "SyntheticMarket")
 
 
 def __validate_hostname(config, section, key):
@@ -52,6 +68,18 @@ def __validate_object(config, section, required_keys, value_types):
         raise Exception("Element of inappropriate type in %s configuration" % section)
 
 
+def __match_configs(config) -> List[Dict[str, Any]]:
+    """Return the configuration of each match to be run, in order."""
+    engine = {k: v for k, v in config["Engine"].items() if k != "Matches"}
+    result = list()
+    for match in config["Engine"].get("Matches", [dict()]):
+        match_config = dict(config, Engine=dict(engine, **{k: v for k, v in match.items() if k != "SyntheticMarket"}))
+        if "SyntheticMarket" in match:
+            match_config["SyntheticMarket"] = dict(config.get("SyntheticMarket", dict()), **match["SyntheticMarket"])
+        result.append(match_config)
+    return result
+
+
 def __exchange_config_validator(config):
     """Return True if the specified config is valid, otherwise raise an exception."""
     if type(config) is not dict:
@@ -59,9 +87,9 @@ def __exchange_config_validator(config):
     if any(k not in config for k in ("Engine", "Execution", "Fees", "Information", "Instrument", "Limits", "Traders")):
         raise Exception("A required key is missing from the configuration")
 
-    __validate_object(config, "Engine", ("MarketDataFile", "MarketEventInterval", "MarketOpenDelay", "MatchEventsFile",
+    __validate_object(config, "Engine", ("MarketEventInterval", "MarketOpenDelay", "MatchEventsFile",
                                          "ScoreBoardFile", "Speed", "TickInterval"),
-                      (str, float, float, str, str, float, float))
+                      (float, float, str, str, float, float))
     __validate_object(config, "Execution", ("Host", "Port"), (str, int))
     __validate_object(config, "Fees", ("Maker", "Taker"), (float, float))
     __validate_object(config, "Information", ("Type", "Name"), (str, str))
@@ -70,10 +98,81 @@ def __exchange_config_validator(config):
                                          "MessageFrequencyLimit", "PositionLimit"), (int, int, float, int, int))
     __validate_hostname(config, "Execution", "Host")
 
+    if config["Engine"].get("MarketDataSource", "File") not in ("File", "Synthetic"):
+        raise Exception("MarketDataSource in Engine configuration should be either File or Synthetic")
+
+    if config["Engine"].get("MarketDataSource", "File") == "File":
+        # MarketDataFile may be a single filename or a list of filenames
+        market_data_file = config["Engine"].get("MarketDataFile")
+        if type(market_data_file) is list:
+            if not market_data_file or any(type(f) is not str for f in market_data_file):
+                raise Exception("MarketDataFile in Engine configuration should be a filename or a list of filenames")
+        elif type(market_data_file) is not str:
+            raise Exception("MarketDataFile in Engine configuration should be a filename or a list of filenames")
+    else:
+        if any(k in config["Engine"] for k in ("MarketDataStartTime", "MarketDataEndTime")):
+            raise Exception("MarketDataStartTime and MarketDataEndTime require a MarketDataSource of File")
+        synthetic = config.setdefault("SyntheticMarket", dict())
+        if type(synthetic) is not dict:
+            raise Exception("SyntheticMarket configuration should be a JSON object")
+        if any(k not in SYNTHETIC_MARKET_PARAMETERS for k in synthetic):
+            raise Exception("Unknown key in SyntheticMarket configuration")
+        if any(type(v) is not type(SYNTHETIC_MARKET_PARAMETERS[k]) for k, v in synthetic.items()):
+            raise Exception("Element of inappropriate type in SyntheticMarket configuration")
+        params = dict(SYNTHETIC_MARKET_PARAMETERS, **synthetic)
+        if any(params[k] <= 0 for k in ("Duration", "InitialPrice", "OrderRate", "Depth", "MaxVolume")):
+            raise Exception("Duration, InitialPrice, OrderRate, Depth and MaxVolume in SyntheticMarket configuration"
+                            " should be positive")
+        if any(params[k] < 0 for k in ("Volatility", "ReversionRate", "CancelRate", "MarketableFraction")):
+            raise Exception("Element of SyntheticMarket configuration should not be negative")
+        if not -1.0 <= params["Correlation"] <= 1.0 or params["MarketableFraction"] > 1.0:
+            raise Exception("Correlation and MarketableFraction in SyntheticMarket configuration are out of range")
+
+    if "AggregateFills" in config["Execution"] and type(config["Execution"]["AggregateFills"]) is not bool:
+        raise Exception("AggregateFills in Execution configuration should be true or false")
+
+    if "AccountRevaluation" in config["Engine"]:
+        if config["Engine"]["AccountRevaluation"] not in ACCOUNT_REVALUATION_MODES:
+            raise Exception("AccountRevaluation in Engine configuration should be one of: "
+                            + ", ".join(ACCOUNT_REVALUATION_MODES))
+
+    if "MarketEventScheduling" in config["Engine"]:
+        if config["Engine"]["MarketEventScheduling"] not in ("Adaptive", "Fixed"):
+            raise Exception("MarketEventScheduling in Engine configuration should be either Adaptive or Fixed")
+    if "MarketEventBatchWindow" in config["Engine"]:
+        if type(config["Engine"]["MarketEventBatchWindow"]) is not float:
+            raise Exception("Element of inappropriate type in Engine configuration")
+
+    for key in ("MarketDataStartTime", "MarketDataEndTime"):
+        if key in config["Engine"] and type(config["Engine"][key]) is not float:
+            raise Exception("Element of inappropriate type in Engine configuration")
+    if config["Engine"].get("MarketDataStartTime", 0.0) < 0.0:
+        raise Exception("MarketDataStartTime in Engine configuration should not be negative")
+    if config["Engine"].get("MarketDataEndTime", float("inf")) <= config["Engine"].get("MarketDataStartTime", 0.0):
+        raise Exception("MarketDataEndTime in Engine configuration should be after MarketDataStartTime")
+    if config["Engine"].get("MarketDataStartTime", 0.0) > 0.0 and type(config["Engine"]["MarketDataFile"]) is list:
+        raise Exception("MarketDataStartTime in Engine configuration requires a single MarketDataFile")
+
+    if "TraceFile" in config["Engine"] and type(config["Engine"]["TraceFile"]) is not str:
+        raise Exception("Element of inappropriate type in Engine configuration")
+
+    if "LatencyHistograms" in config["Engine"] and type(config["Engine"]["LatencyHistograms"]) is not bool:
+        raise Exception("LatencyHistograms in Engine configuration should be true or false")
+
+    if "MessageFrequencyLimiter" in config["Limits"]:
+        if config["Limits"]["MessageFrequencyLimiter"] not in FREQUENCY_LIMITERS:
+            raise Exception("MessageFrequencyLimiter in Limits configuration should be one of: "
+                            + ", ".join(FREQUENCY_LIMITERS))
+
     if "Hud" in config:
         __validate_object(config, "Hud", ("Host", "Port"), (str, int))
         __validate_hostname(config, "Hud", "Host")
 
+    if "Metrics" in config:
+        validate_metrics_config(config)
+        if "Path" not in config["Metrics"]:
+            __validate_hostname(config, "Metrics", "Host")
+
     if type(config["Traders"]) is not dict:
         raise Exception("Traders configuration should be a JSON object")
     if any(type(k) is not str for k in config["Traders"]):
@@ -81,56 +180,171 @@ def __exchange_config_validator(config):
     if any(type(v) is not str for v in config["Traders"].values()):
         raise Exception("Element of inappropriate type in Traders configuration")
 
+    if "LoadTest" in config:
+        validate_load_test_config(config)
+
+    if "Matches" in config["Engine"]:
+        matches = config["Engine"]["Matches"]
+        if type(matches) is not list or not matches or any(type(m) is not dict for m in matches):
+            raise Exception("Matches in Engine configuration should be a non-empty list of JSON objects")
+        if any(k not in MATCH_SETTINGS for m in matches for k in m):
+            raise Exception("Each of the Matches in Engine configuration may only set: " + ", ".join(MATCH_SETTINGS))
+        if any(type(m.get("SyntheticMarket", dict())) is not dict for m in matches):
+            raise Exception("SyntheticMarket configuration should be a JSON object")
+        if "Hud" in config:
+            raise Exception("The heads-up display cannot be used with Matches in Engine configuration")
+        for match_config in __match_configs(config):
+            __exchange_config_validator(match_config)
+
     return True
 
 
-def setup(app: Application) -> Controller:
-    """Setup the exchange simulator."""
-    engine = app.config["Engine"]
-    exec_ = app.config["Execution"]
-    info = app.config["Information"]
-    instrument = app.config["Instrument"]
-    limits = app.config["Limits"]
+def setup(app: Application, config: Optional[Dict[str, Any]] = None, previous: Optional[Controller] = None,
+          competitors: Optional[Iterable[str]] = None) -> Controller:
+    """Setup the exchange simulator for a match.
+
+    The match's configuration defaults to the application's configuration.
+    If the controller of a previous match is given, the new match reuses its
+    execution server, information publisher and monitors, so that it can run
+    on the same event loop once the previous match is complete.
+
+    The market opens once the named competitors have logged in, which are
+    the teams in the Traders section unless others are given.
+    """
+    if config is None:
+        config = app.config
+    if competitors is None:
+        competitors = config["Traders"]
+    engine = config["Engine"]
+    exec_ = config["Execution"]
+    info = config["Information"]
+    instrument = config["Instrument"]
+    limits = config["Limits"]
+
+    traders = config["Traders"]
+    if "LoadTest" in config:
+        # Load test sessions log in with generated team names that share a secret
+        secret = config["LoadTest"]["Secret"]
+        traders = dict(traders, **{name: secret for name in load_test_team_names(config["LoadTest"])})
+
+    if previous is None and engine.get("LatencyHistograms", False):
+        # Histograms must be enabled before the objects that record in them are created
+        latency.enable()
+        if hasattr(signal, "SIGUSR1"):
+            app.add_signal_handler(signal.SIGUSR1, latency.log_histograms)
+
+    if previous is None and "TraceFile" in engine:
+        tracing.start_tracing(engine["TraceFile"], app.event_loop)
 
     future_book = OrderBook(Instrument.FUTURE, 0.0, 0.0)
-    etf_book = OrderBook(Instrument.ETF, app.config["Fees"]["Maker"], app.config["Fees"]["Taker"])
+    etf_book = OrderBook(Instrument.ETF, config["Fees"]["Maker"], config["Fees"]["Taker"])
 
     match_events = MatchEvents()
     match_events_writer = MatchEventsWriter(match_events, engine["MatchEventsFile"], app.event_loop)
-    market_events_reader = MarketEventsReader(engine["MarketDataFile"], app.event_loop, future_book, etf_book,
-                                              match_events)
+    start_time = engine.get("MarketDataStartTime", 0.0)
+    if engine.get("MarketDataSource", "File") == "Synthetic":
+        market_events_reader = SyntheticMarketEventsReader(config["SyntheticMarket"], instrument["TickSize"],
+                                                           app.event_loop, future_book, etf_book, match_events)
+    else:
+        market_events_reader = MarketEventsReader(engine["MarketDataFile"], app.event_loop, future_book, etf_book,
+                                                  match_events, start_time, engine.get("MarketDataEndTime"))
+    if start_time > 0.0:
+        checkpoint = MarketDataIndex.load_or_build(engine["MarketDataFile"]).find_checkpoint(start_time)
+        if checkpoint is not None:
+            checkpoint.restore(market_events_reader)
     score_board_writer = ScoreBoardWriter(engine["ScoreBoardFile"], app.event_loop)
 
-    tick_timer = Timer(engine["TickInterval"], engine["Speed"])
+    if previous is None:
+        gc_monitor = GarbageCollectionMonitor()
+        gc_monitor.start()
+    else:
+        gc_monitor = previous.garbage_collection_monitor
+    market_events_reader.task_complete.append(gc_monitor.on_task_complete)
+
+    tick_timer = Timer(engine["TickInterval"], engine["Speed"], "Tick")
+    # Timeouts are measured in real time, so the timer wheel ignores the speed
+    timeout_timer = Timer(TIMER_WHEEL_RESOLUTION, 1.0, "Timeout")
+    timer_wheel = TimerWheel(timeout_timer)
     account_factory = AccountFactory(instrument["EtfClamp"], instrument["TickSize"])
-    unhedged_lots_factory = UnhedgedLotsFactory()
-    competitor_manager = CompetitorManager(app.config["Limits"], app.config["Traders"], account_factory, etf_book,
+    unhedged_lots_factory = UnhedgedLotsFactory(timer_wheel)
+    competitor_manager = CompetitorManager(limits, traders, account_factory, etf_book,
                                            future_book, match_events, score_board_writer, instrument["TickSize"],
-                                           tick_timer, unhedged_lots_factory)
+                                           tick_timer, unhedged_lots_factory,
+                                           engine.get("AccountRevaluation", "Fill"))
 
     limiter_factory = FrequencyLimiterFactory(limits["MessageFrequencyInterval"] / engine["Speed"],
-                                              limits["MessageFrequencyLimit"])
-    exec_server = ExecutionServer(exec_["Host"], exec_["Port"], competitor_manager, limiter_factory)
-    info_publisher = InformationPublisher(app.event_loop, PublisherFactory(info["Type"], info["Name"]),
-                                          (future_book, etf_book), tick_timer)
+                                              limits["MessageFrequencyLimit"],
+                                              limits.get("MessageFrequencyLimiter", "Deque"))
+    if previous is None:
+        exec_server = ExecutionServer(exec_["Host"], exec_["Port"], competitor_manager, limiter_factory, timer_wheel,
+                                      exec_.get("AggregateFills", False))
+        info_publisher = InformationPublisher(app.event_loop, PublisherFactory(info["Type"], info["Name"]),
+                                              (future_book, etf_book), tick_timer)
+    else:
+        # Auto-traders reconnect to the same socket and keep reading the same information channel
+        exec_server = previous.execution_server
+        exec_server.reset(competitor_manager, limiter_factory, timer_wheel)
+        info_publisher = previous.information_publisher
+        info_publisher.reset((future_book, etf_book), tick_timer)
 
-    market_timer = Timer(engine["MarketEventInterval"], engine["Speed"])
+    if engine.get("MarketEventScheduling", "Fixed") == "Adaptive":
+        market_timer = Timer(None, engine["Speed"], "Market")
+        batch_window = engine.get("MarketEventBatchWindow", DEFAULT_MARKET_EVENT_BATCH_WINDOW)
+    else:
+        market_timer = Timer(engine["MarketEventInterval"], engine["Speed"], "Market")
+        batch_window = None
     controller = Controller(engine["MarketOpenDelay"], exec_server, info_publisher, market_events_reader,
-                            match_events_writer, score_board_writer, market_timer, tick_timer)
+                            match_events_writer, score_board_writer, market_timer, tick_timer, timeout_timer,
+                            batch_window, competitors)
+    controller.garbage_collection_monitor = gc_monitor
     competitor_manager.controller = controller
+    competitor_manager.competitor_logged_in.append(controller.on_competitor_logged_in)
     exec_server.controller = controller
 
-    if "Hud" in app.config:
-        hud_server = HeadsUpDisplayServer(app.config["Hud"]["Host"], app.config["Hud"]["Port"], match_events,
+    if "Hud" in config:
+        hud_server = HeadsUpDisplayServer(config["Hud"]["Host"], config["Hud"]["Port"], match_events,
                                           competitor_manager, controller)
         controller.heads_up_display_server = hud_server
 
+    if "Metrics" in config:
+        if previous is None:
+            metrics_server = create_metrics_server(config["Metrics"])
+            app.event_loop.create_task(metrics_server.start())
+        else:
+            metrics_server = previous.metrics_server
+            metrics_server.collectors.clear()
+        metrics_server.collectors.append(ExchangeMetricsCollector(controller, competitor_manager, market_events_reader,
+                                                                  match_events_writer, score_board_writer,
+                                                                  info_publisher))
+        controller.metrics_server = metrics_server
+
     app.event_loop.create_task(controller.start())
     return controller
 
 
-def main():
+def main(ready_event: Optional[Any] = None, competitors: Optional[Iterable[str]] = None):
+    """Run the exchange simulator.
+
+    If a ready event (such as a multiprocessing Event) is given, it is set
+    once the exchange is accepting auto-trader connections. If competitors
+    are named, each match waits for them to log in instead of the teams in
+    the Traders section.
+
+    If the Engine configuration lists Matches, they are run one after
+    another in the same process.
+    """
     app = Application("exchange", __exchange_config_validator)
-    controller: Controller = setup(app)
-    app.run()
-    controller.cleanup()
+    controller: Optional[Controller] = None
+    try:
+        for config in __match_configs(app.config):
+            controller = setup(app, config, controller, competitors)
+            if ready_event is not None:
+                controller.exchange_ready.append(ready_event.set)
+            app.run_until_stopped()
+            controller.cleanup()
+            if app.interrupted:
+                break
+    finally:
+        app.close()
+    latency.log_histograms()
+    tracing.stop_tracing()
@@ -17,52 +17,86 @@
 #     <https://www.gnu.org/licenses/>.
 import asyncio
 import logging
+import socket
+import sys
+import time
 
 from typing import Optional
 
+from . import latency
 from .competitor import Competitor, CompetitorManager
-from .limiter import FrequencyLimiter, FrequencyLimiterFactory
+from .limiter import BaseFrequencyLimiter, FrequencyLimiterFactory
 from .messages import (AMEND_MESSAGE, AMEND_MESSAGE_SIZE, CANCEL_MESSAGE, CANCEL_MESSAGE_SIZE,
                        ERROR_MESSAGE, ERROR_MESSAGE_SIZE, HEADER, HEADER_SIZE, HEDGE_FILLED_MESSAGE,
                        HEDGE_FILLED_MESSAGE_SIZE, HEDGE_MESSAGE, HEDGE_MESSAGE_SIZE, INSERT_MESSAGE,
-                       INSERT_MESSAGE_SIZE, LOGIN_MESSAGE, LOGIN_MESSAGE_SIZE, ORDER_FILLED_MESSAGE,
-                       ORDER_FILLED_MESSAGE_SIZE, ORDER_STATUS_MESSAGE, ORDER_STATUS_MESSAGE_SIZE,
+                       INSERT_MESSAGE_SIZE, LOGIN_MESSAGE, LOGIN_MESSAGE_SIZE, MASS_CANCEL_MESSAGE,
+                       MASS_CANCEL_MESSAGE_SIZE, MASS_QUOTE_MESSAGE, MASS_QUOTE_MESSAGE_SIZE, ORDER_FILLED_MESSAGE,
+                       ORDER_FILLED_MESSAGE_SIZE, ORDER_FILL_STATUS_MESSAGE, ORDER_FILL_STATUS_MESSAGE_SIZE,
+                       ORDER_STATUS_MESSAGE, ORDER_STATUS_MESSAGE_SIZE, REPLACE_MESSAGE, REPLACE_MESSAGE_SIZE,
                        Connection, MessageType)
+from .timer_wheel import TimerWheel, TimerWheelEntry
 from .types import IController, IExecutionConnection
 
+LISTEN_BACKLOG = 100
+
+LOGIN_TIMEOUT = 1.0
+
 
 class ExecutionConnection(Connection, IExecutionConnection):
-    def __init__(self, competitor_manager: CompetitorManager, frequency_limiter: FrequencyLimiter,
-                 controller: IController):
-        """Initialise a new instance of the ExecutionChannel class."""
+    def __init__(self, competitor_manager: CompetitorManager, frequency_limiter: BaseFrequencyLimiter,
+                 controller: IController, timer_wheel: TimerWheel, aggregate_fills: bool = False):
+        """Initialise a new instance of the ExecutionChannel class.
+
+        If aggregate_fills is True, each fill is reported with a single order
+        fill status message and messages sent during one iteration of the
+        event loop are coalesced into a single write.
+        """
         Connection.__init__(self)
 
+        self.aggregate_fills: bool = aggregate_fills
         self.competitor: Optional[Competitor] = None
         self.competitor_manager: CompetitorManager = competitor_manager
         self.controller: IController = controller
         self.closing: bool = False
-        self.frequency_limiter: FrequencyLimiter = frequency_limiter
+        self.frequency_limiter: BaseFrequencyLimiter = frequency_limiter
         self.logger: logging.Logger = logging.getLogger("EXECUTION")
-        self.login_timeout: asyncio.Handle = asyncio.get_running_loop().call_later(1.0, self.close)
+        self.login_timeout: TimerWheelEntry = TimerWheelEntry(self.close)
+        self.timer_wheel: TimerWheel = timer_wheel
+
+        timer_wheel.schedule(self.login_timeout, LOGIN_TIMEOUT)
 
         self.__error_message = bytearray(ERROR_MESSAGE_SIZE)
         self.__hedge_filled_message = bytearray(HEDGE_FILLED_MESSAGE_SIZE)
         self.__order_status_message = bytearray(ORDER_STATUS_MESSAGE_SIZE)
         self.__order_filled_message = bytearray(ORDER_FILLED_MESSAGE_SIZE)
+        self.__order_fill_status_message = bytearray(ORDER_FILL_STATUS_MESSAGE_SIZE)
+        self.__write_buffer: bytearray = bytearray()
 
         HEADER.pack_into(self.__error_message, 0, ERROR_MESSAGE_SIZE, MessageType.ERROR)
         HEADER.pack_into(self.__hedge_filled_message, 0, HEDGE_FILLED_MESSAGE_SIZE, MessageType.HEDGE_FILLED)
         HEADER.pack_into(self.__order_status_message, 0, ORDER_STATUS_MESSAGE_SIZE, MessageType.ORDER_STATUS)
         HEADER.pack_into(self.__order_filled_message, 0, ORDER_FILLED_MESSAGE_SIZE, MessageType.ORDER_FILLED)
+        HEADER.pack_into(self.__order_fill_status_message, 0, ORDER_FILL_STATUS_MESSAGE_SIZE,
+                         MessageType.ORDER_FILL_STATUS)
+
+        self.__write = self.__buffer_write if aggregate_fills else self.__direct_write
+
+        self.__message_latency = {t: latency.get_histogram("Message." + t.name)
+                                  for t in (MessageType.AMEND_ORDER, MessageType.CANCEL_ORDER, MessageType.HEDGE_ORDER,
+                                            MessageType.INSERT_ORDER, MessageType.MASS_QUOTE, MessageType.MASS_CANCEL,
+                                            MessageType.REPLACE_ORDER)}
+        self.__write_latency = latency.get_histogram("Stage.SocketWrite")
+        self.__latency_enabled: bool = latency.is_enabled()
 
     def __del__(self):
         """Clean up this instance of the ExecutionChannel class."""
-        self.login_timeout.cancel()
+        self.timer_wheel.cancel(self.login_timeout)
 
     def close(self):
         """Close the connection associated with this ExecutionChannel instance."""
+        self.__flush()
         Connection.close(self)
-        self.login_timeout.cancel()
+        self.timer_wheel.cancel(self.login_timeout)
         self.closing = True
         if self._connection_transport and not self._connection_transport.is_closing():
             self._connection_transport.close()
@@ -71,7 +105,8 @@ class ExecutionConnection(Connection, IExecutionConnection):
         """Called when the connection to the auto-trader is lost."""
         Connection.connection_lost(self, exc)
 
-        self.login_timeout.cancel()
+        self.__write_buffer.clear()
+        self.timer_wheel.cancel(self.login_timeout)
         if self.competitor is not None:
             self.competitor.on_connection_lost(self.controller.advance_time())
         self.competitor_manager.on_competitor_disconnect()
@@ -85,11 +120,13 @@ class ExecutionConnection(Connection, IExecutionConnection):
 
     def on_message(self, typ: int, data: bytes, start: int, length: int) -> None:
         """Called when a message is received from the auto-trader."""
+        received = time.perf_counter_ns() if self.__latency_enabled else 0
         now: float = self.controller.advance_time()
 
         if self.frequency_limiter.check_event(now):
             self.logger.info("fd=%d message frequency limit breached: now=%.6f value=%d limit=%d",
                              self._file_number, now, self.frequency_limiter.value, self.frequency_limiter.limit)
+            self.competitor_manager.on_frequency_limit_breached()
             if self.competitor is not None:
                 self.competitor.hard_breach(now, 0, b"message frequency limit breached")
             else:
@@ -113,6 +150,12 @@ class ExecutionConnection(Connection, IExecutionConnection):
             self.competitor.on_hedge_message(now, *HEDGE_MESSAGE.unpack_from(data, start))
         elif typ == MessageType.INSERT_ORDER and length == INSERT_MESSAGE_SIZE:
             self.competitor.on_insert_message(now, *INSERT_MESSAGE.unpack_from(data, start))
+        elif typ == MessageType.MASS_QUOTE and length == MASS_QUOTE_MESSAGE_SIZE:
+            self.competitor.on_mass_quote_message(now, *MASS_QUOTE_MESSAGE.unpack_from(data, start))
+        elif typ == MessageType.MASS_CANCEL and length == MASS_CANCEL_MESSAGE_SIZE:
+            self.competitor.on_mass_cancel_message(now, *MASS_CANCEL_MESSAGE.unpack_from(data, start))
+        elif typ == MessageType.REPLACE_ORDER and length == REPLACE_MESSAGE_SIZE:
+            self.competitor.on_replace_message(now, *REPLACE_MESSAGE.unpack_from(data, start))
         else:
             if typ == MessageType.LOGIN:
                 self.logger.info("fd=%d received second login message: time=%.6f name='%s'", self._file_number,
@@ -121,10 +164,38 @@ class ExecutionConnection(Connection, IExecutionConnection):
                 self.logger.info("fd=%d '%s' received invalid message: time=%.6f length=%d type=%d",
                                  self._file_number, self.competitor.name, now, length, typ)
             self.close()
+            return
+
+        self.competitor.messages_received += 1
+        if self.__latency_enabled:
+            self.__message_latency[typ].record(time.perf_counter_ns() - received)
+
+    def __buffer_write(self, message: bytearray) -> None:
+        """Append a message to the write buffer, which is flushed at the end of this loop iteration."""
+        if not self.__write_buffer:
+            asyncio.get_running_loop().call_soon(self.__flush)
+        self.__write_buffer += message
+
+    def __direct_write(self, message: bytearray) -> None:
+        """Write a message to the transport immediately."""
+        start = time.perf_counter_ns() if self.__latency_enabled else 0
+        self._connection_transport.write(message)
+        if self.__latency_enabled:
+            self.__write_latency.record(time.perf_counter_ns() - start)
+
+    def __flush(self) -> None:
+        """Write any buffered messages to the transport."""
+        if self.__write_buffer:
+            if self._connection_transport is not None and not self._connection_transport.is_closing():
+                start = time.perf_counter_ns() if self.__latency_enabled else 0
+                self._connection_transport.write(self.__write_buffer)
+                if self.__latency_enabled:
+                    self.__write_latency.record(time.perf_counter_ns() - start)
+            self.__write_buffer.clear()
 
     def on_login(self, name: str, secret: str) -> None:
         """Called when a login message is received."""
-        self.login_timeout.cancel()
+        self.timer_wheel.cancel(self.login_timeout)
 
         self.competitor = self.competitor_manager.login_competitor(name, secret, self)
         if self.competitor is None:
@@ -137,31 +208,49 @@ class ExecutionConnection(Connection, IExecutionConnection):
     def send_error(self, client_order_id: int, error_message: bytes) -> None:
         """Send an error message to the auto-trader."""
         ERROR_MESSAGE.pack_into(self.__error_message, HEADER_SIZE, client_order_id, error_message)
-        self._connection_transport.write(self.__error_message)
+        self.__write(self.__error_message)
 
     def send_hedge_filled(self, client_order_id: int, average_price: int, volume: int) -> None:
         """Send a hedge filled message to the auto-trader."""
         HEDGE_FILLED_MESSAGE.pack_into(self.__hedge_filled_message, HEADER_SIZE, client_order_id, average_price,
                                        volume)
-        self._connection_transport.write(self.__hedge_filled_message)
+        self.__write(self.__hedge_filled_message)
 
     def send_order_filled(self, client_order_id: int, price: int, volume: int) -> None:
         """Send an order filled message to the auto-trader."""
         ORDER_FILLED_MESSAGE.pack_into(self.__order_filled_message, HEADER_SIZE, client_order_id, price, volume)
-        self._connection_transport.write(self.__order_filled_message)
+        self.__write(self.__order_filled_message)
+
+    def send_order_fill(self, client_order_id: int, price: int, volume: int, fill_volume: int,
+                        remaining_volume: int, fees: int) -> None:
+        """Send order filled and order status messages to the auto-trader."""
+        if self.aggregate_fills:
+            ORDER_FILL_STATUS_MESSAGE.pack_into(self.__order_fill_status_message, HEADER_SIZE, client_order_id,
+                                                price, volume, fill_volume, remaining_volume, fees)
+            self.__write(self.__order_fill_status_message)
+        else:
+            self.send_order_filled(client_order_id, price, volume)
+            self.send_order_status(client_order_id, fill_volume, remaining_volume, fees)
 
     def send_order_status(self, client_order_id: int, fill_volume: int, remaining_volume: int, fees: int) -> None:
         """Send an order status message to the auto-trader."""
         ORDER_STATUS_MESSAGE.pack_into(self.__order_status_message, HEADER_SIZE, client_order_id, fill_volume,
                                        remaining_volume, fees)
-        self._connection_transport.write(self.__order_status_message)
+        self.__write(self.__order_status_message)
 
 
 class ExecutionServer:
-    """A server for execution connections."""
+    """A server for execution connections.
+
+    The listening socket is bound when the server first starts and remains
+    open until the process exits, so that the server can be closed at the
+    end of one match and started again for the next while auto-traders'
+    connection attempts wait in the socket's backlog.
+    """
     def __init__(self, host: str, port: int, competitor_manager: CompetitorManager,
-                 limiter_factory: FrequencyLimiterFactory):
+                 limiter_factory: FrequencyLimiterFactory, timer_wheel: TimerWheel, aggregate_fills: bool = False):
         """Initialise a new instance of the ExecutionServer class."""
+        self.aggregate_fills: bool = aggregate_fills
         self.controller: Optional[IController] = None
         self.host: str = host
         self.port: int = port
@@ -170,16 +259,37 @@ class ExecutionServer:
         self.__limiter_factory: FrequencyLimiterFactory = limiter_factory
         self.__logger = logging.getLogger("EXECUTION")
         self.__server: Optional[asyncio.AbstractServer] = None
+        self.__socket: Optional[socket.socket] = None
+        self.__timer_wheel: TimerWheel = timer_wheel
 
     def close(self):
-        """Close the server without affecting existing connections."""
-        self.__server.close()
+        """Stop accepting connections without affecting existing connections."""
+        if self.__server is not None:
+            # The server closes a duplicate of the listening socket, which stays bound
+            self.__server.close()
+            self.__server = None
 
     def __on_new_connection(self) -> ExecutionConnection:
         """Callback for when a new connection is accepted."""
-        return ExecutionConnection(self.__competitor_manager, self.__limiter_factory.create(), self.controller)
+        return ExecutionConnection(self.__competitor_manager, self.__limiter_factory.create(), self.controller,
+                                   self.__timer_wheel, self.aggregate_fills)
+
+    def reset(self, competitor_manager: CompetitorManager, limiter_factory: FrequencyLimiterFactory,
+              timer_wheel: TimerWheel) -> None:
+        """Give connections accepted from now on to the competitor manager of a new match."""
+        self.__competitor_manager = competitor_manager
+        self.__limiter_factory = limiter_factory
+        self.__timer_wheel = timer_wheel
 
     async def start(self) -> None:
-        """Start the server."""
-        self.__logger.info("starting execution server: host=%s port=%d", self.host, self.port)
-        self.__server = await asyncio.get_running_loop().create_server(self.__on_new_connection, self.host, self.port)
+        """Start accepting connections."""
+        if self.__socket is None:
+            self.__logger.info("starting execution server: host=%s port=%d", self.host, self.port)
+            self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            if sys.platform != "win32":
+                self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.__socket.bind((self.host, self.port))
+            self.__socket.listen(LISTEN_BACKLOG)
+        if self.__server is None:
+            self.__server = await asyncio.get_running_loop().create_server(self.__on_new_connection,
+                                                                           sock=self.__socket.dup())
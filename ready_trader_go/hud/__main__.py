@@ -100,13 +100,14 @@ def __validate_configuration(filename: pathlib.Path, config: Mapping[str, Any])
     return True
 
 
-def replay(path: pathlib.Path):
+def replay(path: pathlib.Path, speed: float = 1.0):
     app = __create_application()
     splash = __show_splash()
     splash.showMessage("Processing %s..." % str(path), Qt.AlignBottom, QtGui.QColor("#F0F0F0"))
     etf_clamp, tick_size = __read_exchange_config()
     with path.open("r", newline="") as csv_file:
         event_source = RecordedEventSource.from_csv(csv_file, etf_clamp, tick_size)
+    event_source.set_speed(speed)
     window = __show_main_window(splash, event_source)
     return app.exec_()
 
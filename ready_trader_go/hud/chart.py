@@ -15,10 +15,7 @@
 #     You should have received a copy of the GNU Affero General Public
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
-import collections
-import sys
-
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from PySide2 import QtCore, QtGui, QtWidgets
 from PySide2.QtCharts import QtCharts
@@ -26,11 +23,20 @@ from PySide2.QtCore import Qt
 
 from ready_trader_go.types import Instrument
 
+from .chart_data import SeriesBuffer
+
 CHART_DURATION: float = 60.0
+REDRAW_INTERVAL_MILLISECONDS: int = 100
 
 
 class BaseChartGadget(QtWidgets.QWidget):
-    """A generic chart widget."""
+    """A generic chart widget.
+
+    Points are collected in a bounded buffer per series and the chart is
+    redrawn periodically with each series reduced to roughly two points per
+    pixel of the plot area, so the cost of a redraw does not depend on how
+    many points have been received.
+    """
 
     def __init__(self, parent: Optional[QtWidgets.QWidget] = None, flags: Qt.WindowFlags = Qt.Widget):
         """Initialise a new instance of the class."""
@@ -62,9 +68,29 @@ class BaseChartGadget(QtWidgets.QWidget):
         self.chart.addAxis(y_axis, QtCore.Qt.AlignLeft)
         self._style_axes()
 
-        self._largest_y_value: float = 0.0
-        self._smallest_y_value: float = sys.float_info.max
-        self.__x_axis_maximum: float = 0.0
+        self.__dirty: bool = False
+        self.__latest_time: float = 0.0
+        self.__series: List[Tuple[QtCharts.QLineSeries, SeriesBuffer]] = list()
+
+        self.__redraw_timer = QtCore.QTimer(self)
+        self.__redraw_timer.timeout.connect(self.__redraw)
+        self.__redraw_timer.start(REDRAW_INTERVAL_MILLISECONDS)
+
+    def _add_series(self, line_series: QtCharts.QLineSeries) -> SeriesBuffer:
+        """Add a line series to the chart and return the buffer that holds its points."""
+        self.chart.addSeries(line_series)
+        line_series.attachAxis(self.chart.axisX())
+        line_series.attachAxis(self.chart.axisY())
+        buffer = SeriesBuffer()
+        self.__series.append((line_series, buffer))
+        return buffer
+
+    def _append_point(self, buffer: SeriesBuffer, time: float, value: float) -> None:
+        """Append a point to the given series buffer."""
+        buffer.append(time, value)
+        if time > self.__latest_time:
+            self.__latest_time = time
+        self.__dirty = True
 
     def _style_axes(self):
         """Apply the common style elements to the chart axes."""
@@ -74,21 +100,28 @@ class BaseChartGadget(QtWidgets.QWidget):
         chart.axisY().setLabelFormat("%.2f")
         chart.axisY().setLabelsColor(chart.legend().labelColor())
 
-    def _scroll_x_axis(self, time: float) -> None:
-        """Scroll the the x-axis to the given time."""
-        if time > self.__x_axis_maximum:
-            scroll_distance: float = time - self.__x_axis_maximum
-            self.__x_axis_maximum += scroll_distance
-            self.chart.scroll(scroll_distance * self.chart.plotArea().width() / CHART_DURATION, 0)
+    def __redraw(self) -> None:
+        """Redraw the visible part of each series and rescale the axes."""
+        if not self.__dirty:
+            return
+        self.__dirty = False
+
+        end: float = self.__latest_time
+        start: float = end - CHART_DURATION
+        bucket_count: int = max(int(self.chart.plotArea().width()), 1)
 
-    def _update_y_axis(self, new_value: float) -> None:
-        """Ensure the y-axis range is large enough for the given value."""
-        if new_value < self._smallest_y_value:
-            self.chart.axisY().setMin(new_value - 0.01)
-            self._smallest_y_value = new_value
-        if new_value > self._largest_y_value:
-            self.chart.axisY().setMax(new_value + 0.01)
-            self._largest_y_value = new_value
+        smallest: Optional[float] = None
+        largest: Optional[float] = None
+        for line_series, buffer in self.__series:
+            buffer.expire(start)
+            if buffer.minimum is not None:
+                smallest = buffer.minimum if smallest is None or buffer.minimum < smallest else smallest
+                largest = buffer.maximum if largest is None or buffer.maximum > largest else largest
+            line_series.replace([QtCore.QPointF(t, v) for t, v in buffer.decimate(start, end, bucket_count)])
+
+        self.chart.axisX().setRange(start, end)
+        if smallest is not None:
+            self.chart.axisY().setRange(smallest - 0.01, largest + 0.01)
 
 
 class MidpointChartGadget(BaseChartGadget):
@@ -102,38 +135,16 @@ class MidpointChartGadget(BaseChartGadget):
 
         self.setWindowTitle("Midpoint Prices")
 
-        self.instrument_series: List[QtCharts.QSplineSeries] = [QtCharts.QSplineSeries() for _ in Instrument]
+        self.instrument_series: List[QtCharts.QLineSeries] = [QtCharts.QLineSeries() for _ in Instrument]
+        self.__buffers: List[SeriesBuffer] = list()
         for i, line_series in enumerate(self.instrument_series):
             line_series.setName(Instrument(i).name)
-            self.chart.addSeries(line_series)
-            line_series.attachAxis(self.chart.axisX())
-            line_series.attachAxis(self.chart.axisY())
+            self.__buffers.append(self._add_series(line_series))
             line_series.setColor(self._COLOURS[i])
 
-        self.__last_price: Optional[float] = None
-        self.__timer = QtCore.QTimer(self)
-        self.__timer.timeout.connect(self.__on_timer_tick)
-
-    def __on_timer_tick(self) -> None:
-        delta: float = (self._largest_y_value - self._smallest_y_value) // 8
-        if delta:
-            high_distance: float = self._largest_y_value - self.__last_price
-            low_distance: float = self.__last_price - self._smallest_y_value
-            if high_distance > low_distance:
-                self._largest_y_value -= delta
-            else:
-                self._smallest_y_value += delta
-            self.chart.axisY().setRange(self._smallest_y_value, self._largest_y_value)
-
     def on_midpoint_price_changed(self, instrument: Instrument, time: float, mid_price: float) -> None:
         """Callback when the midpoint price of an instrument changes."""
-        self._scroll_x_axis(time)
-        price = mid_price / 100.0
-        self._update_y_axis(price)
-        self.instrument_series[instrument].append(time, price)
-        self.__last_price = price
-        if not self.__timer.isActive():
-            self.__timer.start(6000)
+        self._append_point(self.__buffers[instrument], time, mid_price / 100.0)
 
 
 class ProfitLossChartGadget(BaseChartGadget):
@@ -146,20 +157,20 @@ class ProfitLossChartGadget(BaseChartGadget):
         super().__init__(parent)
 
         self.setWindowTitle("All Teams Profit or Loss")
-        self.team_series: Dict[str, QtCharts.QSplineSeries] = collections.defaultdict(QtCharts.QSplineSeries)
+        self.team_series: Dict[str, QtCharts.QLineSeries] = dict()
+        self.__buffers: Dict[str, SeriesBuffer] = dict()
 
     def on_login_occurred(self, team: str) -> None:
         """Callback when a team logs in to the exchange."""
-        line_series: QtCharts.QSplineSeries = self.team_series[team]
-        self.chart.addSeries(line_series)
-        line_series.attachAxis(self.chart.axisX())
-        line_series.attachAxis(self.chart.axisY())
+        if team in self.team_series:
+            return
+        line_series = self.team_series[team] = QtCharts.QLineSeries()
+        self.__buffers[team] = self._add_series(line_series)
         line_series.setName(team)
         line_series.setColor(self._COLOURS[(len(self.team_series) - 1) % len(self._COLOURS)])
 
     def on_profit_loss_changed(self, team: str, time: float, profit: float, etf_position: int,
                                account_balance: float, total_fees: float) -> None:
         """Callback when the profit of a team changes."""
-        self._update_y_axis(profit)
-        self.team_series[team].append(time, profit)
-        self._scroll_x_axis(time)
+        if team in self.__buffers:
+            self._append_point(self.__buffers[team], time, profit)
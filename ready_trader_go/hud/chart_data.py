@@ -0,0 +1,137 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import collections
+
+from typing import Deque, List, Optional, Tuple
+
+SERIES_CAPACITY = 4096
+
+
+class SeriesBuffer:
+    """A bounded ring of (time, value) points belonging to one chart series.
+
+    The smallest and largest values of the points since the last call to
+    expire are tracked incrementally using monotonic deques, so that axis
+    ranges never require a scan of the stored points.
+    """
+
+    def __init__(self, capacity: int = SERIES_CAPACITY):
+        """Initialise a new instance of the SeriesBuffer class."""
+        self.__times: Deque[float] = collections.deque(maxlen=capacity)
+        self.__values: Deque[float] = collections.deque(maxlen=capacity)
+
+        # Candidate extremes as (time, value) pairs. Values are increasing in
+        # the minima deque and decreasing in the maxima deque.
+        self.__maxima: Deque[Tuple[float, float]] = collections.deque()
+        self.__minima: Deque[Tuple[float, float]] = collections.deque()
+
+    def __len__(self) -> int:
+        """Return the number of points in this buffer."""
+        return len(self.__times)
+
+    @property
+    def maximum(self) -> Optional[float]:
+        """Return the largest value since the last expiry, or None."""
+        return self.__maxima[0][1] if self.__maxima else None
+
+    @property
+    def minimum(self) -> Optional[float]:
+        """Return the smallest value since the last expiry, or None."""
+        return self.__minima[0][1] if self.__minima else None
+
+    def append(self, time: float, value: float) -> None:
+        """Append a point to this buffer.
+
+        Points should be appended in time order.
+        """
+        self.__times.append(time)
+        self.__values.append(value)
+
+        maxima = self.__maxima
+        while maxima and maxima[-1][1] <= value:
+            maxima.pop()
+        maxima.append((time, value))
+
+        minima = self.__minima
+        while minima and minima[-1][1] >= value:
+            minima.pop()
+        minima.append((time, value))
+
+        # Points dropped from the ring can no longer be extremes
+        oldest: float = self.__times[0]
+        while maxima[0][0] < oldest:
+            maxima.popleft()
+        while minima[0][0] < oldest:
+            minima.popleft()
+
+    def decimate(self, start: float, end: float, bucket_count: int) -> List[Tuple[float, float]]:
+        """Return the points between start and end reduced to bucket_count buckets.
+
+        The range is divided into equally sized buckets (normally one per
+        pixel of the plot area) and the smallest and largest points of each
+        bucket are returned in time order, which preserves the visible shape
+        of the line however many points the buffer holds.
+        """
+        result: List[Tuple[float, float]] = list()
+        if not self.__times or end <= start or bucket_count < 1:
+            return result
+
+        scale: float = bucket_count / (end - start)
+        current: int = -1
+        low_time = low = high_time = high = 0.0
+
+        for time, value in zip(self.__times, self.__values):
+            if time < start or time > end:
+                continue
+            bucket: int = int((time - start) * scale)
+            if bucket != current:
+                if current >= 0:
+                    self.__emit_bucket(result, low_time, low, high_time, high)
+                current = bucket
+                low_time = high_time = time
+                low = high = value
+            elif value < low:
+                low_time, low = time, value
+            elif value > high:
+                high_time, high = time, value
+
+        if current >= 0:
+            self.__emit_bucket(result, low_time, low, high_time, high)
+
+        return result
+
+    @staticmethod
+    def __emit_bucket(result: List[Tuple[float, float]], low_time: float, low: float, high_time: float,
+                      high: float) -> None:
+        if low_time == high_time:
+            result.append((low_time, low))
+        elif low_time < high_time:
+            result.append((low_time, low))
+            result.append((high_time, high))
+        else:
+            result.append((high_time, high))
+            result.append((low_time, low))
+
+    def expire(self, start: float) -> None:
+        """Exclude points earlier than start from the tracked extremes."""
+        maxima = self.__maxima
+        while len(maxima) > 1 and maxima[0][0] < start:
+            maxima.popleft()
+        minima = self.__minima
+        while len(minima) > 1 and minima[0][0] < start:
+            minima.popleft()
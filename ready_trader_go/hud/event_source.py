@@ -39,6 +39,11 @@ __all__ = ("EventSource", "LiveEventSource", "RecordedEventSource")
 TICK_INTERVAL_MILLISECONDS = 500
 TICK_INTERVAL_SECONDS = TICK_INTERVAL_MILLISECONDS / 1000.0
 
+# Recorded matches are played back in frames, independently of the tick
+FRAME_INTERVAL_MILLISECONDS = 100
+MINIMUM_REPLAY_SPEED = 0.25
+MAXIMUM_REPLAY_SPEED = 100.0
+
 
 class EventSource(QtCore.QObject):
     """A source of events for the Ready Trader Go HUD to display."""
@@ -266,7 +271,14 @@ class Event(NamedTuple):
 
 
 class RecordedEventSource(EventSource):
-    """A source of events taken from a recording of a match."""
+    """A source of events taken from a recording of a match.
+
+    Playback can be paused, sped up and moved forward. Every order event is
+    emitted in sequence, but on each frame only the most recent snapshot of
+    order books, midpoint prices and profit or loss is emitted, so that
+    playback keeps pace with the requested speed however many snapshots
+    fall within a frame.
+    """
 
     def __init__(self, etf_clamp: float, tick_size: float, parent: Optional[QtCore.QObject] = None):
         """Initialise a new instance of the class."""
@@ -276,40 +288,104 @@ class RecordedEventSource(EventSource):
         self.__end_time: float = 0.0
         self.__events: List[Event] = list()
         self.__event_iter: Optional[Iterator] = None
+        self.__frame_timer = QtCore.QElapsedTimer()
         self.__next_event: Optional[Event] = None
         self.__now: float = 0.0
         self.__order_books: Tuple[List[int], ...] = tuple(list() for _ in Instrument)
+        self.__paused: bool = False
+        self.__snapshot_number: int = 0
+        self.__snapshots: List[List[Event]] = list()
+        self.__speed: float = 1.0
+
+    @property
+    def end_time(self) -> float:
+        """Return the time of the last snapshot in the recording."""
+        return self.__end_time
+
+    @property
+    def now(self) -> float:
+        """Return the current playback time."""
+        return self.__now
+
+    @property
+    def paused(self) -> bool:
+        """Return True if playback is paused."""
+        return self.__paused
+
+    @property
+    def speed(self) -> float:
+        """Return the playback speed multiplier."""
+        return self.__speed
+
+    def pause(self) -> None:
+        """Pause playback."""
+        self.__paused = True
+
+    def resume(self) -> None:
+        """Resume playback after a pause."""
+        if self.__paused:
+            self.__paused = False
+            self.__frame_timer.restart()
+
+    def seek(self, when: float) -> None:
+        """Move playback forward to the given time.
+
+        Recorded events are cumulative, so playback cannot be moved backward.
+        """
+        if self.__event_iter is not None and when > self.__now:
+            self.__advance(min(when, self.__end_time))
+
+    def set_speed(self, speed: float) -> None:
+        """Set the playback speed multiplier."""
+        self.__speed = min(max(speed, MINIMUM_REPLAY_SPEED), MAXIMUM_REPLAY_SPEED)
+
+    def __advance(self, now: float) -> None:
+        """Emit the events up to the given time and the latest snapshot."""
+        self.__now = now
 
-    def _on_timer_tick(self):
-        """Callback when the timer ticks."""
-        now = self.__now = self.__now + TICK_INTERVAL_SECONDS
-
-        if self.__next_event.when <= now:
-            self.__next_event.emitter(*self.__next_event.args)
-            event: Optional[Event] = None
+        event: Optional[Event] = self.__next_event
+        if event is not None and event.when <= now:
+            event.emitter(*event.args)
+            event = None
             for event in self.__event_iter:
                 if event.when > now:
                     break
                 event.emitter(*event.args)
+            else:
+                event = None
             self.__next_event = event
 
-        tick = int(now // TICK_INTERVAL_SECONDS)
-        for i in Instrument:
-            if len(self.__order_books[i]) >= (tick + 1) * 4 * TOP_LEVEL_COUNT:
-                data = (self.__order_books[i][j * TOP_LEVEL_COUNT:(j + 1) * TOP_LEVEL_COUNT]
-                        for j in range(tick * 4, (tick + 1) * 4))
-                self.order_book_changed.emit(i, now, *data)
+        # Only the latest snapshot is shown, any others are skipped
+        snapshot_number = min(int(now // TICK_INTERVAL_SECONDS), len(self.__snapshots))
+        if snapshot_number > self.__snapshot_number:
+            self.__snapshot_number = snapshot_number
+            for event in self.__snapshots[snapshot_number - 1]:
+                event.emitter(*event.args)
+
+            first: int = (snapshot_number - 1) * 4
+            for i in Instrument:
+                if len(self.__order_books[i]) >= (first + 4) * TOP_LEVEL_COUNT:
+                    data = (self.__order_books[i][j * TOP_LEVEL_COUNT:(j + 1) * TOP_LEVEL_COUNT]
+                            for j in range(first, first + 4))
+                    self.order_book_changed.emit(i, now, *data)
 
-        if self.__now >= self.__end_time:
+        if now >= self.__end_time and self._timer.isActive():
             self._timer.stop()
             self.match_over.emit()
 
+    def _on_timer_tick(self):
+        """Callback when the timer ticks."""
+        elapsed: float = self.__frame_timer.restart() / 1000.0
+        if not self.__paused:
+            self.__advance(self.__now + elapsed * self.__speed)
+
     @staticmethod
     def from_csv(file_object: TextIO, etf_clamp: float, tick_size: float,
                  parent: Optional[QtCore.QObject] = None):
         """Create a new RecordedEventSource instance from a CSV file."""
         source = RecordedEventSource(etf_clamp, tick_size, parent)
         events = source.__events
+        snapshots = source.__snapshots
 
         reader = csv.reader(file_object)
         next(reader)  # Skip header
@@ -324,8 +400,9 @@ class RecordedEventSource(EventSource):
         bid_volumes = [0] * TOP_LEVEL_COUNT
 
         def take_snapshot(when: float):
+            snapshot: List[Event] = list()
             for i in Instrument:
-                events.append(Event(when, source.midpoint_price_changed.emit, (i, when, books[i].midpoint_price())))
+                snapshot.append(Event(when, source.midpoint_price_changed.emit, (i, when, books[i].midpoint_price())))
                 books[i].top_levels(ask_prices, ask_volumes, bid_prices, bid_volumes)
                 source.__order_books[i].extend(itertools.chain(ask_prices, ask_volumes, bid_prices, bid_volumes))
 
@@ -334,16 +411,17 @@ class RecordedEventSource(EventSource):
             if future_price is not None and etf_price is not None:
                 for team, account in accounts.items():
                     account.update(future_price, etf_price)
-                    events.append(Event(when, source.profit_loss_changed.emit,
-                                        (team, when, account.profit_or_loss / 100.0, account.etf_position,
-                                         account.future_position, account.account_balance / 100.0,
-                                         account.total_fees / 100.0)))
+                    snapshot.append(Event(when, source.profit_loss_changed.emit,
+                                          (team, when, account.profit_or_loss / 100.0, account.etf_position,
+                                           account.future_position, account.account_balance / 100.0,
+                                           account.total_fees / 100.0)))
+            snapshots.append(snapshot)
 
         now: float = TICK_INTERVAL_SECONDS
         for row in reader:
             tm = float(row[0])
 
-            if tm > now:
+            while tm > now:
                 take_snapshot(now)
                 now += TICK_INTERVAL_SECONDS
 
@@ -395,7 +473,9 @@ class RecordedEventSource(EventSource):
     def start(self) -> None:
         """Start this recorded event source."""
         self.__now = 0.0
-        self._timer.start(TICK_INTERVAL_MILLISECONDS)
+        self.__snapshot_number = 0
+        self.__frame_timer.start()
+        self._timer.start(FRAME_INTERVAL_MILLISECONDS)
         self.__event_iter = iter(self.__events)
         self.__next_event = next(self.__event_iter, None)
         for competitor in sorted(self.__teams):
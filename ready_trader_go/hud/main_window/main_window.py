@@ -25,13 +25,15 @@ from ready_trader_go.hud.table_gadget import BasicPriceLadderGadget, PerTeamTabl
 from ready_trader_go.hud.table_model import (ActiveOrderTableModel, BasicPriceLadderModel,
                                              ProfitLossTableModel, TradeHistoryTableModel, PriceLadderModel,
                                              TeamLadderVolumes)
-from ready_trader_go.hud.event_source import EventSource
+from ready_trader_go.hud.event_source import EventSource, RecordedEventSource
 from ready_trader_go.hud.chart import MidpointChartGadget, ProfitLossChartGadget
 
 from .ui_main_window import Ui_main_window
 
 
 TICK_SIZE: int = 100
+REPLAY_SPEEDS = (1.0, 2.0, 5.0, 10.0, 25.0, 50.0, 100.0)
+REPLAY_SKIP_SECONDS: float = 60.0
 
 
 class SubWindowEventFilter(QtCore.QObject):
@@ -62,9 +64,9 @@ class MainWindow(Ui_main_window, QtWidgets.QMainWindow):
 
         self.setWindowTitle("Ready Trader Go")
         self.setWindowIcon(icon)
-        self.__setup_menus()
 
         self.event_source: EventSource = event_source
+        self.__setup_menus()
         event_source.setParent(self)
         event_source.event_source_error_occurred.connect(self.__on_event_source_error_occurred)
         event_source.login_occurred.connect(self.__on_login_occurred)
@@ -260,6 +262,33 @@ class MainWindow(Ui_main_window, QtWidgets.QMainWindow):
         self.profit_loss_chart_action.setStatusTip("Reopen the profit or loss chart")
         self.profit_loss_chart_action.triggered.connect(self.__show_profit_loss_chart)
 
+        if isinstance(self.event_source, RecordedEventSource):
+            self.__setup_replay_menu(self.event_source)
+
+    def __setup_replay_menu(self, event_source: RecordedEventSource) -> None:
+        """Setup the menu used to control the playback of a recorded match."""
+        replay_menu: QtWidgets.QMenu = self.menubar.addMenu("Re&play")
+
+        pause_action: QtWidgets.QAction = replay_menu.addAction("&Pause")
+        pause_action.setCheckable(True)
+        pause_action.setShortcut("Space")
+        pause_action.setStatusTip("Pause or resume the replay")
+        pause_action.toggled.connect(lambda paused: event_source.pause() if paused else event_source.resume())
+
+        skip_action: QtWidgets.QAction = replay_menu.addAction("S&kip Forward %d Seconds" % REPLAY_SKIP_SECONDS)
+        skip_action.setShortcut("Ctrl+Right")
+        skip_action.setStatusTip("Move the replay forward")
+        skip_action.triggered.connect(lambda: event_source.seek(event_source.now + REPLAY_SKIP_SECONDS))
+
+        replay_menu.addSeparator()
+        speed_group = QtWidgets.QActionGroup(replay_menu)
+        for speed in REPLAY_SPEEDS:
+            speed_action: QtWidgets.QAction = replay_menu.addAction("%g\u00d7 Speed" % speed)
+            speed_action.setCheckable(True)
+            speed_action.setChecked(speed == event_source.speed)
+            speed_action.setActionGroup(speed_group)
+            speed_action.triggered.connect(lambda _=False, s=speed: event_source.set_speed(s))
+
     def __setup_models(self) -> None:
         """Setup the data models."""
         self.__etf_model = PriceLadderModel(Instrument.ETF, TICK_SIZE)
@@ -17,7 +17,7 @@
 #     <https://www.gnu.org/licenses/>.
 import collections
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from PySide2 import QtCore, QtGui
 from PySide2.QtCore import Qt
@@ -27,6 +27,9 @@ from ready_trader_go.types import Instrument, Lifespan, Side
 _ALIGN_CENTER_LEFT = int(Qt.AlignLeft) | int(Qt.AlignVCenter)
 _ALIGN_CENTER_RIGHT = int(Qt.AlignRight) | int(Qt.AlignVCenter)
 
+# Changes to the per-team tables are accumulated and applied at this interval
+_REFRESH_INTERVAL_MILLISECONDS = 100
+
 
 class BaseTableModel(QtCore.QAbstractTableModel):
     """Base data model for table."""
@@ -40,6 +43,11 @@ class BaseTableModel(QtCore.QAbstractTableModel):
         super().__init__(parent)
         self._row_count: int = 0
 
+        self.__refresh_timer = QtCore.QTimer(self)
+        self.__refresh_timer.setInterval(_REFRESH_INTERVAL_MILLISECONDS)
+        self.__refresh_timer.setSingleShot(True)
+        self.__refresh_timer.timeout.connect(self._refresh)
+
     def columnCount(self, parent: Optional[QtCore.QModelIndex] = None) -> int:
         """Return the number of columns."""
         return len(self._COLUMN_NAMES) if parent is None or not parent.isValid() else 0
@@ -65,6 +73,14 @@ class BaseTableModel(QtCore.QAbstractTableModel):
         """Return the number of rows."""
         return self._row_count if parent is None or not parent.isValid() else 0
 
+    def _refresh(self) -> None:
+        """Apply pending changes and emit the corresponding model signals."""
+
+    def _schedule_refresh(self) -> None:
+        """Arrange for pending changes to be applied on the next refresh."""
+        if not self.__refresh_timer.isActive():
+            self.__refresh_timer.start()
+
 
 class ActiveOrderTableModel(BaseTableModel):
     """Data model for the per-team active orders table."""
@@ -85,29 +101,83 @@ class ActiveOrderTableModel(BaseTableModel):
         """Initialise a new instance of the class."""
         super().__init__(parent)
         self.team: str = team
-        self.__orders: List[List[str, int, str, str, int, str]] = list()
+
+        # Rows are displayed in reverse order of storage, so new rows appear
+        # at the top. Each order id maps to the position of its row in the
+        # stored list, so that updates and removals do not need to search the
+        # table. A removed row is replaced by the row at the top, so rows are
+        # only roughly in time order.
+        self.__rows: List[List] = list()
+        self.__positions: Dict[int, int] = dict()
+
+        # Changes waiting for the next refresh
+        self.__changed_order_ids: Set[int] = set()
+        self.__new_rows: Dict[int, List] = dict()
+        self.__removed_order_ids: Set[int] = set()
 
     def data(self, index: QtCore.QModelIndex, role: int = Qt.DisplayRole) -> Any:
         """Return information about a specified table cell."""
         if role == Qt.DisplayRole:
-            return self.__orders[self._row_count - index.row() - 1][index.column()]
+            return self.__rows[self._row_count - index.row() - 1][index.column()]
         return super().data(index, role)
 
-    def __remove_row(self, row: int) -> None:
-        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
-        self._row_count -= 1
-        self.__orders.pop(row)
+    def _refresh(self) -> None:
+        """Apply pending removals, volume changes and insertions."""
+        for order_id in self.__removed_order_ids:
+            self.__remove_row(self.__positions.pop(order_id))
+        self.__removed_order_ids.clear()
+
+        changed: List[int] = [self.__positions[i] for i in self.__changed_order_ids if i in self.__positions]
+        self.__changed_order_ids.clear()
+        if changed:
+            first: int = self._row_count - max(changed) - 1
+            last: int = self._row_count - min(changed) - 1
+            self.dataChanged.emit(self.createIndex(first, self._VOLUME_COLUMN),
+                                  self.createIndex(last, self._VOLUME_COLUMN))
+
+        if self.__new_rows:
+            self.beginInsertRows(QtCore.QModelIndex(), 0, len(self.__new_rows) - 1)
+            for order_id, row in self.__new_rows.items():
+                self.__positions[order_id] = len(self.__rows)
+                self.__rows.append(row)
+            self._row_count = len(self.__rows)
+            self.endInsertRows()
+            self.__new_rows.clear()
+
+    def __remove_row(self, position: int) -> None:
+        """Remove the row at the given position by moving the top row into its place."""
+        last: int = self._row_count - 1
+        # Removing the top row leaves every other row at the same displayed index
+        self.beginRemoveRows(QtCore.QModelIndex(), 0, 0)
+        row: List = self.__rows.pop()
+        if position != last:
+            self.__rows[position] = row
+            self.__positions[row[self._ORDER_ID_COLUMN]] = position
+        self._row_count = last
         self.endRemoveRows()
+        if position != last:
+            displayed: int = last - position - 1
+            self.dataChanged.emit(self.createIndex(displayed, 0),
+                                  self.createIndex(displayed, len(self._COLUMN_NAMES) - 1))
+
+    def __remove_order(self, order_id: int) -> None:
+        if self.__new_rows.pop(order_id, None) is None and order_id not in self.__removed_order_ids:
+            self.__removed_order_ids.add(order_id)
+            self._schedule_refresh()
 
     def __update_order_volume(self, order_id: int, volume_delta: int) -> None:
-        row = next((i for i in range(self._row_count) if self.__orders[i][self._ORDER_ID_COLUMN] == order_id), None)
-        if row is not None:
-            self.__orders[row][self._VOLUME_COLUMN] += volume_delta
-            if self.__orders[row][self._VOLUME_COLUMN] <= 0:
-                self.__remove_row(row)
-            else:
-                self.dataChanged.emit(self.createIndex(row, self._VOLUME_COLUMN),
-                                      self.createIndex(row, self._VOLUME_COLUMN))
+        row: Optional[List] = self.__new_rows.get(order_id)
+        if row is None:
+            position: Optional[int] = self.__positions.get(order_id)
+            if position is None or order_id in self.__removed_order_ids:
+                return
+            row = self.__rows[position]
+            self.__changed_order_ids.add(order_id)
+            self._schedule_refresh()
+
+        row[self._VOLUME_COLUMN] += volume_delta
+        if row[self._VOLUME_COLUMN] <= 0:
+            self.__remove_order(order_id)
 
     def on_order_amended(self, team: str, _: float, order_id: int, volume_delta: int) -> None:
         """Callback when an order is amended."""
@@ -116,20 +186,16 @@ class ActiveOrderTableModel(BaseTableModel):
 
     def on_order_cancelled(self, team: str, now: float, order_id: int) -> None:
         """Callback when an order is cancelled."""
-        if team == self.team:
-            row = next((i for i in range(self._row_count) if self.__orders[i][self._ORDER_ID_COLUMN] == order_id), None)
-            if row is not None:
-                self.__remove_row(row)
+        if team == self.team and (order_id in self.__positions or order_id in self.__new_rows):
+            self.__remove_order(order_id)
 
     def on_order_inserted(self, team: str, now: float, order_id: int, instrument: Instrument, side: Side,
                           volume: int, price: int, _: Lifespan) -> None:
         """Callback when an order is inserted."""
         if team == self.team:
-            self.beginInsertRows(QtCore.QModelIndex(), 0, 0)
-            self._row_count += 1
-            self.__orders.append(["%.3f" % now, order_id, instrument.name, side.name.capitalize(), volume,
-                                  "%.2f" % (price / 100.0)])
-            self.endInsertRows()
+            self.__new_rows[order_id] = ["%.3f" % now, order_id, instrument.name, side.name.capitalize(), volume,
+                                         "%.2f" % (price / 100.0)]
+            self._schedule_refresh()
 
     def on_trade_occurred(self, team: str, now: float, order_id: int, side: Side, volume: int, price: int,
                           fee: int) -> None:
@@ -483,6 +549,7 @@ class TradeHistoryTableModel(BaseTableModel):
         super().__init__(parent)
         self.team: str = team
         self.__trades: List[Tuple[str, int, str, int, str, str]] = list()
+        self.__new_trades: List[Tuple[str, int, str, int, str, str]] = list()
 
     def data(self, index: QtCore.QModelIndex, role: int = Qt.DisplayRole) -> Any:
         """Return information about the specified table cell."""
@@ -490,12 +557,19 @@ class TradeHistoryTableModel(BaseTableModel):
             return self.__trades[self._row_count - index.row() - 1][index.column()]
         return super().data(index, role)
 
+    def _refresh(self) -> None:
+        """Insert the trades that occurred since the last refresh."""
+        if self.__new_trades:
+            self.beginInsertRows(QtCore.QModelIndex(), 0, len(self.__new_trades) - 1)
+            self.__trades.extend(self.__new_trades)
+            self._row_count = len(self.__trades)
+            self.endInsertRows()
+            self.__new_trades.clear()
+
     def on_trade_occurred(self, team: str, now: float, order_id: int, side: Side, volume: int, price: int,
                           fee: int) -> None:
         """Callback when a trade occurs."""
         if team == self.team:
-            self.beginInsertRows(QtCore.QModelIndex(), 0, 0)
-            self._row_count += 1
-            self.__trades.append(("%.3f" % now, order_id, ("Sell", "Buy")[side], volume, "%.2f" % (price / 100.0),
-                                  "%.2f" % (-fee / 100.0)))
-            self.endInsertRows()
+            self.__new_trades.append(("%.3f" % now, order_id, ("Sell", "Buy")[side], volume,
+                                      "%.2f" % (price / 100.0), "%.2f" % (-fee / 100.0)))
+            self._schedule_refresh()
@@ -17,9 +17,11 @@
 #     <https://www.gnu.org/licenses/>.
 import asyncio
 import logging
+import time
 
-from typing import Iterable, List, Optional, Tuple
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 
+from . import latency
 from .messages import (HEADER, HEADER_SIZE, ORDER_BOOK_HEADER, ORDER_BOOK_HEADER_SIZE,
                        ORDER_BOOK_MESSAGE, ORDER_BOOK_MESSAGE_SIZE, TRADE_TICKS_HEADER, TRADE_TICKS_HEADER_SIZE,
                        TRADE_TICKS_MESSAGE, TRADE_TICKS_MESSAGE_SIZE, MessageType)
@@ -38,12 +40,19 @@ class InformationPublisher(asyncio.DatagramProtocol):
         self.__event_loop: asyncio.AbstractEventLoop = loop
         self.__file_number: int = 0
         self.__logger: logging.Logger = logging.getLogger("INFORMATION")
+        self.messages_published: int = 0
         self.__order_books: Tuple[OrderBook] = tuple(order_books)
+        self.__publish_latency = latency.get_histogram("Stage.InformationPublish")
+        self.__trade_ticks_latency = latency.get_histogram("Stage.TradeTicksPublish")
+        self.__latency_enabled: bool = latency.is_enabled()
         self.__publisher_factory: PublisherFactory = publisher_factory
         self.__send_ticks_handles: List[Optional[asyncio.Handle]] = [None for _ in Instrument]
         self.__trade_ticks_sequences: List[int] = [1 for _ in Instrument]
         self.__transport: Optional[asyncio.WriteTransport] = None
 
+        # Signals
+        self.order_book_published: List[Callable[[Any, int, int], None]] = list()
+
         # Connect signals
         for book in self.__order_books:
             book.trade_occurred.append(self.on_trade)
@@ -66,14 +75,36 @@ class InformationPublisher(asyncio.DatagramProtocol):
         self.__logger.info("information channel established")
         self.__transport = transport
 
+    def reset(self, order_books: Iterable[OrderBook], timer: Timer) -> None:
+        """Publish the order books of a new match on each tick of its timer.
+
+        The information channel is kept, so subscribers carry on reading it
+        from where they are.
+        """
+        for handle in self.__send_ticks_handles:
+            if handle is not None:
+                handle.cancel()
+        self.__send_ticks_handles = [None for _ in Instrument]
+        self.__trade_ticks_sequences = [1 for _ in Instrument]
+        self.__order_books = tuple(order_books)
+        for book in self.__order_books:
+            book.trade_occurred.append(self.on_trade)
+        timer.timer_ticked.append(self.on_timer_tick)
+
     def on_timer_tick(self, timer: Timer, now: float, tick_number: int) -> None:
         """Called each time the timer ticks."""
+        start = time.perf_counter_ns() if self.__latency_enabled else 0
         for book in self.__order_books:
             book.top_levels(self.__ask_prices, self.__ask_volumes, self.__bid_prices, self.__bid_volumes)
             ORDER_BOOK_HEADER.pack_into(self.__book_message, HEADER_SIZE, book.instrument, tick_number)
             ORDER_BOOK_MESSAGE.pack_into(self.__book_message, ORDER_BOOK_HEADER_SIZE, *self.__ask_prices,
                                          *self.__ask_volumes, *self.__bid_prices, *self.__bid_volumes)
             self.__transport.write(self.__book_message)
+            self.messages_published += 1
+            for callback in self.order_book_published:
+                callback(self, book.instrument, tick_number)
+        if self.__latency_enabled:
+            self.__publish_latency.record(time.perf_counter_ns() - start)
 
     def on_trade(self, book: OrderBook) -> None:
         """Called when a trade occurs in one of the order books."""
@@ -84,6 +115,7 @@ class InformationPublisher(asyncio.DatagramProtocol):
         """Prepare and send trade ticks for the given order book."""
         self.__send_ticks_handles[order_book.instrument] = None
 
+        start = time.perf_counter_ns() if self.__latency_enabled else 0
         if order_book.trade_ticks(self.__ask_prices, self.__ask_volumes, self.__bid_prices, self.__bid_volumes):
             self.__trade_ticks_sequences[order_book.instrument] += 1
             TRADE_TICKS_HEADER.pack_into(self.__ticks_message, HEADER_SIZE, order_book.instrument,
@@ -91,9 +123,14 @@ class InformationPublisher(asyncio.DatagramProtocol):
             TRADE_TICKS_MESSAGE.pack_into(self.__ticks_message, TRADE_TICKS_HEADER_SIZE, *self.__ask_prices,
                                           *self.__ask_volumes, *self.__bid_prices, *self.__bid_volumes)
             self.__transport.write(self.__ticks_message)
+            self.messages_published += 1
+            if self.__latency_enabled:
+                self.__trade_ticks_latency.record(time.perf_counter_ns() - start)
 
     async def start(self) -> None:
-        """Start this publisher."""
+        """Start this publisher, unless it was started for an earlier match."""
+        if self.__transport is not None:
+            return
         typ = self.__publisher_factory.typ
         name = self.__publisher_factory.name
         self.__logger.info("starting information publisher: type=%s name=%s", typ, name)
@@ -0,0 +1,168 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import logging
+
+from typing import Dict, List, Union
+
+# Each power of two is divided into 2**(SUB_BUCKET_BITS-1) buckets, so that
+# recorded values are accurate to within 1 part in 64
+SUB_BUCKET_BITS = 7
+HALF_SUB_BUCKET_COUNT = 1 << (SUB_BUCKET_BITS - 1)
+
+REPORTED_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class LatencyHistogram(object):
+    """A histogram of durations in nanoseconds with logarithmically sized buckets.
+
+    In the manner of an HDR histogram, values are counted in buckets whose
+    width doubles with each power of two, so recording a value takes constant
+    time and the relative error of any reported percentile is bounded.
+    """
+
+    def __init__(self, name: str):
+        """Initialise a new instance of the LatencyHistogram class."""
+        self.name: str = name
+        self.count: int = 0
+        self.maximum: int = 0
+        self.minimum: int = 0
+        self.total: int = 0
+        self.__counts: List[int] = [0] * (HALF_SUB_BUCKET_COUNT * 2)
+
+    @staticmethod
+    def __bucket_index(value: int) -> int:
+        """Return the index of the bucket that counts the given value."""
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        if shift <= 0:
+            return value
+        return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+    @staticmethod
+    def __bucket_value(index: int) -> int:
+        """Return the largest value counted by the bucket with the given index."""
+        shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+        if shift <= 0:
+            return index
+        return ((index - (shift << (SUB_BUCKET_BITS - 1)) + 1) << shift) - 1
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the values recorded in another histogram to this one."""
+        if other.count == 0:
+            return
+        counts = self.__counts
+        if len(other.__counts) > len(counts):
+            counts.extend([0] * (len(other.__counts) - len(counts)))
+        for index, count in enumerate(other.__counts):
+            counts[index] += count
+        if self.count == 0 or other.minimum < self.minimum:
+            self.minimum = other.minimum
+        if other.maximum > self.maximum:
+            self.maximum = other.maximum
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, percentile: float) -> int:
+        """Return the value at the given percentile of the recorded values."""
+        if self.count == 0:
+            return 0
+        target = max(1, int(self.count * percentile / 100.0 + 0.5))
+        running = 0
+        for index, count in enumerate(self.__counts):
+            running += count
+            if running >= target:
+                return min(self.__bucket_value(index), self.maximum)
+        return self.maximum
+
+    def record(self, value: int) -> None:
+        """Record a duration in nanoseconds."""
+        if value < 0:
+            value = 0
+        index = self.__bucket_index(value)
+        counts = self.__counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        if self.count == 0 or value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        self.count += 1
+        self.total += value
+
+    def reset(self) -> None:
+        """Discard all recorded values."""
+        self.count = self.maximum = self.minimum = self.total = 0
+        self.__counts = [0] * (HALF_SUB_BUCKET_COUNT * 2)
+
+    def summary(self) -> str:
+        """Return a one line summary of this histogram in microseconds."""
+        if self.count == 0:
+            return "%s: count=0" % self.name
+        return "%s: count=%d min=%.1f mean=%.1f %s max=%.1f" % (
+            self.name, self.count, self.minimum / 1000.0, self.total / self.count / 1000.0,
+            " ".join("p%g=%.1f" % (p, self.percentile(p) / 1000.0) for p in REPORTED_PERCENTILES),
+            self.maximum / 1000.0)
+
+
+class NullLatencyHistogram(object):
+    """A histogram that discards everything recorded in it."""
+
+    def __init__(self, name: str):
+        """Initialise a new instance of the NullLatencyHistogram class."""
+        self.name: str = name
+
+    def record(self, value: int) -> None:
+        """Discard a duration."""
+        pass
+
+
+__enabled: bool = False
+__histograms: Dict[str, LatencyHistogram] = dict()
+
+
+def enable() -> None:
+    """Turn on latency recording for histograms obtained after this call."""
+    global __enabled
+    __enabled = True
+
+
+def get_histogram(name: str) -> Union[LatencyHistogram, NullLatencyHistogram]:
+    """Return the histogram with the given name, creating it if necessary.
+
+    Like loggers, histograms are shared by name. If latency recording has
+    not been enabled, a histogram that records nothing is returned.
+    """
+    if not __enabled:
+        return NullLatencyHistogram(name)
+    if name not in __histograms:
+        __histograms[name] = LatencyHistogram(name)
+    return __histograms[name]
+
+
+def is_enabled() -> bool:
+    """Return True if latency recording has been turned on."""
+    return __enabled
+
+
+def log_histograms(reset: bool = False) -> None:
+    """Log a summary of every histogram (in microseconds), optionally resetting them."""
+    logger = logging.getLogger("LATENCY")
+    for name in sorted(__histograms):
+        logger.info(__histograms[name].summary())
+        if reset:
+            __histograms[name].reset()
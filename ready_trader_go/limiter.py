@@ -18,19 +18,37 @@
 import collections
 import sys
 
-from typing import Deque
+from typing import Deque, Dict, List, Type
 
+LIMITER_BUCKET_COUNT = 100
 
-class FrequencyLimiter(object):
-    """Limit the frequency of events in a specified time interval."""
+
+class BaseFrequencyLimiter(object):
+    """Base class for limiters of the frequency of events in a time interval."""
 
     def __init__(self, interval: float, limit: int):
-        """Initialise a new instance of the FrequencyLimiter class."""
-        self.events: Deque[float] = collections.deque()
+        """Initialise a new instance of the BaseFrequencyLimiter class."""
         self.interval: float = interval
         self.limit: int = limit
         self.value: int = 0
 
+    def check_event(self, now: float) -> bool:
+        """Return True if the new event breaches the limit, False otherwise.
+
+        This method should be called with a monotonically increasing sequence
+        of times.
+        """
+        raise NotImplementedError()
+
+
+class FrequencyLimiter(BaseFrequencyLimiter):
+    """Limit the frequency of events in a specified time interval."""
+
+    def __init__(self, interval: float, limit: int):
+        """Initialise a new instance of the FrequencyLimiter class."""
+        super().__init__(interval, limit)
+        self.events: Deque[float] = collections.deque()
+
     def check_event(self, now: float) -> bool:
         """Return True if the new event breaches the limit, False otherwise.
 
@@ -52,14 +70,78 @@ class FrequencyLimiter(object):
         return self.value > self.limit
 
 
+class BucketFrequencyLimiter(BaseFrequencyLimiter):
+    """Limit the frequency of events using a ring of event counters.
+
+    The interval is divided into a fixed number of buckets, each counting the
+    events that occurred during its slice of time, so memory use does not
+    depend on the event rate. Events leave the window a whole bucket at a
+    time, so an event may be forgotten up to one bucket width earlier than it
+    would be by the FrequencyLimiter.
+
+    An event in the same bucket as the previous one is cheaper to check than
+    with the FrequencyLimiter, but moving to a later bucket clears every
+    bucket passed over. When events are sparse, most of them start a new
+    bucket and this limiter is slower than the FrequencyLimiter; it is only
+    faster when many events share a bucket.
+    """
+
+    def __init__(self, interval: float, limit: int, bucket_count: int = LIMITER_BUCKET_COUNT):
+        """Initialise a new instance of the BucketFrequencyLimiter class."""
+        super().__init__(interval, limit)
+        # As in the FrequencyLimiter, a time within rounding error of a bucket
+        # boundary is treated as being on the boundary
+        self.__buckets_per_second: float = bucket_count / interval * (1.0 + 4 * sys.float_info.epsilon)
+        self.__counts: List[int] = [0] * bucket_count
+        self.__current_bucket: int = 0
+        self.__current_count: int = 0
+
+    def check_event(self, now: float) -> bool:
+        """Return True if the new event breaches the limit, False otherwise.
+
+        This method should be called with a monotonically increasing sequence
+        of times.
+        """
+        bucket: int = int(now * self.__buckets_per_second)
+
+        if bucket != self.__current_bucket:
+            # The count for the current bucket is only stored when it is left
+            counts: List[int] = self.__counts
+            bucket_count: int = len(counts)
+            counts[self.__current_bucket % bucket_count] = self.__current_count
+            if bucket - self.__current_bucket >= bucket_count:
+                counts[:] = [0] * bucket_count
+                self.value = 0
+            else:
+                value: int = self.value
+                for b in range(self.__current_bucket + 1, bucket + 1):
+                    value -= counts[b % bucket_count]
+                    counts[b % bucket_count] = 0
+                self.value = value
+            self.__current_bucket = bucket
+            self.__current_count = 0
+
+        self.__current_count += 1
+        self.value += 1
+
+        return self.value > self.limit
+
+
+FREQUENCY_LIMITERS: Dict[str, Type[BaseFrequencyLimiter]] = {
+    "Bucket": BucketFrequencyLimiter,
+    "Deque": FrequencyLimiter,
+}
+
+
 class FrequencyLimiterFactory:
     """A factory class for FrequencyLimiters."""
 
-    def __init__(self, interval: float, limit: int):
+    def __init__(self, interval: float, limit: int, limiter_type: str = "Deque"):
         """Initialise a new instance of the FrequencyLimiterFactory class."""
         self.frequency_limit_interval: float = interval
         self.frequency_limit: int = limit
+        self.limiter_class: Type[BaseFrequencyLimiter] = FREQUENCY_LIMITERS[limiter_type]
 
-    def create(self) -> FrequencyLimiter:
-        """Return a new FrequencyLimiter instance."""
-        return FrequencyLimiter(self.frequency_limit_interval, self.frequency_limit)
+    def create(self) -> BaseFrequencyLimiter:
+        """Return a new frequency limiter instance."""
+        return self.limiter_class(self.frequency_limit_interval, self.frequency_limit)
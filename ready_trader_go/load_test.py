@@ -0,0 +1,350 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import asyncio
+import collections
+import logging
+import random
+import time
+
+from typing import Any, Counter, Dict, List, Optional, Tuple
+
+from .base_auto_trader import BaseAutoTrader
+from .latency import LatencyHistogram
+from .messages import BOOK_PART, ORDER_BOOK_HEADER, ORDER_BOOK_HEADER_SIZE, ORDER_BOOK_MESSAGE_SIZE, Connection, \
+    MessageType, Subscription
+from .order_book import MAXIMUM_ASK
+from .pubsub import SubscriberFactory
+from .types import Instrument, Lifespan, Side
+
+# The proportion of each kind of request sent by load test sessions
+DEFAULT_LOAD_TEST_MIX = {"Insert": 0.5, "Amend": 0.15, "Cancel": 0.3, "Hedge": 0.05}
+
+# The fraction of the message frequency limit at which sessions send requests
+DEFAULT_LOAD_TEST_RATE_FRACTION = 0.9
+
+# Sessions connect over this many seconds so the exchange is not flooded with logins
+LOAD_TEST_CONNECT_PERIOD = 1.0
+
+LOAD_TEST_REQUESTS = ("Insert", "Amend", "Cancel", "Hedge")
+
+
+def load_test_team_names(config: Dict[str, Any]) -> List[str]:
+    """Return the team names of the load test sessions described by a validated LoadTest section."""
+    return ["%s%d" % (config["TeamPrefix"], i + 1) for i in range(config["TeamCount"])]
+
+
+def validate_load_test_config(config: Dict[str, Any]) -> None:
+    """Raise an exception if the LoadTest section of an exchange configuration is not valid."""
+    load_test = config["LoadTest"]
+    if type(load_test) is not dict:
+        raise Exception("LoadTest configuration should be a JSON object")
+    if any(k not in load_test for k in ("TeamCount", "TeamPrefix", "Secret")):
+        raise Exception("A required key is missing from the LoadTest configuration")
+    if (type(load_test["TeamCount"]) is not int or type(load_test["TeamPrefix"]) is not str
+            or type(load_test["Secret"]) is not str):
+        raise Exception("Element of inappropriate type in LoadTest configuration")
+    if load_test["TeamCount"] < 1:
+        raise Exception("TeamCount in LoadTest configuration should be positive")
+    if not 0 < len(load_test["TeamPrefix"]) + len(str(load_test["TeamCount"])) <= 50:
+        raise Exception("TeamPrefix in LoadTest configuration is too long")
+    if not 0 < len(load_test["Secret"]) <= 50:
+        raise Exception("Secret in LoadTest configuration must be at least one, and no more than fifty, "
+                        "characters long")
+    if any(name in config["Traders"] for name in load_test_team_names(load_test)):
+        raise Exception("A LoadTest team name is also in the Traders configuration")
+
+
+def parse_load_test_mix(text: str) -> Dict[str, float]:
+    """Return the request mix described by text such as 'Insert=50,Cancel=50'."""
+    mix: Dict[str, float] = dict()
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        request = name.strip().capitalize()
+        if request not in LOAD_TEST_REQUESTS:
+            raise ValueError("unknown request type '%s'" % name)
+        mix[request] = float(weight)
+    if not mix or any(w < 0.0 for w in mix.values()) or sum(mix.values()) <= 0.0:
+        raise ValueError("request weights should be non-negative and not all zero")
+    return mix
+
+
+class MarketPrices(Subscription):
+    """The best prices in the ETF order book, shared by every session in a process."""
+
+    def __init__(self):
+        """Initialise a new instance of the MarketPrices class."""
+        super().__init__()
+        self.best_ask: int = 0
+        self.best_bid: int = 0
+
+    def on_datagram(self, typ: int, data: bytes, start: int, length: int) -> None:
+        """Called when an information message is received from the matching engine."""
+        if typ == MessageType.ORDER_BOOK_UPDATE and length == ORDER_BOOK_MESSAGE_SIZE:
+            instrument, _ = ORDER_BOOK_HEADER.unpack_from(data, start)
+            if instrument == Instrument.ETF:
+                ask_prices, _, bid_prices, _ = BOOK_PART.iter_unpack(data[ORDER_BOOK_HEADER_SIZE:])
+                self.best_ask = ask_prices[0]
+                self.best_bid = bid_prices[0]
+
+
+class LoadTestResults(object):
+    """The requests, responses and latencies of a group of load test sessions."""
+
+    def __init__(self):
+        """Initialise a new instance of the LoadTestResults class."""
+        self.disconnected: int = 0
+        self.elapsed: float = 0.0
+        self.latency: Dict[str, LatencyHistogram] = {r: LatencyHistogram(r) for r in LOAD_TEST_REQUESTS}
+        self.rejects: Counter[str] = collections.Counter()
+        self.requests: Counter[str] = collections.Counter()
+        self.responses: int = 0
+        self.sessions: int = 0
+
+    def merge(self, other: "LoadTestResults") -> None:
+        """Add the results of another group of sessions, which ran at the same time, to these."""
+        self.disconnected += other.disconnected
+        self.elapsed = max(self.elapsed, other.elapsed)
+        for request, histogram in other.latency.items():
+            self.latency[request].merge(histogram)
+        self.rejects.update(other.rejects)
+        self.requests.update(other.requests)
+        self.responses += other.responses
+        self.sessions += other.sessions
+
+    def report(self) -> str:
+        """Return a description of these results."""
+        elapsed = self.elapsed or 1.0
+        lines = ["%d sessions sent %d requests in %.1f seconds (%.0f per second); %d responses (%.0f per second)"
+                 % (self.sessions, sum(self.requests.values()), self.elapsed, sum(self.requests.values()) / elapsed,
+                    self.responses, self.responses / elapsed),
+                 "%d sessions were disconnected by the exchange" % self.disconnected,
+                 "%d requests were rejected" % sum(self.rejects.values())]
+        lines.extend("    %6d %s" % (count, reason) for reason, count in self.rejects.most_common())
+        lines.append("Latency from request to response in microseconds:")
+        lines.extend("    " + self.latency[r].summary() + " sent=%d" % self.requests[r] for r in LOAD_TEST_REQUESTS)
+        return "\n".join(lines)
+
+
+class LoadTestSession(BaseAutoTrader):
+    """A session that sends a random mix of requests to the exchange at a steady rate.
+
+    Orders are placed passively around the best prices, the position is kept
+    within half the position limit and hedges flatten the net position. The
+    time from each request to the first response to it is recorded.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, team_name: str, secret: str, prices: MarketPrices,
+                 limits: Dict[str, Any], tick_size: int, results: LoadTestResults, rng: random.Random):
+        """Initialise a new instance of the LoadTestSession class."""
+        super().__init__(loop, team_name, secret)
+        self.connected: bool = False
+
+        self.__active_volume: int = 0
+        self.__active_volume_limit: int = limits["ActiveVolumeLimit"]
+        self.__etf_position: int = 0
+        self.__future_position: int = 0
+        self.__hedges: Dict[int, Side] = dict()  # client order id -> side
+        self.__next_order_id: int = 1
+        self.__order_count_limit: int = limits["ActiveOrderCountLimit"]
+        self.__orders: Dict[int, List[int]] = dict()  # client order id -> [side, remaining volume]
+        self.__pending: Dict[int, Tuple[str, int]] = dict()  # client order id -> (request, time sent)
+        self.__position_limit: int = limits["PositionLimit"]
+        self.__prices: MarketPrices = prices
+        self.__results: LoadTestResults = results
+        self.__rng: random.Random = rng
+        self.__tick_size: int = tick_size
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Called when the execution connection is established."""
+        super().connection_made(transport)
+        self.connected = True
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """Called when the execution connection is lost."""
+        Connection.connection_lost(self, exc)
+        if not self._closing:
+            self.__results.disconnected += 1
+        self.connected = False
+
+    def __respond(self, client_order_id: int) -> None:
+        """Record the latency of the request, if any, awaiting a response for the given order."""
+        request = self.__pending.pop(client_order_id, None)
+        if request is not None:
+            self.__results.latency[request[0]].record(time.perf_counter_ns() - request[1])
+        self.__results.responses += 1
+
+    def on_error_message(self, client_order_id: int, error_message: bytes) -> None:
+        """Called when the matching engine rejects a request."""
+        self.__results.rejects[error_message.decode(errors="replace")] += 1
+        request = self.__pending.get(client_order_id)
+        if request is not None and request[0] == "Insert":
+            self.__active_volume -= self.__orders.pop(client_order_id)[1]
+        self.__hedges.pop(client_order_id, None)
+        self.__respond(client_order_id)
+
+    def on_hedge_filled_message(self, client_order_id: int, price: int, volume: int) -> None:
+        """Called when a hedge order is filled, partially or fully."""
+        side = self.__hedges.pop(client_order_id, None)
+        if side is not None:
+            self.__future_position += volume if side == Side.BUY else -volume
+        self.__respond(client_order_id)
+
+    def on_order_filled_message(self, client_order_id: int, price: int, volume: int) -> None:
+        """Called when one of the session's orders is filled, partially or fully."""
+        order = self.__orders.get(client_order_id)
+        if order is not None:
+            self.__etf_position += volume if order[0] == Side.BUY else -volume
+
+    def on_order_status_message(self, client_order_id: int, fill_volume: int, remaining_volume: int,
+                                fees: int) -> None:
+        """Called when the status of one of the session's orders changes."""
+        order = self.__orders.get(client_order_id)
+        if order is not None:
+            self.__active_volume -= order[1] - remaining_volume
+            order[1] = remaining_volume
+            if remaining_volume == 0:
+                del self.__orders[client_order_id]
+        self.__respond(client_order_id)
+
+    def __send(self, request: str, client_order_id: int) -> None:
+        """Note that a request has been sent."""
+        self.__pending[client_order_id] = (request, time.perf_counter_ns())
+        self.__results.requests[request] += 1
+
+    def send_request(self, request: str) -> None:
+        """Send a request of the given kind, or the nearest sensible alternative."""
+        if not self.connected or self.__prices.best_bid == 0 or self.__prices.best_ask == 0:
+            return
+
+        idle = [i for i in self.__orders if i not in self.__pending]
+        if request in ("Amend", "Cancel") and not idle:
+            request = "Insert"
+        if request == "Insert" and (len(self.__orders) >= self.__order_count_limit
+                                    or self.__active_volume >= self.__active_volume_limit):
+            request = "Cancel" if idle else "Hedge"
+
+        if request == "Insert":
+            self.__send_insert()
+        elif request == "Amend" or request == "Cancel":
+            client_order_id = self.__rng.choice(idle)
+            remaining_volume = self.__orders[client_order_id][1]
+            if request == "Amend" and remaining_volume > 1:
+                self.__send("Amend", client_order_id)
+                self.send_amend_order(client_order_id, remaining_volume - 1)
+            else:
+                self.__send("Cancel", client_order_id)
+                self.send_cancel_order(client_order_id)
+        else:
+            self.__send_hedge()
+
+    def __send_hedge(self) -> None:
+        """Send a hedge order that flattens the net position, or moves it by one lot if it is flat."""
+        net_position = self.__etf_position + self.__future_position
+        if net_position == 0:
+            side = self.__rng.choice((Side.BUY, Side.SELL))
+        else:
+            side = Side.SELL if net_position > 0 else Side.BUY
+        volume = max(1, min(abs(net_position), 10))
+        client_order_id = self.__next_order_id
+        self.__next_order_id += 1
+        self.__hedges[client_order_id] = side
+        price = MAXIMUM_ASK // self.__tick_size * self.__tick_size if side == Side.BUY else self.__tick_size
+        self.__send("Hedge", client_order_id)
+        self.send_hedge_order(client_order_id, side, price, volume)
+
+    def __send_insert(self) -> None:
+        """Send a passive good-for-day order near the best price."""
+        if self.__etf_position > self.__position_limit // 2:
+            side = Side.SELL
+        elif self.__etf_position < -self.__position_limit // 2:
+            side = Side.BUY
+        else:
+            side = self.__rng.choice((Side.BUY, Side.SELL))
+        offset = self.__rng.randrange(5) * self.__tick_size
+        price = self.__prices.best_bid - offset if side == Side.BUY else self.__prices.best_ask + offset
+        volume = min(self.__rng.randint(1, 5), self.__active_volume_limit - self.__active_volume)
+
+        client_order_id = self.__next_order_id
+        self.__next_order_id += 1
+        self.__orders[client_order_id] = [side, volume]
+        self.__active_volume += volume
+        self.__send("Insert", client_order_id)
+        self.send_insert_order(client_order_id, side, price, volume, Lifespan.GOOD_FOR_DAY)
+
+
+async def __run_sessions(config: Dict[str, Any], team_names: List[str], secret: str, rate: float,
+                         mix: Dict[str, float], duration: float, seed: int) -> LoadTestResults:
+    """Run a group of load test sessions for the given number of seconds."""
+    loop = asyncio.get_running_loop()
+    logger = logging.getLogger("LOAD_TEST")
+    results = LoadTestResults()
+    rng = random.Random(seed)
+    tick_size = int(config["Instrument"]["TickSize"] * 100.0)
+
+    prices = MarketPrices()
+    info = config["Information"]
+    SubscriberFactory(info["Type"], info["Name"]).create(prices)
+
+    sessions: List[LoadTestSession] = list()
+    exec_ = config["Execution"]
+    for name in team_names:
+        session = LoadTestSession(loop, name, secret, prices, config["Limits"], tick_size, results,
+                                  random.Random(rng.random()))
+        try:
+            await loop.create_connection(lambda: session, exec_["Host"], exec_["Port"])
+        except OSError as e:
+            logger.error("execution connection failed: %s", e.strerror)
+            continue
+        sessions.append(session)
+        await asyncio.sleep(LOAD_TEST_CONNECT_PERIOD / len(team_names))
+    results.sessions = len(sessions)
+
+    while (prices.best_bid == 0 or prices.best_ask == 0) and any(s.connected for s in sessions):
+        await asyncio.sleep(0.01)
+
+    requests = list(mix)
+    weights = [mix[r] for r in requests]
+    interval = 1.0 / rate
+    start = loop.time()
+    next_times = [start + rng.random() * interval for _ in sessions]
+    while loop.time() - start < duration and any(s.connected for s in sessions):
+        now = loop.time()
+        for i, session in enumerate(sessions):
+            while next_times[i] <= now:
+                session.send_request(rng.choices(requests, weights)[0])
+                next_times[i] += interval
+        await asyncio.sleep(max(0.0, min(next_times) - loop.time()))
+    results.elapsed = loop.time() - start
+
+    for session in sessions:
+        session.close()
+    prices.close()
+    await asyncio.sleep(0.1)
+    return results
+
+
+def run_load_test_worker(config: Dict[str, Any], team_names: List[str], rate: float, mix: Dict[str, float],
+                         duration: float, seed: int) -> LoadTestResults:
+    """Run a group of load test sessions in a new event loop and return their results."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(__run_sessions(config, team_names, config["LoadTest"]["Secret"], rate, mix,
+                                                      duration, seed))
+    finally:
+        loop.close()
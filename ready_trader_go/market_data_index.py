@@ -0,0 +1,139 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import bisect
+import csv
+import json
+import logging
+import os
+
+from typing import List, Optional
+
+from .market_events import MarketEventsReader, parse_market_event
+from .match_events import MatchEvents
+from .order_book import OrderBook
+from .types import Instrument, Lifespan, Side
+
+CHECKPOINT_INTERVAL = 60.0
+INDEX_FILE_SUFFIX = ".index.json"
+INDEX_VERSION = 1
+
+
+class MarketDataCheckpoint(object):
+    """The state of the order books at a point in a market data file."""
+    __slots__ = ("last_traded_prices", "offset", "orders", "time")
+
+    def __init__(self, time: float, offset: int, last_traded_prices: List[Optional[int]], orders: List[List[int]]):
+        """Initialise a new instance of the MarketDataCheckpoint class.
+
+        The offset is the position in the file of the first row at or after
+        the checkpoint time and the orders are the resting orders, each given
+        as [instrument, order_id, side, price, volume, remaining_volume,
+        lifespan], in the order they were placed in the books.
+        """
+        self.last_traded_prices: List[Optional[int]] = last_traded_prices
+        self.offset: int = offset
+        self.orders: List[List[int]] = orders
+        self.time: float = time
+
+    def restore(self, reader: MarketEventsReader) -> None:
+        """Restore this checkpoint's order books before the reader is started."""
+        reader.file_offset = self.offset
+        reader.future_book.set_last_traded_price(self.last_traded_prices[Instrument.FUTURE])
+        reader.etf_book.set_last_traded_price(self.last_traded_prices[Instrument.ETF])
+        for instrument, order_id, side, price, volume, remaining_volume, lifespan in self.orders:
+            reader.restore_order(Instrument(instrument), order_id, Side(side), price, volume, remaining_volume,
+                                 Lifespan(lifespan))
+
+
+class MarketDataIndex(object):
+    """A list of checkpoints taken at regular intervals through a market data file."""
+
+    def __init__(self, checkpoints: List[MarketDataCheckpoint]):
+        """Initialise a new instance of the MarketDataIndex class."""
+        self.checkpoints: List[MarketDataCheckpoint] = checkpoints
+        self.__times: List[float] = [c.time for c in checkpoints]
+
+    @staticmethod
+    def build(filename: str, interval: float = CHECKPOINT_INTERVAL) -> "MarketDataIndex":
+        """Build an index by replaying a market data file."""
+        future_book = OrderBook(Instrument.FUTURE, 0.0, 0.0)
+        etf_book = OrderBook(Instrument.ETF, 0.0, 0.0)
+        reader = MarketEventsReader(filename, None, future_book, etf_book, MatchEvents())
+
+        checkpoints: List[MarketDataCheckpoint] = list()
+        next_checkpoint: float = 0.0
+
+        with open(filename, "rb") as market_data:
+            offset: int = len(market_data.readline())  # Skip header row
+            for line in market_data:
+                evt = parse_market_event(next(csv.reader((line.decode(),))))
+                if evt.time >= next_checkpoint:
+                    orders = [[o.instrument, o.client_order_id, o.side, o.price, o.volume, o.remaining_volume,
+                               o.lifespan] for o in (*reader.future_orders.values(), *reader.etf_orders.values())]
+                    checkpoints.append(MarketDataCheckpoint(next_checkpoint, offset, [future_book.last_traded_price(),
+                                                            etf_book.last_traded_price()], orders))
+                    while next_checkpoint <= evt.time:
+                        next_checkpoint += interval
+                reader.apply_market_event(evt)
+                offset += len(line)
+
+        return MarketDataIndex(checkpoints)
+
+    def find_checkpoint(self, time: float) -> Optional[MarketDataCheckpoint]:
+        """Return the latest checkpoint at or before the given time, or None."""
+        i = bisect.bisect_right(self.__times, time)
+        return self.checkpoints[i - 1] if i else None
+
+    @staticmethod
+    def load(filename: str) -> Optional["MarketDataIndex"]:
+        """Return the index for a market data file if it is present and up to date, otherwise None."""
+        try:
+            with open(filename + INDEX_FILE_SUFFIX) as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return None
+
+        stat = os.stat(filename)
+        if (type(index) is not dict or index.get("Version") != INDEX_VERSION or index.get("Size") != stat.st_size
+                or index.get("ModifiedTime") != stat.st_mtime_ns):
+            return None
+
+        return MarketDataIndex([MarketDataCheckpoint(c["Time"], c["Offset"], c["LastTradedPrices"], c["Orders"])
+                                for c in index["Checkpoints"]])
+
+    @staticmethod
+    def load_or_build(filename: str) -> "MarketDataIndex":
+        """Return the index for a market data file, building and saving it if necessary."""
+        logger = logging.getLogger("MARKET_DATA_INDEX")
+        index = MarketDataIndex.load(filename)
+        if index is None:
+            logger.info("building market data index: filename=%s", filename)
+            index = MarketDataIndex.build(filename)
+            try:
+                index.save(filename)
+            except OSError as e:
+                logger.warning("failed to save market data index: filename=%s", filename, exc_info=e)
+        return index
+
+    def save(self, filename: str) -> None:
+        """Save this index alongside the market data file it describes."""
+        stat = os.stat(filename)
+        with open(filename + INDEX_FILE_SUFFIX, "w") as index_file:
+            json.dump({"Version": INDEX_VERSION, "Size": stat.st_size, "ModifiedTime": stat.st_mtime_ns,
+                       "Checkpoints": [{"Time": c.time, "Offset": c.offset, "LastTradedPrices": c.last_traded_prices,
+                                        "Orders": c.orders} for c in self.checkpoints]}, index_file)
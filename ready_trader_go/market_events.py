@@ -16,14 +16,19 @@
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
 import asyncio
+import contextlib
 import csv
 import enum
+import heapq
+import io
 import logging
 import queue
 import threading
+import time
 
-from typing import Callable, Dict, List, Optional, TextIO
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Union
 
+from . import tracing
 from .match_events import MatchEvents
 from .order_book import IOrderListener, Order, OrderBook
 from .types import Instrument, Lifespan, Side
@@ -58,23 +63,62 @@ class MarketEvent(object):
         self.lifespan: Optional[Lifespan] = lifespan
 
 
+def parse_market_event(row: List[str]) -> MarketEvent:
+    """Return the market event described by a row of a market data file."""
+    # time, instrument, operation, order_id, side, volume, price, lifespan
+    return MarketEvent(float(row[0]), Instrument(int(row[1])), MarketEventOperation[row[2]], int(row[3]),
+                       Side[row[4]] if row[4] else None, int(float(row[5])) if row[5] else 0,
+                       int(float(row[6]) * INPUT_SCALING) if row[6] else 0, Lifespan[row[7]] if row[7] else None)
+
+
+def parse_market_events(market_data: TextIO, skip_header: bool) -> Iterator[MarketEvent]:
+    """Yield the market events in a market data file."""
+    csv_reader = csv.reader(market_data)
+    if skip_header:
+        next(csv_reader, None)
+    for row in csv_reader:
+        yield parse_market_event(row)
+
+
 class MarketEventsReader(IOrderListener):
-    """A processor of market events read from a file."""
+    """A processor of market events read from one or more files."""
 
-    def __init__(self, filename: str, loop: asyncio.AbstractEventLoop, future_book: OrderBook, etf_book: OrderBook,
-                 match_events: MatchEvents):
+    def __init__(self, filename: Union[str, List[str]], loop: asyncio.AbstractEventLoop, future_book: OrderBook,
+                 etf_book: OrderBook, match_events: MatchEvents, start_time: float = 0.0,
+                 end_time: Optional[float] = None):
         """Initialise a new instance of the MarketEvents class.
+
+        If several files are given, for example one per instrument, their
+        events are merged by time as they are read. Events before the start
+        time are released as soon as the market opens and later event times
+        are measured from the start time. Events after the end time are
+        ignored.
         """
+        self.completed: bool = False
+        self.end_time: Optional[float] = end_time
         self.etf_book: OrderBook = etf_book
         self.etf_orders: Dict[int, Order] = dict()
         self.event_loop: asyncio.AbstractEventLoop = loop
-        self.filename: str = filename
+        self.file_offset: int = 0
+        self.filenames: List[str] = [filename] if isinstance(filename, str) else list(filename)
         self.future_book: OrderBook = future_book
         self.future_orders: Dict[int, Order] = dict()
         self.logger: logging.Logger = logging.getLogger("MARKET_EVENTS")
         self.match_events: MatchEvents = match_events
+        self.orders_allocated: int = 0
+        self.orders_recycled: int = 0
+        self.release_count: int = 0
+        self.release_lag_maximum: float = 0.0
+        self.release_lag_total: float = 0.0
         self.queue: queue.Queue = queue.Queue(MARKET_EVENT_QUEUE_SIZE)
         self.reader_task: Optional[threading.Thread] = None
+        self.start_time: float = start_time
+
+        # Orders released by the order books that can be reused for new inserts
+        self.__free_orders: List[Order] = list()
+
+        future_book.order_released.append(self.on_order_released)
+        etf_book.order_released.append(self.on_order_released)
 
         # Prime the event pump with a no-op event
         self.next_event: Optional[MarketEvent] = MarketEvent(0.0, Instrument.FUTURE, MarketEventOperation.CANCEL, 0,
@@ -117,66 +161,144 @@ class MarketEventsReader(IOrderListener):
             elif order.instrument == Instrument.ETF and order.client_order_id in self.etf_orders:
                 del self.etf_orders[order.client_order_id]
 
+    def on_order_released(self, order: Order) -> None:
+        """Called when an order book no longer holds a reference to an order."""
+        if order.listener is self:
+            self.__free_orders.append(order)
+
     def on_reader_done(self, num_events: int) -> None:
         """Called when the market data reader thread is done."""
         self.logger.info("reader thread complete after processing %d market events", num_events)
 
+    def apply_market_event(self, evt: MarketEvent) -> None:
+        """Apply a market event to the order books."""
+        if evt.instrument == Instrument.FUTURE:
+            orders = self.future_orders
+            book = self.future_book
+        else:
+            orders = self.etf_orders
+            book = self.etf_book
+
+        if evt.operation == MarketEventOperation.INSERT:
+            order = self.__create_order(evt)
+            self.match_events.insert(evt.time, "", order.client_order_id, order.instrument, order.side,
+                                     abs(order.volume), order.price, order.lifespan)
+            book.insert(evt.time, order)
+            if order.remaining_volume == 0:
+                # The order traded or was cancelled without being placed in the book
+                self.__free_orders.append(order)
+        elif evt.order_id in orders:
+            order = orders[evt.order_id]
+            if evt.operation == MarketEventOperation.CANCEL:
+                book.cancel(evt.time, order)
+            elif evt.volume < 0:
+                # evt.operation must be MarketEventOperation.AMEND
+                book.amend(evt.time, order, order.volume + evt.volume)
+
     def process_market_events(self, elapsed_time: float) -> None:
         """Process market events from the queue."""
         evt: MarketEvent = self.next_event
 
         while evt and evt.time < elapsed_time:
-            if evt.instrument == Instrument.FUTURE:
-                orders = self.future_orders
-                book = self.future_book
-            else:
-                orders = self.etf_orders
-                book = self.etf_book
-
-            if evt.operation == MarketEventOperation.INSERT:
-                order = Order(evt.order_id, evt.instrument, evt.lifespan, evt.side, evt.price, evt.volume, self)
-                self.match_events.insert(evt.time, "", order.client_order_id, order.instrument, order.side,
-                                         abs(order.volume), order.price, order.lifespan)
-                book.insert(evt.time, order)
-            elif evt.order_id in orders:
-                order = orders[evt.order_id]
-                if evt.operation == MarketEventOperation.CANCEL:
-                    book.cancel(evt.time, order)
-                elif evt.volume < 0:
-                    # evt.operation must be MarketEventOperation.AMEND
-                    book.amend(evt.time, order, order.volume + evt.volume)
+            # Measure how late the event is released relative to its timestamp
+            lag: float = elapsed_time - evt.time
+            self.release_count += 1
+            self.release_lag_total += lag
+            if lag > self.release_lag_maximum:
+                self.release_lag_maximum = lag
 
+            self.apply_market_event(evt)
             evt = self.queue.get()
 
         self.next_event = evt
-        if evt is None:
+        if evt is None and not self.completed:
+            # Time keeps advancing after the last event, so only report completion once
+            self.completed = True
+            self.logger.info("market orders allocated=%d recycled=%d", self.orders_allocated, self.orders_recycled)
+            self.logger.info("market events released=%d average_lag=%.6f maximum_lag=%.6f", self.release_count,
+                             self.release_lag_total / self.release_count if self.release_count else 0.0,
+                             self.release_lag_maximum)
             for c in self.task_complete:
                 c(self)
 
-    def reader(self, market_data: TextIO) -> None:
-        """Read the market data file and place order events in the queue."""
+    def __create_order(self, evt: MarketEvent) -> Order:
+        """Return an order for an insert event, reusing a released order if there is one."""
+        if self.__free_orders:
+            self.orders_recycled += 1
+            order = self.__free_orders.pop()
+            order.client_order_id = evt.order_id
+            order.instrument = evt.instrument
+            order.lifespan = evt.lifespan
+            order.side = evt.side
+            order.price = evt.price
+            order.remaining_volume = order.volume = evt.volume
+            order.total_fees = 0
+            return order
+
+        self.orders_allocated += 1
+        return Order(evt.order_id, evt.instrument, evt.lifespan, evt.side, evt.price, evt.volume, self)
+
+    def queue_events(self, events: Iterable[MarketEvent]) -> int:
+        """Place events in the queue, followed by None, and return the number of events queued.
+
+        This is called on the reader thread.
+        """
+        count: int = 0
         fifo = self.queue
+        start_time: float = self.start_time
+        end_time: float = self.end_time if self.end_time is not None else float("inf")
+        tracer = tracing.get_tracer()
+        traced: bool = tracing.is_enabled()
 
-        with market_data:
-            csv_reader = csv.reader(market_data)
-            next(csv_reader)  # Skip header row
-            for row in csv_reader:
-                # time, instrument, operation, order_id, side, volume, price, lifespan
-                fifo.put(MarketEvent(float(row[0]), Instrument(int(row[1])), MarketEventOperation[row[2]],
-                                     int(row[3]), Side[row[4]] if row[4] else None,
-                                     int(float(row[5])) if row[5] else 0, int(float(row[6]) * INPUT_SCALING) if row[6] else 0,
-                                     Lifespan[row[7]] if row[7] else None))
-            fifo.put(None)
+        # Time spent blocked on a full queue is not part of the read span
+        start = time.perf_counter_ns() if traced else 0
+        for evt in events:
+            if traced:
+                tracer.record("MarketEventsReader.read", "reader", start, time.perf_counter_ns())
+            if evt.time > end_time:
+                break
+            evt.time = evt.time - start_time if evt.time > start_time else 0.0
+            fifo.put(evt)
+            count += 1
+            if traced:
+                start = time.perf_counter_ns()
+        fifo.put(None)
 
-        self.event_loop.call_soon_threadsafe(self.on_reader_done, csv_reader.line_num - 1)
+        return count
+
+    def reader(self, market_data: List[TextIO]) -> None:
+        """Read the market data files and place order events in the queue."""
+        with contextlib.ExitStack() as stack:
+            for f in market_data:
+                stack.enter_context(f)
+            sources = [parse_market_events(f, self.file_offset == 0) for f in market_data]
+            # heapq.merge holds only the next event from each file and keeps
+            # events with equal times in the order the files were given
+            count = self.queue_events(sources[0] if len(sources) == 1
+                                      else heapq.merge(*sources, key=lambda e: e.time))
+
+        self.event_loop.call_soon_threadsafe(self.on_reader_done, count)
+
+    def restore_order(self, instrument: Instrument, order_id: int, side: Side, price: int, volume: int,
+                      remaining_volume: int, lifespan: Lifespan) -> None:
+        """Place a previously recorded resting order in the order book before the market opens."""
+        order = Order(order_id, instrument, lifespan, side, price, volume, self)
+        order.remaining_volume = remaining_volume
+        self.match_events.insert(0.0, "", order_id, instrument, side, remaining_volume, price, lifespan)
+        (self.future_book if instrument == Instrument.FUTURE else self.etf_book).place(0.0, order)
 
     def start(self):
         """Start the market events reader thread"""
-        try:
-            market_data = open(self.filename)
-        except OSError as e:
-            self.logger.error("failed to open market data file: filename='%s'" % self.filename, exc_info=e)
-            raise
-        else:
-            self.reader_task = threading.Thread(target=self.reader, args=(market_data,), daemon=True, name="reader")
-            self.reader_task.start()
+        market_data: List[TextIO] = list()
+        for filename in self.filenames:
+            try:
+                market_data.append(io.TextIOWrapper(open(filename, "rb"), newline=""))
+                market_data[-1].buffer.seek(self.file_offset)
+            except OSError as e:
+                self.logger.error("failed to open market data file: filename='%s'" % filename, exc_info=e)
+                for f in market_data:
+                    f.close()
+                raise
+
+        self.reader_task = threading.Thread(target=self.reader, args=(market_data,), daemon=True, name="reader")
+        self.reader_task.start()
@@ -21,9 +21,11 @@ import enum
 import logging
 import queue
 import threading
+import time
 
 from typing import Any, Callable, List, Optional, TextIO, Union
 
+from . import latency, tracing
 from .types import Instrument, Lifespan, Side
 
 
@@ -74,6 +76,8 @@ class MatchEvents:
     def __init__(self):
         """Initialise a new instance of the MatchEvents class."""
         self.logger = logging.getLogger("MATCH_EVENTS")
+        self.__emit_latency = latency.get_histogram("Stage.MatchEvent")
+        self.__latency_enabled: bool = latency.is_enabled()
 
         # Callbacks
         self.event_occurred: List[Callable[[MatchEvent], None]] = list()
@@ -81,36 +85,39 @@ class MatchEvents:
     def amend(self, now: float, name: str, order_id: int, diff: int) -> None:
         """Create a new amend event."""
         event = MatchEvent(now, name, MatchEventOperation.AMEND, order_id, None, None, diff, None, None, None)
-        for callback in self.event_occurred:
-            callback(event)
+        self.__emit(event)
 
     def cancel(self, now: float, name: str, order_id: int, diff: int) -> None:
         """Create a new cancel event."""
         event = MatchEvent(now, name, MatchEventOperation.CANCEL, order_id, None, None, diff, None, None, None)
+        self.__emit(event)
+
+    def __emit(self, event: MatchEvent) -> None:
+        """Pass an event to every callback."""
+        start = time.perf_counter_ns() if self.__latency_enabled else 0
         for callback in self.event_occurred:
             callback(event)
+        if self.__latency_enabled:
+            self.__emit_latency.record(time.perf_counter_ns() - start)
 
     def fill(self, now: float, name: str, order_id: int, instrument: Instrument, side: Side, price: int, diff: int,
              fee: int) -> None:
         """Create a new fill event."""
-        for callback in self.event_occurred:
-            callback(MatchEvent(now, name, MatchEventOperation.TRADE, order_id, instrument, side, diff, price,
-                                None, fee))
+        self.__emit(MatchEvent(now, name, MatchEventOperation.TRADE, order_id, instrument, side, diff, price, None,
+                               fee))
 
     def hedge(self, now: float, name: str, order_id: int, instrument: Instrument, side: Side, price: float,
               volume: int) -> None:
         """Create a new fill event."""
-        for callback in self.event_occurred:
-            callback(MatchEvent(now, name, MatchEventOperation.HEDGE, order_id, instrument, side, volume, price,
-                                None, None))
+        self.__emit(MatchEvent(now, name, MatchEventOperation.HEDGE, order_id, instrument, side, volume, price,
+                               None, None))
 
     def insert(self, now: float, name: str, order_id: int, instrument: Instrument, side: Side, volume: int,
                price: int, lifespan: Lifespan) -> None:
         """Create a new insert event."""
         event = MatchEvent(now, name, MatchEventOperation.INSERT, order_id, instrument, side, volume, price,
                            lifespan, None)
-        for callback in self.event_occurred:
-            callback(event)
+        self.__emit(event)
 
 
 class MatchEventsWriter:
@@ -121,6 +128,7 @@ class MatchEventsWriter:
         self.event_loop: asyncio.AbstractEventLoop = loop
         self.filename: str = filename
         self.finished: bool = False
+        self.last_event_time: float = 0.0
         self.logger = logging.getLogger("MATCH_EVENTS")
         self.match_events: MatchEvents = match_events
         self.queue: queue.Queue = queue.Queue()
@@ -165,6 +173,8 @@ class MatchEventsWriter:
         """Fetch match events from a queue and write them to a file"""
         count = 0
         fifo = self.queue
+        tracer = tracing.get_tracer()
+        traced: bool = tracing.is_enabled()
 
         try:
             with match_events_file:
@@ -175,7 +185,13 @@ class MatchEventsWriter:
                 evt: MatchEvent = fifo.get()
                 while evt is not None:
                     count += 1
-                    csv_writer.writerow(evt)
+                    if traced:
+                        start = time.perf_counter_ns()
+                        csv_writer.writerow(evt)
+                        tracer.record("MatchEventsWriter.write", "writer", start, time.perf_counter_ns())
+                    else:
+                        csv_writer.writerow(evt)
+                    self.last_event_time = evt.time
                     evt = fifo.get()
         finally:
             if not self.event_loop.is_closed():
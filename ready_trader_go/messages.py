@@ -37,6 +37,10 @@ class MessageType(enum.IntEnum):
     LOGIN = 7
     ORDER_FILLED = 8
     ORDER_STATUS = 9
+    ORDER_FILL_STATUS = 12
+    MASS_QUOTE = 13
+    MASS_CANCEL = 14
+    REPLACE_ORDER = 15
 
     # Information messages
     ORDER_BOOK_UPDATE = 10
@@ -60,6 +64,12 @@ CANCEL_MESSAGE = struct.Struct("!I")  # Client order id
 HEDGE_MESSAGE = struct.Struct("!IBII")  # Client order id, side, price, volume
 INSERT_MESSAGE = struct.Struct("!IBIIB")  # Client order id, side, price, volume and lifespan
 LOGIN_MESSAGE = struct.Struct("!50s50s")  # Name, secret
+MASS_CANCEL_MESSAGE = struct.Struct("!B")  # Side (or MASS_CANCEL_BOTH_SIDES)
+MASS_QUOTE_MESSAGE = struct.Struct("!IIIIII")  # Bid client order id, price, volume, ask client order id, price, volume
+REPLACE_MESSAGE = struct.Struct("!III")  # Client order id, new price and new volume
+
+# Side value in a mass cancel message that cancels orders on both sides
+MASS_CANCEL_BOTH_SIDES = 2
 
 # Matching engine to auto-trader messages
 ERROR_MESSAGE = struct.Struct("!I50s")  # message
@@ -67,6 +77,7 @@ HEDGE_FILLED_MESSAGE = struct.Struct("!III")  # Client order id, price, volume
 ORDER_BOOK_HEADER = struct.Struct("!BI")  # Instrument and sequence number
 ORDER_BOOK_MESSAGE = struct.Struct("!%dI" % (4 * order_book.TOP_LEVEL_COUNT))  # Prices & volumes for best bids & asks
 ORDER_FILLED_MESSAGE = struct.Struct("!III")  # Client order id, price, volume
+ORDER_FILL_STATUS_MESSAGE = struct.Struct("!IIIIIi")  # Client order id, price, volume, fill vol, remaining vol, fees
 ORDER_STATUS_MESSAGE = struct.Struct("!IIIi")  # Client order id, fill volume, remaining volume and fees
 TRADE_TICKS_HEADER = struct.Struct("!BI")  # Instrument and sequence number
 TRADE_TICKS_MESSAGE = struct.Struct("!%dI" % (4 * order_book.TOP_LEVEL_COUNT))  # Prices & volumes for best bids & asks
@@ -91,12 +102,16 @@ CANCEL_MESSAGE_SIZE: int = HEADER.size + CANCEL_MESSAGE.size
 HEDGE_MESSAGE_SIZE: int = HEADER.size + HEDGE_MESSAGE.size
 INSERT_MESSAGE_SIZE: int = HEADER.size + INSERT_MESSAGE.size
 LOGIN_MESSAGE_SIZE: int = HEADER.size + LOGIN_MESSAGE.size
+MASS_CANCEL_MESSAGE_SIZE: int = HEADER.size + MASS_CANCEL_MESSAGE.size
+MASS_QUOTE_MESSAGE_SIZE: int = HEADER.size + MASS_QUOTE_MESSAGE.size
+REPLACE_MESSAGE_SIZE: int = HEADER.size + REPLACE_MESSAGE.size
 
 ERROR_MESSAGE_SIZE: int = HEADER.size + ERROR_MESSAGE.size
 HEDGE_FILLED_MESSAGE_SIZE: int = HEADER.size + HEDGE_FILLED_MESSAGE.size
 ORDER_BOOK_HEADER_SIZE: int = HEADER.size + ORDER_BOOK_HEADER.size
 ORDER_BOOK_MESSAGE_SIZE: int = ORDER_BOOK_HEADER_SIZE + ORDER_BOOK_MESSAGE.size
 ORDER_FILLED_MESSAGE_SIZE: int = HEADER.size + ORDER_FILLED_MESSAGE.size
+ORDER_FILL_STATUS_MESSAGE_SIZE: int = HEADER.size + ORDER_FILL_STATUS_MESSAGE.size
 ORDER_STATUS_MESSAGE_SIZE: int = HEADER.size + ORDER_STATUS_MESSAGE.size
 TRADE_TICKS_HEADER_SIZE: int = HEADER.size + TRADE_TICKS_HEADER.size
 TRADE_TICKS_MESSAGE_SIZE: int = TRADE_TICKS_HEADER_SIZE + TRADE_TICKS_MESSAGE.size
@@ -118,6 +133,8 @@ class Connection(asyncio.Protocol):
         self._data: bytes = b""
         self._file_number: int = 0
         self._connection_transport: Optional[asyncio.Transport] = None
+        self.messages_received: int = 0
+        self.messages_sent: int = 0
 
         self.__logger = logging.getLogger("CONNECTION")
 
@@ -159,6 +176,7 @@ class Connection(asyncio.Protocol):
             if upto + length > data_length:
                 break
 
+            self.messages_received += 1
             self.on_message(typ, self._data, upto + HEADER_SIZE, length)
 
             upto += length
@@ -170,6 +188,7 @@ class Connection(asyncio.Protocol):
 
     def send_message(self, typ: int, data: bytes, length: int) -> None:
         """Send a message."""
+        self.messages_sent += 1
         self._connection_transport.write(HEADER.pack(length, typ) + data)
 
 
@@ -179,11 +198,13 @@ class Subscription(asyncio.DatagramProtocol):
     def __init__(self):
         """Initialise a new instance of the Receiver class."""
         self._receiver_transport: Optional[asyncio.BaseTransport] = None
+        self.datagrams_received: int = 0
         self.__logger = logging.getLogger("RECEIVER")
 
     def close(self):
         """Close the subscription."""
-        self._receiver_transport.close()
+        if self._receiver_transport is not None:
+            self._receiver_transport.close()
 
     def connection_lost(self, exc: Optional[Exception]) -> None:
         """Callback when the datagram receiver has lost its connection."""
@@ -209,6 +230,7 @@ class Subscription(asyncio.DatagramProtocol):
                                   *address, length, len(data))
             return
 
+        self.datagrams_received += 1
         self.on_datagram(typ, data, HEADER_SIZE, length)
 
     def on_datagram(self, typ: int, data: bytes, start: int, length: int) -> None:
@@ -0,0 +1,209 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import asyncio
+import logging
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .base_auto_trader import BaseAutoTrader
+from .competitor import CompetitorManager
+from .information import InformationPublisher
+from .market_events import MarketEventsReader
+from .match_events import MatchEventsWriter
+from .score_board import ScoreBoardWriter
+from .types import IController
+
+# Requests larger than this are not valid metrics requests
+MAXIMUM_REQUEST_SIZE = 8192
+
+
+class Metric(object):
+    """A named counter or gauge with one or more labelled samples."""
+    __slots__ = ("description", "kind", "name", "samples")
+
+    def __init__(self, name: str, kind: str, description: str, samples: Iterable[Tuple[Dict[str, str], float]]):
+        """Initialise a new instance of the Metric class.
+
+        The kind is either "counter" or "gauge".
+        """
+        self.description: str = description
+        self.kind: str = kind
+        self.name: str = name
+        self.samples: Iterable[Tuple[Dict[str, str], float]] = samples
+
+    def render(self) -> str:
+        """Return this metric in the Prometheus text exposition format."""
+        lines = ["# HELP %s %s" % (self.name, self.description), "# TYPE %s %s" % (self.name, self.kind)]
+        for labels, value in self.samples:
+            if labels:
+                label_text = ",".join('%s="%s"' % (k, v.replace("\\", "\\\\").replace('"', '\\"')
+                                                   .replace("\n", "\\n")) for k, v in labels.items())
+                lines.append("%s{%s} %r" % (self.name, label_text, float(value)))
+            else:
+                lines.append("%s %r" % (self.name, float(value)))
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer(object):
+    """A server of metrics in the Prometheus text format over HTTP.
+
+    The server listens either on a TCP port, which should normally be on
+    the local host, or on a Unix domain socket.
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, path: Optional[str] = None):
+        """Initialise a new instance of the MetricsServer class."""
+        self.host: Optional[str] = host
+        self.path: Optional[str] = path
+        self.port: Optional[int] = port
+
+        self.__logger: logging.Logger = logging.getLogger("METRICS")
+        self.__server: Optional[asyncio.AbstractServer] = None
+
+        # Callbacks that return the current metrics
+        self.collectors: List[Callable[[], Iterable[Metric]]] = list()
+
+    def close(self) -> None:
+        """Stop serving metrics."""
+        if self.__server is not None:
+            self.__server.close()
+
+    async def __on_client_connected(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer a single HTTP request."""
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            method, target, _ = request.split(b"\r\n", 1)[0].split(b" ", 2)
+            if method != b"GET":
+                status, body = b"405 Method Not Allowed", b""
+            elif target not in (b"/", b"/metrics"):
+                status, body = b"404 Not Found", b""
+            else:
+                status, body = b"200 OK", self.render().encode()
+            writer.write(b"HTTP/1.0 %s\r\nContent-Type: text/plain; version=0.0.4\r\nContent-Length: %d\r\n"
+                         b"Connection: close\r\n\r\n%s" % (status, len(body), body))
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def render(self) -> str:
+        """Return the current value of every metric in the Prometheus text format."""
+        return "".join(m.render() for collector in self.collectors for m in collector())
+
+    async def start(self) -> None:
+        """Start the server."""
+        if self.path is not None:
+            self.__logger.info("starting metrics server: path=%s", self.path)
+            self.__server = await asyncio.start_unix_server(self.__on_client_connected, self.path,
+                                                            limit=MAXIMUM_REQUEST_SIZE)
+        else:
+            self.__logger.info("starting metrics server: host=%s port=%d", self.host, self.port)
+            self.__server = await asyncio.start_server(self.__on_client_connected, self.host, self.port,
+                                                       limit=MAXIMUM_REQUEST_SIZE)
+
+
+def create_metrics_server(config: Dict[str, Any]) -> MetricsServer:
+    """Return a metrics server for a validated Metrics configuration section."""
+    if "Path" in config:
+        return MetricsServer(path=config["Path"])
+    return MetricsServer(config["Host"], config["Port"])
+
+
+def validate_metrics_config(config: Dict[str, Any]) -> None:
+    """Raise an exception if the Metrics section of a configuration is not valid."""
+    metrics = config["Metrics"]
+    if type(metrics) is not dict:
+        raise Exception("Metrics configuration should be a JSON object")
+    if "Path" in metrics:
+        if type(metrics["Path"]) is not str:
+            raise Exception("Element of inappropriate type in Metrics configuration")
+    elif type(metrics.get("Host")) is not str or type(metrics.get("Port")) is not int:
+        raise Exception("Metrics configuration should contain either a Host and Port or a Path")
+
+
+class ExchangeMetricsCollector(object):
+    """A collector of the exchange's metrics."""
+
+    def __init__(self, controller: IController, competitor_manager: CompetitorManager,
+                 market_events_reader: MarketEventsReader, match_events_writer: MatchEventsWriter,
+                 score_board_writer: ScoreBoardWriter, information_publisher: InformationPublisher):
+        """Initialise a new instance of the ExchangeMetricsCollector class."""
+        self.competitor_manager: CompetitorManager = competitor_manager
+        self.controller: IController = controller
+        self.information_publisher: InformationPublisher = information_publisher
+        self.market_events_reader: MarketEventsReader = market_events_reader
+        self.match_events_writer: MatchEventsWriter = match_events_writer
+        self.score_board_writer: ScoreBoardWriter = score_board_writer
+
+    def __call__(self) -> List[Metric]:
+        """Return the exchange's current metrics."""
+        now = self.controller.advance_time()
+        competitors = list(self.competitor_manager.get_competitors())
+        reader = self.market_events_reader
+        match_writer = self.match_events_writer
+        score_writer = self.score_board_writer
+
+        def writer_lag(writer: Any) -> float:
+            # Only a writer with queued records is behind
+            return max(0.0, now - writer.last_event_time) if writer.queue.qsize() else 0.0
+
+        return [
+            Metric("rtg_match_time_seconds", "gauge", "Time since the market opened.", [({}, now)]),
+            Metric("rtg_competitor_messages_received_total", "counter", "Messages received from each competitor.",
+                   [({"competitor": c.name}, c.messages_received) for c in competitors]),
+            Metric("rtg_competitor_active_orders", "gauge", "Active orders of each competitor.",
+                   [({"competitor": c.name}, len(c.orders)) for c in competitors]),
+            Metric("rtg_competitors_connected", "gauge", "Competitors currently connected.",
+                   [({}, self.competitor_manager.active_competitor_count)]),
+            Metric("rtg_frequency_limit_breaches_total", "counter", "Message frequency limit breaches.",
+                   [({}, self.competitor_manager.frequency_limit_breach_count)]),
+            Metric("rtg_book_active_orders", "gauge", "Active orders in each order book.",
+                   [({"instrument": "FUTURE", "owner": "market"}, len(reader.future_orders)),
+                    ({"instrument": "ETF", "owner": "market"}, len(reader.etf_orders)),
+                    ({"instrument": "ETF", "owner": "competitors"}, sum(len(c.orders) for c in competitors))]),
+            Metric("rtg_queue_depth", "gauge", "Items waiting in each inter-thread queue.",
+                   [({"queue": "market_events"}, reader.queue.qsize()),
+                    ({"queue": "match_events"}, match_writer.queue.qsize()),
+                    ({"queue": "score_board"}, score_writer.queue.qsize())]),
+            Metric("rtg_writer_lag_seconds", "gauge", "How far each writer thread is behind the match.",
+                   [({"writer": "match_events"}, writer_lag(match_writer)),
+                    ({"writer": "score_board"}, writer_lag(score_writer))]),
+            Metric("rtg_information_messages_published_total", "counter", "Messages written to the information ring.",
+                   [({}, self.information_publisher.messages_published)]),
+        ]
+
+
+class AutoTraderMetricsCollector(object):
+    """A collector of an auto-trader's metrics."""
+
+    def __init__(self, auto_trader: BaseAutoTrader):
+        """Initialise a new instance of the AutoTraderMetricsCollector class."""
+        self.auto_trader: BaseAutoTrader = auto_trader
+
+    def __call__(self) -> List[Metric]:
+        """Return the auto-trader's current metrics."""
+        auto_trader = self.auto_trader
+        return [
+            Metric("rtg_execution_messages_received_total", "counter", "Messages received from the exchange.",
+                   [({}, auto_trader.messages_received)]),
+            Metric("rtg_execution_messages_sent_total", "counter", "Messages sent to the exchange.",
+                   [({}, auto_trader.messages_sent)]),
+            Metric("rtg_information_messages_received_total", "counter", "Information messages received.",
+                   [({}, auto_trader.datagrams_received)]),
+        ]
@@ -15,7 +15,7 @@
 #     You should have received a copy of the GNU Affero General Public
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
-from bisect import bisect, insort_left
+from bisect import bisect, bisect_left, insort_left
 import collections
 
 from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
@@ -45,6 +45,10 @@ class IOrderListener(object):
         """Called when the order is partially or completely filled."""
         pass
 
+    def on_order_replaced(self, now: float, order, volume_removed: int, new_order) -> None:
+        """Called when the order has been removed from the book before its replacement is inserted."""
+        pass
+
 
 class Order(object):
     """A request to buy or sell at a given price."""
@@ -90,7 +94,17 @@ class OrderBook(object):
         self.__levels: Dict[int, Deque[Order]] = {}
         self.__total_volumes: Dict[int, int] = {}
 
-        # Signals
+        # Cumulative volume and value of the levels on each side, best level
+        # first. Only the entries for levels that have not changed since they
+        # were calculated are kept, and more are calculated when needed.
+        self.__ask_depth_values: List[int] = []
+        self.__ask_depth_volumes: List[int] = []
+        self.__bid_depth_values: List[int] = []
+        self.__bid_depth_volumes: List[int] = []
+
+        # Signals (order_released is emitted when the book holds no further
+        # reference to an order, after which the order may be reused)
+        self.order_released: List[Callable[[Order], None]] = list()
         self.trade_occurred: List[Callable[[Any], None]] = list()
 
     def __str__(self):
@@ -124,6 +138,27 @@ class OrderBook(object):
             if order.listener:
                 order.listener.on_order_cancelled(now, order, remaining)
 
+    def __delete_level(self, price: int) -> None:
+        """Delete a price level, releasing any orders that remain in it."""
+        if self.order_released:
+            for order in self.__levels[price]:
+                for callback in self.order_released:
+                    callback(order)
+        del self.__levels[price]
+        del self.__total_volumes[price]
+
+    def __invalidate_depth(self, price: int, side: Side) -> None:
+        """Discard cached depth for the given level and the levels below it."""
+        if side == Side.SELL:
+            if self.__ask_depth_volumes:
+                depth = len(self.__ask_prices) - bisect(self.__ask_prices, -price)
+                del self.__ask_depth_volumes[depth:]
+                del self.__ask_depth_values[depth:]
+        elif self.__bid_depth_volumes:
+            depth = len(self.__bid_prices) - bisect(self.__bid_prices, price)
+            del self.__bid_depth_volumes[depth:]
+            del self.__bid_depth_values[depth:]
+
     def insert(self, now: float, order: Order) -> None:
         """Insert a new order into this order book."""
         if order.side == Side.SELL and self.__bid_prices and order.price <= self.__bid_prices[-1]:
@@ -144,6 +179,10 @@ class OrderBook(object):
         """Return the last traded price."""
         return self.__last_traded_price
 
+    def set_last_traded_price(self, price: Optional[int]) -> None:
+        """Set the last traded price, for example when restoring a saved book."""
+        self.__last_traded_price = price
+
     def midpoint_price(self) -> Optional[float]:
         """Return the midpoint price."""
         if self.__bid_prices and self.__ask_prices:
@@ -164,20 +203,35 @@ class OrderBook(object):
 
         self.__levels[price].append(order)
         self.__total_volumes[price] += order.remaining_volume
+        self.__invalidate_depth(price, order.side)
 
         if order.listener:
             order.listener.on_order_placed(now, order)
 
     def remove_volume_from_level(self, price: int, volume: int, side: Side) -> None:
         if self.__total_volumes[price] == volume:
-            del self.__levels[price]
-            del self.__total_volumes[price]
+            self.__delete_level(price)
             if side == Side.SELL:
                 self.__ask_prices.pop(bisect(self.__ask_prices, -price) - 1)
             elif side == Side.BUY:
                 self.__bid_prices.pop(bisect(self.__bid_prices, price) - 1)
         else:
             self.__total_volumes[price] -= volume
+        self.__invalidate_depth(price, side)
+
+    def replace(self, now: float, order: Order, new_order: Order) -> None:
+        """Replace an order in this order book with a new order in one step.
+
+        The new order loses the time priority of the order it replaces and
+        may trade immediately.
+        """
+        if order.remaining_volume > 0:
+            self.remove_volume_from_level(order.price, order.remaining_volume, order.side)
+            remaining = order.remaining_volume
+            order.remaining_volume = 0
+            if order.listener:
+                order.listener.on_order_replaced(now, order, remaining, new_order)
+            self.insert(now, new_order)
 
     def top_levels(self, ask_prices: List[int], ask_volumes: List[int], bid_prices: List[int],
                    bid_volumes: List[int]) -> None:
@@ -207,12 +261,13 @@ class OrderBook(object):
     def trade_ask(self, now: float, order: Order) -> None:
         """Check to see if any existing bid orders match the specified ask order."""
         best_bid = self.__bid_prices[-1]
+        self.__bid_depth_volumes.clear()
+        self.__bid_depth_values.clear()
 
         while order.remaining_volume > 0 and best_bid >= order.price and self.__total_volumes[best_bid] > 0:
             self.trade_level(now, order, best_bid)
             if self.__total_volumes[best_bid] == 0:
-                del self.__levels[best_bid]
-                del self.__total_volumes[best_bid]
+                self.__delete_level(best_bid)
                 self.__bid_prices.pop()
                 if not self.__bid_prices:
                     break
@@ -221,12 +276,13 @@ class OrderBook(object):
     def trade_bid(self, now: float, order: Order) -> None:
         """Check to see if any existing ask orders match the specified bid order."""
         best_ask = -self.__ask_prices[-1]
+        self.__ask_depth_volumes.clear()
+        self.__ask_depth_values.clear()
 
         while order.remaining_volume > 0 and best_ask <= order.price and self.__total_volumes[best_ask] > 0:
             self.trade_level(now, order, best_ask)
             if self.__total_volumes[best_ask] == 0:
-                del self.__levels[best_ask]
-                del self.__total_volumes[best_ask]
+                self.__delete_level(best_ask)
                 self.__ask_prices.pop()
                 if not self.__ask_prices:
                     break
@@ -240,7 +296,9 @@ class OrderBook(object):
 
         while remaining > 0 and total_volume > 0:
             while order_queue[0].remaining_volume == 0:
-                order_queue.popleft()
+                released: Order = order_queue.popleft()
+                for callback in self.order_released:
+                    callback(released)
             passive: Order = order_queue[0]
             volume: int = remaining if remaining < passive.remaining_volume else passive.remaining_volume
             fee: int = round(best_price * volume * self.maker_fee)
@@ -293,29 +351,48 @@ class OrderBook(object):
     def try_trade(self, side: Side, limit_price: int, volume: int) -> Tuple[int, int]:
         """Return the volume that would trade and the average price per lot for
         the requested trade without changing the order book.
-        """
-        total_volume: int = 0
-        total_value: int = 0
 
+        The cumulative volume and value of the levels from the best price
+        downward are cached, so the answer is found by a binary search.
+        """
         if side == Side.ASK:
-            i = len(self.__bid_prices) - 1
-            while total_volume < volume and i >= 0 and self.__bid_prices[i] and self.__bid_prices[i] >= limit_price:
-                price: int = self.__bid_prices[i]
-                available: int = self.__total_volumes[price]
-                required: int = volume - total_volume
-                weight: int = required if required <= available else available
-                total_volume += weight
-                total_value += weight * price
-                i -= 1
+            prices = self.__bid_prices
+            sign = 1
+            depth_values = self.__bid_depth_values
+            depth_volumes = self.__bid_depth_volumes
+            # Levels with a price of zero never trade
+            available: int = len(prices) - bisect_left(prices, limit_price if limit_price > 0 else 1)
+        else:
+            prices = self.__ask_prices
+            sign = -1
+            depth_values = self.__ask_depth_values
+            depth_volumes = self.__ask_depth_volumes
+            available: int = len(prices) - bisect_left(prices, -limit_price) if prices and prices[-1] else 0
+
+        level_count: int = len(prices)
+        total_volumes = self.__total_volumes
+        depth: int = len(depth_volumes)
+        while depth < available and (depth == 0 or depth_volumes[-1] < volume):
+            price: int = sign * prices[level_count - depth - 1]
+            level_volume: int = total_volumes[price]
+            depth_volumes.append(level_volume + (depth_volumes[-1] if depth else 0))
+            depth_values.append(level_volume * price + (depth_values[-1] if depth else 0))
+            depth += 1
+
+        if depth > available:
+            depth = available
+
+        i: int = bisect_left(depth_volumes, volume, 0, depth)
+        if i < depth:
+            # The whole of the best i levels trade and part of the next one
+            previous_volume: int = depth_volumes[i - 1] if i else 0
+            previous_value: int = depth_values[i - 1] if i else 0
+            total_volume: int = volume
+            total_value: int = previous_value + (volume - previous_volume) * sign * prices[level_count - i - 1]
+        elif depth:
+            total_volume = depth_volumes[depth - 1]
+            total_value = depth_values[depth - 1]
         else:
-            i = len(self.__ask_prices) - 1
-            while total_volume < volume and i >= 0 and -self.__ask_prices[i] and -self.__ask_prices[i] <= limit_price:
-                price: int = -self.__ask_prices[i]
-                available: int = self.__total_volumes[price]
-                required: int = volume - total_volume
-                weight: int = required if required <= available else available
-                total_volume += weight
-                total_value += weight * price
-                i -= 1
+            total_volume = total_value = 0
 
         return total_volume, total_value // total_volume if total_volume > 0 else 0
@@ -0,0 +1,114 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import bisect
+
+from typing import Dict, List, Optional, Union
+
+from .types import Side
+
+# At or above this active order count limit a PriceLevelCounter is cheaper
+# than a SortedPriceList (see benchmarks/price_levels.py)
+PRICE_LEVEL_COUNTER_MIN_ORDERS = 1000
+
+
+class SortedPriceList(object):
+    """Keep the price of each of a competitor's orders on one side of the book.
+
+    The prices are kept in a sorted list with one entry per order, so adding
+    or removing an order costs time proportional to the number of orders,
+    but the work is done by the bisect module. For the small numbers of
+    orders allowed by the default limits this is cheaper than maintaining a
+    PriceLevelCounter.
+    """
+
+    def __init__(self, side: Side):
+        """Initialise a new instance of the SortedPriceList class."""
+        self.best: Optional[int] = None
+        self.side: Side = side
+
+        self.__best_index: int = -1 if side == Side.BUY else 0
+        self.__prices: List[int] = list()
+
+    def __len__(self) -> int:
+        """Return the number of orders."""
+        return len(self.__prices)
+
+    def add(self, price: int) -> None:
+        """Record an order at the given price."""
+        prices = self.__prices
+        bisect.insort(prices, price)
+        self.best = prices[self.__best_index]
+
+    def remove(self, price: int) -> None:
+        """Forget an order at the given price."""
+        prices = self.__prices
+        prices.pop(bisect.bisect(prices, price) - 1)
+        self.best = prices[self.__best_index] if prices else None
+
+
+class PriceLevelCounter(object):
+    """Count a competitor's orders at each price level on one side of the book.
+
+    The best price (the highest bid or the lowest ask) is kept in the best
+    attribute so that it can be read in constant time. Adding or removing
+    an order at a price level that has other orders only changes a counter;
+    the sorted list of distinct prices changes only when a level is created
+    or emptied.
+    """
+
+    def __init__(self, side: Side):
+        """Initialise a new instance of the PriceLevelCounter class."""
+        self.best: Optional[int] = None
+        self.side: Side = side
+
+        self.__best_index: int = -1 if side == Side.BUY else 0
+        self.__counts: Dict[int, int] = dict()
+        self.__prices: List[int] = list()
+
+    def __len__(self) -> int:
+        """Return the number of price levels with at least one order."""
+        return len(self.__prices)
+
+    def add(self, price: int) -> None:
+        """Count an order at the given price."""
+        counts = self.__counts
+        if price in counts:
+            counts[price] += 1
+        else:
+            counts[price] = 1
+            prices = self.__prices
+            bisect.insort(prices, price)
+            self.best = prices[self.__best_index]
+
+    def remove(self, price: int) -> None:
+        """Stop counting an order at the given price."""
+        counts = self.__counts
+        if counts[price] > 1:
+            counts[price] -= 1
+        else:
+            del counts[price]
+            prices = self.__prices
+            prices.pop(bisect.bisect(prices, price) - 1)
+            self.best = prices[self.__best_index] if prices else None
+
+
+def create_price_levels(side: Side, order_count_limit: int) -> Union[SortedPriceList, PriceLevelCounter]:
+    """Return the cheaper way to track prices for the given active order count limit."""
+    if order_count_limit < PRICE_LEVEL_COUNTER_MIN_ORDERS:
+        return SortedPriceList(side)
+    return PriceLevelCounter(side)
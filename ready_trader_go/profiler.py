@@ -0,0 +1,127 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+
+from typing import Counter, Dict, List, Optional
+
+# Seconds between samples
+PROFILER_SAMPLE_INTERVAL = 0.005
+
+
+class SamplingProfiler(object):
+    """A statistical profiler that can be started and stopped in a running process.
+
+    While running, a background thread periodically samples the stack of
+    every other thread. When stopped, the samples are written to a file in
+    the "collapsed stack" format, one line per distinct stack with frames
+    separated by semicolons followed by the number of samples, which is
+    read by flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self, name: str, interval: float = PROFILER_SAMPLE_INTERVAL):
+        """Initialise a new instance of the SamplingProfiler class.
+
+        Output files are named after the given name.
+        """
+        self.interval: float = interval
+        self.logger: logging.Logger = logging.getLogger("PROFILER")
+        self.name: str = name
+
+        self.__frame_names: Dict[object, str] = dict()
+        self.__sample_count: int = 0
+        self.__sampler_task: Optional[threading.Thread] = None
+        self.__stacks: Counter[str] = collections.Counter()
+        self.__started: float = 0.0
+        self.__stopping: threading.Event = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """Return True if this profiler is collecting samples."""
+        return self.__sampler_task is not None
+
+    def __frame_name(self, code) -> str:
+        """Return the name used for frames executing the given code object."""
+        name = self.__frame_names.get(code)
+        if name is None:
+            name = self.__frame_names[code] = "%s (%s:%d)" % (getattr(code, "co_qualname", code.co_name),
+                                                              os.path.basename(code.co_filename),
+                                                              code.co_firstlineno)
+        return name
+
+    def sampler(self) -> None:
+        """Sample the stacks of the other threads until the profiler is stopped."""
+        own_ident: int = threading.get_ident()
+        stacks = self.__stacks
+
+        while not self.__stopping.wait(self.interval):
+            thread_names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                names: List[str] = list()
+                while frame is not None:
+                    names.append(self.__frame_name(frame.f_code))
+                    frame = frame.f_back
+                names.append(thread_names.get(ident, str(ident)))
+                names.reverse()
+                stacks[";".join(names)] += 1
+            self.__sample_count += 1
+
+    def start(self) -> None:
+        """Start collecting samples."""
+        if self.__sampler_task is None:
+            self.logger.info("starting the sampling profiler: interval=%.3f", self.interval)
+            self.__sample_count = 0
+            self.__stacks.clear()
+            self.__started = time.time()
+            self.__stopping.clear()
+            self.__sampler_task = threading.Thread(target=self.sampler, daemon=True, name="profiler")
+            self.__sampler_task.start()
+
+    def stop(self) -> Optional[str]:
+        """Stop collecting samples, write them to a file and return its name."""
+        if self.__sampler_task is None:
+            return None
+
+        self.__stopping.set()
+        self.__sampler_task.join()
+        self.__sampler_task = None
+
+        filename = "%s.%s.folded" % (self.name, time.strftime("%Y%m%d-%H%M%S", time.localtime(self.__started)))
+        try:
+            with open(filename, "w") as profile:
+                for stack, count in self.__stacks.most_common():
+                    profile.write("%s %d\n" % (stack, count))
+        except OSError as e:
+            self.logger.error("failed to write profile: filename=%s", filename, exc_info=e)
+            return None
+
+        self.logger.info("sampling profiler stopped after %d samples: filename=%s", self.__sample_count, filename)
+        return filename
+
+    def toggle(self) -> None:
+        """Start the profiler if it is stopped, otherwise stop it."""
+        if self.running:
+            self.stop()
+        else:
+            self.start()
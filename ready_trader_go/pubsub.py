@@ -107,13 +107,18 @@ class Subscriber(asyncio.ReadTransport):
     memory blocks. An interval between writes gives subscribers time to read
     the data before it is overwritten and the subscriber polls the shared
     memory in order to pick up changes as soon as possible.
+
+    While there is nothing to read, the subscriber either yields to the event
+    loop and polls again on its next iteration (a poll interval of zero) or
+    sleeps for the poll interval, which uses less CPU at the cost of latency.
     """
-    __slots__ = ("_task", "_closed", "_protocol")
+    __slots__ = ("_task", "_closed", "_poll_interval", "_protocol")
 
     def __init__(self, buffer: Union[mmap.mmap, memoryview], from_addr: Tuple[str, int],
-                 protocol: asyncio.DatagramProtocol):
+                 protocol: asyncio.DatagramProtocol, poll_interval: float = 0.0):
         super().__init__()
         self._closed: bool = False
+        self._poll_interval: float = poll_interval
         self._protocol: asyncio.DatagramProtocol = protocol
 
         coro: Coroutine = self._subscribe_worker(buffer, from_addr, protocol)
@@ -123,6 +128,7 @@ class Subscriber(asyncio.ReadTransport):
                                 from_addr: Tuple[str, int],
                                 protocol: asyncio.DatagramProtocol) -> None:
         mask: int = BUFFER_SIZE - 1
+        poll_interval: float = self._poll_interval
         unpack_from = struct.Struct("!I").unpack_from
         protocol.connection_made(self)
 
@@ -130,7 +136,7 @@ class Subscriber(asyncio.ReadTransport):
             pos: int = 0
             while not self._closed:
                 while buffer[pos] == 0:
-                    await asyncio.sleep(0.0)
+                    await asyncio.sleep(poll_interval)
                 length, = unpack_from(buffer, pos + 4)
                 start: int = pos + FRAME_HEADER_SIZE
                 protocol.datagram_received(buffer[start:start + length], from_addr)
@@ -164,8 +170,8 @@ class MmapSubscriber(Subscriber):
     __slots__ = ("__fileno", "__mmap")
 
     def __init__(self, fileno: int, buffer: mmap.mmap, from_addr: Tuple[str, int],
-                 protocol: Optional[asyncio.DatagramProtocol] = None):
-        super().__init__(buffer, from_addr, protocol)
+                 protocol: Optional[asyncio.DatagramProtocol] = None, poll_interval: float = 0.0):
+        super().__init__(buffer, from_addr, protocol, poll_interval)
         self.__fileno: Optional[int] = fileno
         self.__mmap: Optional[mmap.mmap] = buffer
         self._task.add_done_callback(lambda _: self.__close_mmap())
@@ -212,9 +218,10 @@ class PublisherFactory:
 
 class SubscriberFactory:
     """A factory class for Subscribers."""
-    def __init__(self, typ: str, name: str):
+    def __init__(self, typ: str, name: str, poll_interval: float = 0.0):
         if typ not in ("mmap", "shm"):
             raise ValueError("type must be either 'mmap' or 'shm'")
+        self.__poll_interval: float = poll_interval
         self.__typ: str = typ
         self.__name: str = name
 
@@ -233,5 +240,5 @@ class SubscriberFactory:
         if self.__typ == "mmap":
             fileno = os.open(self.__name, os.O_RDONLY)
             mm = mmap.mmap(fileno, BUFFER_SIZE, access=mmap.ACCESS_READ)
-            return MmapSubscriber(fileno, mm, (self.__name, fileno), protocol)
+            return MmapSubscriber(fileno, mm, (self.__name, fileno), protocol, self.__poll_interval)
         raise RuntimeError("SubscriberFactory type was not 'mmap'")
@@ -20,9 +20,11 @@ import csv
 import logging
 import queue
 import threading
+import time
 
 from typing import Callable, List, Optional, TextIO
 
+from . import tracing
 from .account import CompetitorAccount
 
 
@@ -71,6 +73,7 @@ class ScoreBoardWriter:
         self.event_loop: asyncio.AbstractEventLoop = loop
         self.filename: str = filename
         self.finished: bool = False
+        self.last_event_time: float = 0.0
         self.logger = logging.getLogger("SCORE_BOARD")
         self.queue: queue.Queue = queue.Queue()
         self.writer_task: Optional[threading.Thread] = None
@@ -135,6 +138,8 @@ class ScoreBoardWriter:
         """Fetch score records from a queue and write them to a file"""
         count = 0
         fifo = self.queue
+        tracer = tracing.get_tracer()
+        traced: bool = tracing.is_enabled()
 
         try:
             with score_records_file:
@@ -146,7 +151,13 @@ class ScoreBoardWriter:
                 evt = fifo.get()
                 while evt is not None:
                     count += 1
-                    csv_writer.writerow(evt)
+                    if traced:
+                        start = time.perf_counter_ns()
+                        csv_writer.writerow(evt)
+                        tracer.record("ScoreBoardWriter.write", "writer", start, time.perf_counter_ns())
+                    else:
+                        csv_writer.writerow(evt)
+                    self.last_event_time = evt.time
                     evt = fifo.get()
         finally:
             if not self.event_loop.is_closed():
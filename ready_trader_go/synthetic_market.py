@@ -0,0 +1,138 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import asyncio
+import math
+import random
+import threading
+
+from typing import Any, Dict, Iterator, List
+
+from .market_events import MarketEvent, MarketEventOperation, MarketEventsReader
+from .match_events import MatchEvents
+from .order_book import OrderBook
+from .types import Instrument, Lifespan, Side
+
+# The parameters of the synthetic market and their default values
+SYNTHETIC_MARKET_PARAMETERS: Dict[str, Any] = {
+    "Seed": 0,                    # Seed for the random number generator
+    "Duration": 900.0,            # Seconds of market data to generate
+    "InitialPrice": 1000.0,       # Initial midpoint price of both instruments
+    "Volatility": 0.0005,         # Standard deviation of log returns over one second
+    "Correlation": 0.95,          # Correlation of future and ETF returns
+    "ReversionRate": 0.1,         # Rate at which the ETF midpoint reverts to the future midpoint
+    "OrderRate": 20.0,            # Mean number of orders inserted per second for each instrument
+    "CancelRate": 0.05,           # Chance per second that a resting order is cancelled
+    "Depth": 10,                  # Number of price levels on each side of the midpoint
+    "MarketableFraction": 0.05,   # Fraction of orders priced to trade immediately
+    "MaxVolume": 50,              # Largest volume of an order
+}
+
+
+class SyntheticMarketEventsReader(MarketEventsReader):
+    """A processor of market events produced by a stochastic model of the market.
+
+    The midpoint prices of the future and the ETF follow correlated random
+    walks, with the ETF pulled back towards the future. Orders arrive for
+    each instrument as a Poisson process and are placed up to a given number
+    of ticks from the midpoint and each resting order is cancelled at a
+    constant rate. The same seed always produces the same market events.
+    """
+
+    def __init__(self, parameters: Dict[str, Any], tick_size: float, loop: asyncio.AbstractEventLoop,
+                 future_book: OrderBook, etf_book: OrderBook, match_events: MatchEvents):
+        """Initialise a new instance of the SyntheticMarketEventsReader class."""
+        self.parameters: Dict[str, Any] = dict(SYNTHETIC_MARKET_PARAMETERS, **parameters)
+        self.tick_size: int = int(tick_size * 100.0)  # convert tick size to cents
+
+        super().__init__([], loop, future_book, etf_book, match_events, 0.0, self.parameters["Duration"])
+
+    def generate_events(self) -> Iterator[MarketEvent]:
+        """Yield an endless series of market events."""
+        params = self.parameters
+        rng = random.Random(params["Seed"])
+        tick_size: int = self.tick_size
+        depth: int = params["Depth"]
+        marketable_fraction: float = params["MarketableFraction"]
+        max_volume: int = params["MaxVolume"]
+        order_rate: float = params["OrderRate"]
+        cancel_rate: float = params["CancelRate"]
+        volatility: float = params["Volatility"]
+        correlation: float = params["Correlation"]
+        independence: float = math.sqrt(1.0 - correlation * correlation)
+        reversion_rate: float = params["ReversionRate"]
+
+        # Log midpoint prices (in cents) of the future and ETF
+        future_mid = etf_mid = math.log(params["InitialPrice"] * 100.0)
+        resting: List[List[int]] = [list(), list()]
+        next_order_id: int = 1
+        now: float = 0.0
+
+        while True:
+            total_rate = 2.0 * order_rate + cancel_rate * (len(resting[0]) + len(resting[1]))
+            elapsed = rng.expovariate(total_rate)
+            now += elapsed
+
+            # Evolve the midpoints over the time since the last event
+            scale = volatility * math.sqrt(elapsed)
+            shock = rng.gauss(0.0, 1.0)
+            future_mid += scale * shock
+            etf_mid += (scale * (correlation * shock + independence * rng.gauss(0.0, 1.0))
+                        + (future_mid - etf_mid) * (1.0 - math.exp(-reversion_rate * elapsed)))
+
+            choice = rng.random() * total_rate
+            if choice < 2.0 * order_rate:
+                instrument = Instrument.FUTURE if choice < order_rate else Instrument.ETF
+                mid = math.exp(future_mid if instrument == Instrument.FUTURE else etf_mid) / tick_size
+                side = Side.BUY if rng.random() < 0.5 else Side.SELL
+                if rng.random() < marketable_fraction:
+                    # Cross the spread by up to the full depth of the book
+                    offset = -rng.randint(1, depth)
+                    lifespan = Lifespan.FILL_AND_KILL
+                else:
+                    offset = rng.randint(0, depth - 1)
+                    lifespan = Lifespan.GOOD_FOR_DAY
+                if side == Side.BUY:
+                    price = (math.ceil(mid) - 1 - offset) * tick_size
+                else:
+                    price = (math.floor(mid) + 1 + offset) * tick_size
+                if price > 0:
+                    if lifespan == Lifespan.GOOD_FOR_DAY:
+                        resting[instrument].append(next_order_id)
+                    yield MarketEvent(now, instrument, MarketEventOperation.INSERT, next_order_id, side,
+                                      rng.randint(1, max_volume), price, lifespan)
+                    next_order_id += 1
+            else:
+                # Cancel a resting order chosen at random. It may already have
+                # traded, in which case the cancel has no effect.
+                i = rng.randrange(len(resting[0]) + len(resting[1]))
+                instrument = Instrument.FUTURE if i < len(resting[0]) else Instrument.ETF
+                orders = resting[instrument]
+                if instrument == Instrument.ETF:
+                    i -= len(resting[0])
+                orders[i], orders[-1] = orders[-1], orders[i]
+                yield MarketEvent(now, instrument, MarketEventOperation.CANCEL, orders.pop(), None, 0, 0, None)
+
+    def generator(self) -> None:
+        """Generate market events and place them in the queue."""
+        count = self.queue_events(self.generate_events())
+        self.event_loop.call_soon_threadsafe(self.on_reader_done, count)
+
+    def start(self):
+        """Start the market events generator thread"""
+        self.reader_task = threading.Thread(target=self.generator, daemon=True, name="reader")
+        self.reader_task.start()
@@ -21,24 +21,36 @@ import time
 
 from typing import Any, Callable, List, Optional
 
+from . import latency
+
 
 class Timer:
-    """A timer."""
+    """A timer.
+
+    If the tick interval is None the timer keeps time but does not tick.
+    """
 
-    def __init__(self, tick_interval: float, speed: float):
+    def __init__(self, tick_interval: Optional[float], speed: float, name: str = "Timer"):
         """Initialise a new instance of the timer class."""
         self.__event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__lag_latency = latency.get_histogram("EventLoop.%sLag" % name)
         self.__logger: logging.Logger = logging.getLogger("TIMER")
+        self.__running: bool = False
         self.__speed: float = speed
         self.__start_time: float = 0.0
         self.__tick_timer_handle: Optional[asyncio.TimerHandle] = None
-        self.__tick_interval: float = tick_interval
+        self.__tick_interval: Optional[float] = tick_interval
 
         # Signals
         self.timer_started: List[Callable[[Any, float], None]] = list()
         self.timer_stopped: List[Callable[[Any, float], None]] = list()
         self.timer_ticked: List[Callable[[Any, float, int], None]] = list()
 
+    @property
+    def tick_interval(self) -> Optional[float]:
+        """Return the interval between ticks of this timer."""
+        return self.__tick_interval
+
     def advance(self) -> float:
         """Advance the timer."""
         if self.__start_time:
@@ -46,9 +58,14 @@ class Timer:
             return now
         return 0.0
 
+    def call_at(self, when: float, callback: Callable[..., Any], *args: Any) -> asyncio.TimerHandle:
+        """Arrange for a callback to be called at the given time on this timer's clock."""
+        return self.__event_loop.call_at(self.__start_time + when / self.__speed, callback, *args)
+
     def __on_timer_tick(self, tick_time: float, tick_number: int):
         """Called on each timer tick."""
         now = (time.monotonic() - self.__start_time) * self.__speed
+        self.__lag_latency.record(int((now - tick_time) / self.__speed * 1e9))
 
         # There may have been a delay, so work out which tick this really is
         skipped_ticks: float = (now - tick_time) // self.__tick_interval
@@ -59,6 +76,10 @@ class Timer:
         for callback in self.timer_ticked:
             callback(self, now, tick_number)
 
+        # A callback may have stopped the timer
+        if not self.__running:
+            return
+
         tick_time += self.__tick_interval
         self.__tick_timer_handle = self.__event_loop.call_at(self.__start_time + tick_time/self.__speed,
                                                              self.__on_timer_tick, tick_time, tick_number + 1)
@@ -67,14 +88,24 @@ class Timer:
         """Start this timer."""
         self.__event_loop = asyncio.get_running_loop()
         self.__start_time = time.monotonic()
+        self.__running = True
         for callback in self.timer_started:
             callback(self, self.__start_time)
-        self.__on_timer_tick(0.0, 1)
+        if self.__tick_interval is not None:
+            self.__on_timer_tick(0.0, 1)
 
-    def shutdown(self, now: float, reason: str) -> None:
-        """Shut down this timer."""
-        self.__logger.info("shutting down the match: time=%.6f reason='%s'", now, reason)
+    def stop(self) -> None:
+        """Stop this timer ticking without shutting down the match."""
+        self.__running = False
         if self.__tick_timer_handle:
             self.__tick_timer_handle.cancel()
+            self.__tick_timer_handle = None
+
+    def shutdown(self, now: float, reason: str) -> None:
+        """Shut down this timer, unless it has already stopped."""
+        if not self.__running:
+            return
+        self.__logger.info("shutting down the match: time=%.6f reason='%s'", now, reason)
+        self.stop()
         for callback in self.timer_stopped:
             callback(self, now)
@@ -0,0 +1,101 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+from typing import Any, Callable, List, Optional, Set
+
+from .timer import Timer
+
+TIMER_WHEEL_RESOLUTION = 0.1
+TIMER_WHEEL_SLOT_COUNT = 1024
+
+
+class TimerWheelEntry(object):
+    """A reusable timeout that can be scheduled on a TimerWheel."""
+    __slots__ = ("callback", "expiry", "slot")
+
+    def __init__(self, callback: Callable[[], Any]):
+        """Initialise a new instance of the TimerWheelEntry class."""
+        self.callback: Callable[[], Any] = callback
+        self.expiry: float = 0.0
+        self.slot: Optional[Set[TimerWheelEntry]] = None
+
+    @property
+    def active(self) -> bool:
+        """Return True if this entry is scheduled and has not yet expired."""
+        return self.slot is not None
+
+
+class TimerWheel(object):
+    """A hashed timing wheel.
+
+    Timeouts are placed in one of a fixed number of slots according to their
+    expiry time, which makes scheduling and cancelling a timeout a constant
+    time operation. The wheel is driven by a Timer, so that a single timer
+    callback serves every timeout, and times are measured on that Timer's
+    clock (which may be running faster than real time).
+    """
+
+    def __init__(self, timer: Timer, slot_count: int = TIMER_WHEEL_SLOT_COUNT):
+        """Initialise a new instance of the TimerWheel class."""
+        self.__current_tick: int = 0
+        self.__resolution: float = timer.tick_interval
+        self.__slots: List[Set[TimerWheelEntry]] = [set() for _ in range(slot_count)]
+        self.__timer: Timer = timer
+
+        timer.timer_ticked.append(self.on_timer_tick)
+
+    def cancel(self, entry: TimerWheelEntry) -> None:
+        """Cancel a scheduled entry. Cancelling an inactive entry has no effect."""
+        if entry.slot is not None:
+            entry.slot.discard(entry)
+            entry.slot = None
+
+    def on_timer_tick(self, timer: Timer, now: float, tick_number: int) -> None:
+        """Call the callbacks of any entries that have expired."""
+        last_tick: int = int(now / self.__resolution)
+        slot_count: int = len(self.__slots)
+
+        # Visit each slot at most once, however long since the last tick
+        tick: int = self.__current_tick if last_tick - self.__current_tick < slot_count else last_tick - slot_count + 1
+        while tick <= last_tick:
+            slot = self.__slots[tick % slot_count]
+            if slot:
+                expired = [e for e in slot if e.expiry <= now]
+                for entry in expired:
+                    slot.discard(entry)
+                    entry.slot = None
+                for entry in expired:
+                    entry.callback()
+            tick += 1
+
+        self.__current_tick = last_tick + 1
+
+    def schedule(self, entry: TimerWheelEntry, delay: float) -> None:
+        """Schedule an entry to expire after the given delay.
+
+        If the entry is already scheduled, it is rescheduled.
+        """
+        if entry.slot is not None:
+            entry.slot.discard(entry)
+
+        entry.expiry = self.__timer.advance() + delay
+        # Round up so the entry is due when its slot is visited
+        tick: int = int(entry.expiry / self.__resolution) + 1
+        if tick < self.__current_tick:
+            tick = self.__current_tick
+        entry.slot = self.__slots[tick % len(self.__slots)]
+        entry.slot.add(entry)
@@ -0,0 +1,186 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import asyncio
+import collections
+import json
+import logging
+import os
+import threading
+import time
+
+from typing import Any, Deque, Dict, Optional, TextIO, Tuple, Union
+
+# How often, in seconds, recorded spans are written to the trace file
+TRACE_FLUSH_INTERVAL = 0.25
+
+
+class Tracer(object):
+    """A recorder of spans that it writes to a file in the Chrome trace event format.
+
+    Spans are appended to a deque by the threads that record them and
+    written to the file by a background thread, so recording a span costs
+    little more than reading the clock. The file is a JSON array of
+    complete ("X") events that can be opened in chrome://tracing or the
+    Perfetto UI. While tracing, every callback run by a standard asyncio
+    event loop is recorded as a span named after the callback. Other event
+    loops, such as uvloop, do not run callbacks through asyncio.Handle, so
+    their callbacks are not traced.
+    """
+
+    def __init__(self, filename: str):
+        """Initialise a new instance of the Tracer class."""
+        self.filename: str = filename
+        self.logger: logging.Logger = logging.getLogger("TRACING")
+
+        self.__names: Dict[Any, str] = dict()
+        self.__original_handle_run = None
+        self.__origin: int = time.perf_counter_ns()
+        self.__spans: Deque[Tuple[str, str, int, int, int]] = collections.deque()
+        self.__stopped: threading.Event = threading.Event()
+        self.__threads: Dict[int, str] = dict()
+        self.__writer_task: Optional[threading.Thread] = None
+
+    def __callback_name(self, callback: Any) -> str:
+        """Return a readable name for an event loop callback."""
+        owner = getattr(callback, "__self__", None)
+        func = getattr(callback, "__func__", callback)
+        if isinstance(owner, asyncio.Future) and hasattr(owner, "get_coro"):
+            coro = owner.get_coro()
+            return "Task " + getattr(coro, "__qualname__", type(coro).__name__)
+
+        # Transport callbacks are named after the protocol they serve
+        protocol = getattr(owner, "_protocol", None)
+        key = (func, type(protocol))
+        name = self.__names.get(key)
+        if name is None:
+            name = getattr(func, "__qualname__", None) or repr(func)
+            if protocol is not None:
+                name = "%s [%s]" % (name, type(protocol).__name__)
+            self.__names[key] = name
+        return name
+
+    def record(self, name: str, category: str, start: int, end: int) -> None:
+        """Record a span of the current thread between two perf_counter_ns times."""
+        ident = threading.get_ident()
+        if ident not in self.__threads:
+            self.__threads[ident] = threading.current_thread().name
+        self.__spans.append((name, category, start, end, ident))
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start tracing the given event loop."""
+        try:
+            trace_file = open(self.filename, "w")
+        except OSError as e:
+            self.logger.error("failed to open trace file: filename=%s", self.filename, exc_info=e)
+            raise
+
+        self.__writer_task = threading.Thread(target=self.writer, args=(trace_file,), daemon=True, name="tracing")
+        self.__writer_task.start()
+
+        if not isinstance(loop, asyncio.BaseEventLoop):
+            self.logger.warning("callbacks run by this event loop cannot be traced: loop=%s.%s",
+                                type(loop).__module__, type(loop).__qualname__)
+            return
+
+        tracer = self
+        original_run = self.__original_handle_run = asyncio.events.Handle._run
+
+        def traced_run(handle: asyncio.Handle) -> None:
+            start = time.perf_counter_ns()
+            original_run(handle)
+            tracer.record(tracer.__callback_name(handle._callback), "loop", start, time.perf_counter_ns())
+
+        asyncio.events.Handle._run = traced_run
+
+    def stop(self) -> None:
+        """Stop tracing and finish writing the trace file."""
+        if self.__original_handle_run is not None:
+            asyncio.events.Handle._run = self.__original_handle_run
+            self.__original_handle_run = None
+        if self.__writer_task is not None:
+            self.__stopped.set()
+            self.__writer_task.join()
+            self.__writer_task = None
+
+    def writer(self, trace_file: TextIO) -> None:
+        """Write recorded spans to the trace file until tracing stops."""
+        count: int = 0
+        origin: int = self.__origin
+        pid: int = os.getpid()
+        spans = self.__spans
+        named_threads: Dict[int, int] = dict()
+
+        with trace_file:
+            trace_file.write("[\n")
+            finished = False
+            while not finished:
+                finished = self.__stopped.wait(TRACE_FLUSH_INTERVAL)
+                lines = list()
+                while spans:
+                    name, category, start, end, ident = spans.popleft()
+                    if ident not in named_threads:
+                        named_threads[ident] = len(named_threads) + 1
+                        lines.append(json.dumps({"name": "thread_name", "ph": "M", "pid": pid,
+                                                 "tid": named_threads[ident],
+                                                 "args": {"name": self.__threads.get(ident, str(ident))}}))
+                    lines.append('{"name":%s,"cat":"%s","ph":"X","ts":%.3f,"dur":%.3f,"pid":%d,"tid":%d}'
+                                 % (json.dumps(name), category, (start - origin) / 1000.0, (end - start) / 1000.0,
+                                    pid, named_threads[ident]))
+                if lines:
+                    trace_file.write(",\n".join(lines) if count == 0 else ",\n" + ",\n".join(lines))
+                    count += len(lines)
+                    trace_file.flush()
+            trace_file.write("\n]\n")
+
+        self.logger.info("trace complete after writing %d events to %s", count, self.filename)
+
+
+class NullTracer(object):
+    """A tracer that discards everything recorded in it."""
+
+    def record(self, name: str, category: str, start: int, end: int) -> None:
+        """Discard a span."""
+        pass
+
+
+__tracer: Union[Tracer, NullTracer] = NullTracer()
+
+
+def get_tracer() -> Union[Tracer, NullTracer]:
+    """Return the active tracer, which discards spans if tracing has not been started."""
+    return __tracer
+
+
+def is_enabled() -> bool:
+    """Return True if tracing has been started."""
+    return isinstance(__tracer, Tracer)
+
+
+def start_tracing(filename: str, loop: asyncio.AbstractEventLoop) -> None:
+    """Start tracing the given event loop to the named file."""
+    global __tracer
+    __tracer = Tracer(filename)
+    __tracer.start(loop)
+
+
+def stop_tracing() -> None:
+    """Stop tracing, if it was started, and finish writing the trace file."""
+    global __tracer
+    if isinstance(__tracer, Tracer):
+        __tracer.stop()
+        __tracer = NullTracer()
@@ -22,13 +22,18 @@ import os
 import socket
 import sys
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 from .application import Application
 from .base_auto_trader import BaseAutoTrader
+from .metrics import AutoTraderMetricsCollector, create_metrics_server, validate_metrics_config
 from .pubsub import SubscriberFactory
 
 
+# How long a reconnecting auto-trader keeps trying to reach the exchange
+RECONNECT_INTERVAL = 0.05
+RECONNECT_TIMEOUT = 5.0
+
 # From Python 3.8, the proactor event loop is used by default on Windows
 if sys.platform == "win32" and hasattr(asyncio, "WindowsSelectorEventLoopPolicy"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -63,6 +68,10 @@ def __config_validator(config):
 
     __validate_hostname(config, "Execution", "Host")
 
+    if "PollInterval" in config["Information"]:
+        if type(config["Information"]["PollInterval"]) is not float or config["Information"]["PollInterval"] < 0.0:
+            raise Exception("PollInterval in Information configuration should be a non-negative number")
+
     if type(config["TeamName"]) is not str:
         raise Exception("TeamName has inappropriate type")
     if len(config["TeamName"]) < 1 or len(config["TeamName"]) > 50:
@@ -73,9 +82,80 @@ def __config_validator(config):
     if len(config["Secret"]) < 1 or len(config["Secret"]) > 50:
         raise Exception("Secret must be at least one, and no more than fifty, characters long")
 
+    if "Metrics" in config:
+        validate_metrics_config(config)
+        if "Path" not in config["Metrics"]:
+            __validate_hostname(config, "Metrics", "Host")
+
+    if "Reconnect" in config and type(config["Reconnect"]) is not bool:
+        raise Exception("Reconnect should be true or false")
+
     return True
 
 
+class InformationRelay(asyncio.DatagramProtocol):
+    """Pass information messages on to the current auto-trader.
+
+    When an auto-trader reconnects for each of a series of matches, a single
+    subscription to the information channel serves every match, so that
+    the subscriber never falls out of step with the exchange's publisher.
+    """
+
+    def __init__(self):
+        """Initialise a new instance of the InformationRelay class."""
+        self.auto_trader: Optional[BaseAutoTrader] = None
+
+    def datagram_received(self, data: bytes, address: Tuple[str, int]) -> None:
+        """Callback when a datagram is received."""
+        if self.auto_trader is not None:
+            self.auto_trader.datagram_received(data, address)
+
+
+class MatchConnection(asyncio.Protocol):
+    """Pass the events of an execution connection on to an auto-trader.
+
+    Between matches, a reconnecting auto-trader's connection waits in the
+    backlog of the exchange's listening socket until the next match starts.
+    If the exchange exits instead, the connection is reset before the
+    auto-trader has heard from the exchange, which marks the end of the
+    series of matches rather than an error.
+    """
+
+    def __init__(self, auto_trader: BaseAutoTrader):
+        """Initialise a new instance of the MatchConnection class."""
+        self.auto_trader: BaseAutoTrader = auto_trader
+        self.series_complete: bool = False
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Called when the execution connection is established."""
+        self.auto_trader.connection_made(transport)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """Called when the execution connection is lost."""
+        auto_trader = self.auto_trader
+        if (isinstance(exc, ConnectionResetError) and auto_trader.messages_received == 0
+                and auto_trader.datagrams_received == 0):
+            self.series_complete = True
+            exc = None
+        auto_trader.connection_lost(exc)
+
+    def data_received(self, data: bytes) -> None:
+        """Called when data is received on the execution connection."""
+        self.auto_trader.data_received(data)
+
+    def eof_received(self) -> Optional[bool]:
+        """Called when the exchange closes its end of the execution connection."""
+        return self.auto_trader.eof_received()
+
+    def pause_writing(self) -> None:
+        """Called when the execution connection's send buffer is full."""
+        self.auto_trader.pause_writing()
+
+    def resume_writing(self) -> None:
+        """Called when the execution connection's send buffer has drained."""
+        self.auto_trader.resume_writing()
+
+
 async def __start_autotrader(auto_trader: BaseAutoTrader, config: Dict[str, Any],
                              loop: asyncio.AbstractEventLoop) -> None:
     """Initialise an auto-trader."""
@@ -90,17 +170,95 @@ async def __start_autotrader(auto_trader: BaseAutoTrader, config: Dict[str, Any]
         return
 
     info = config["Information"]
-    sub_factory = SubscriberFactory(info["Type"], info["Name"])
+    sub_factory = SubscriberFactory(info["Type"], info["Name"], info.get("PollInterval", 0.0))
     sub_factory.create(auto_trader)
 
 
+async def __connect_match(connection: MatchConnection, config: Dict[str, Any], loop: asyncio.AbstractEventLoop,
+                          retry_timeout: float) -> Optional[OSError]:
+    """Connect to the exchange for a match, retrying until the retry timeout expires.
+
+    Return None if the connection was made, otherwise stop the event loop
+    and return the error.
+    """
+    exec_ = config["Execution"]
+    deadline = loop.time() + retry_timeout
+    while True:
+        try:
+            await loop.create_connection(lambda: connection, exec_["Host"], exec_["Port"])
+            return None
+        except OSError as e:
+            if loop.time() >= deadline:
+                loop.stop()
+                return e
+        await asyncio.sleep(RECONNECT_INTERVAL)
+
+
+def __run_reconnecting(app: Application, auto_trader_class: Any) -> None:
+    """Run a new auto-trader for each match until the exchange finishes its series of matches."""
+    loop = app.event_loop
+    logger = logging.getLogger("INIT")
+    info = app.config["Information"]
+    relay = InformationRelay()
+    SubscriberFactory(info["Type"], info["Name"], info.get("PollInterval", 0.0)).create(relay)
+
+    collector: Optional[AutoTraderMetricsCollector] = None
+    if "Metrics" in app.config:
+        metrics_server = create_metrics_server(app.config["Metrics"])
+        collector = AutoTraderMetricsCollector(relay.auto_trader)
+        metrics_server.collectors.append(collector)
+        loop.create_task(metrics_server.start())
+
+    matches: int = 0
+    while True:
+        relay.auto_trader = auto_trader_class(loop, app.config["TeamName"], app.config["Secret"])
+        if collector is not None:
+            collector.auto_trader = relay.auto_trader
+        connection = MatchConnection(relay.auto_trader)
+        # The exchange's socket stays open between matches, so only the first connection is retried
+        retry_timeout = RECONNECT_TIMEOUT if matches == 0 else 0.0
+        task = loop.create_task(__connect_match(connection, app.config, loop, retry_timeout))
+        app.run_until_stopped()
+        if app.interrupted or not task.done():
+            task.cancel()
+            break
+        if task.result() is not None:
+            if matches == 0:
+                logger.error("execution connection failed: %s", task.result().strerror)
+            else:
+                logger.info("series of matches complete: matches=%d", matches)
+            break
+        if connection.series_complete:
+            logger.info("series of matches complete: matches=%d", matches)
+            break
+        matches += 1
+
+
 def main(name: str = "autotrader") -> None:
-    """Import the 'AutoTrader' class from the named module a run it."""
+    """Import the 'AutoTrader' class from the named module a run it.
+
+    If the configuration's Reconnect setting is true, a new auto-trader
+    connects to the exchange after each match, so that one process can
+    take part in a series of matches.
+    """
     app = Application(name, __config_validator)
 
     sys.path.insert(0, os.getcwd())
     mod = importlib.import_module(name)
+
+    if app.config.get("Reconnect", False):
+        try:
+            __run_reconnecting(app, mod.AutoTrader)
+        finally:
+            app.close()
+        return
+
     auto_trader = mod.AutoTrader(app.event_loop, app.config["TeamName"], app.config["Secret"])
 
+    if "Metrics" in app.config:
+        metrics_server = create_metrics_server(app.config["Metrics"])
+        metrics_server.collectors.append(AutoTraderMetricsCollector(auto_trader))
+        app.event_loop.create_task(metrics_server.start())
+
     app.event_loop.create_task(__start_autotrader(auto_trader, app.config, app.event_loop))
     app.run()
@@ -65,6 +65,19 @@ class ICompetitor:
         """Called when an insert order request is received from the competitor."""
         raise NotImplementedError()
 
+    def on_mass_cancel_message(self, now: float, side: int) -> None:
+        """Called when a mass cancel request is received from the competitor."""
+        raise NotImplementedError()
+
+    def on_mass_quote_message(self, now: float, bid_client_order_id: int, bid_price: int, bid_volume: int,
+                              ask_client_order_id: int, ask_price: int, ask_volume: int) -> None:
+        """Called when a mass quote request is received from the competitor."""
+        raise NotImplementedError()
+
+    def on_replace_message(self, now: float, client_order_id: int, price: int, volume: int) -> None:
+        """Called when a replace order request is received from the competitor."""
+        raise NotImplementedError()
+
 
 class IController:
     def advance_time(self):
@@ -88,6 +101,12 @@ class IExecutionConnection:
         """Send an order filled message to the auto-trader."""
         raise NotImplementedError()
 
+    def send_order_fill(self, client_order_id: int, price: int, volume: int, fill_volume: int,
+                        remaining_volume: int, fees: int) -> None:
+        """Send order filled and order status messages to the auto-trader."""
+        self.send_order_filled(client_order_id, price, volume)
+        self.send_order_status(client_order_id, fill_volume, remaining_volume, fees)
+
     def send_order_status(self, client_order_id: int, fill_volume: int, remaining_volume: int, fees: int) -> None:
         """Send an order status message to the auto-trader."""
         raise NotImplementedError()
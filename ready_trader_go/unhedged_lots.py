@@ -1,6 +1,6 @@
-import asyncio
+from typing import Any, Callable
 
-from typing import Any, Callable, Optional
+from .timer_wheel import TimerWheel, TimerWheelEntry
 
 MAX_UNHEDGED_LOTS: int = 10
 UNHEDGED_LOTS_TIME_LIMIT: int = 60
@@ -9,11 +9,12 @@ UNHEDGED_LOTS_TIME_LIMIT: int = 60
 class UnhedgedLots:
     """Keep track of unhedged lots and call a callback if unhedged lots are held for too long."""
 
-    def __init__(self, callback: Callable[[], Any]):
+    def __init__(self, callback: Callable[[], Any], timer_wheel: TimerWheel):
         """Initialise a new instance of the UnhedgedLots class."""
         self.callback: Callable[[], None] = callback
         self.relative_position: int = 0
-        self.timer_handle: Optional[asyncio.TimerHandle] = None
+        self.timeout: TimerWheelEntry = TimerWheelEntry(callback)
+        self.timer_wheel: TimerWheel = timer_wheel
 
     @property
     def unhedged_lot_count(self) -> int:
@@ -30,16 +31,16 @@ class UnhedgedLots:
 
         if delta > 0:
             if self.relative_position < -MAX_UNHEDGED_LOTS <= new_relative_position:
-                self.timer_handle.cancel()
+                self.timer_wheel.cancel(self.timeout)
 
             if new_relative_position > MAX_UNHEDGED_LOTS >= self.relative_position:
-                self.timer_handle = asyncio.get_running_loop().call_later(UNHEDGED_LOTS_TIME_LIMIT, self.callback)
+                self.timer_wheel.schedule(self.timeout, UNHEDGED_LOTS_TIME_LIMIT)
         elif delta < 0:
             if self.relative_position > MAX_UNHEDGED_LOTS >= new_relative_position:
-                self.timer_handle.cancel()
+                self.timer_wheel.cancel(self.timeout)
 
             if new_relative_position < -MAX_UNHEDGED_LOTS <= self.relative_position:
-                self.timer_handle = asyncio.get_running_loop().call_later(UNHEDGED_LOTS_TIME_LIMIT, self.callback)
+                self.timer_wheel.schedule(self.timeout, UNHEDGED_LOTS_TIME_LIMIT)
 
         self.relative_position = new_relative_position
 
@@ -47,9 +48,10 @@ class UnhedgedLots:
 class UnhedgedLotsFactory:
     """A factory class for UnhedgedLots instances."""
 
-    def __init__(self):
+    def __init__(self, timer_wheel: TimerWheel):
         """Initialise a new instance of the UnhedgedLotsFactory class."""
+        self.timer_wheel: TimerWheel = timer_wheel
 
     def create(self, callback: Callable[[], Any]) -> UnhedgedLots:
         """Return a new instance of the UnhedgedLots class."""
-        return UnhedgedLots(callback)
+        return UnhedgedLots(callback, self.timer_wheel)
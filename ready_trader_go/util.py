@@ -16,11 +16,59 @@
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
 import asyncio
+import gc
 import ipaddress
+import logging
 import socket
 import sys
+import time
 
-from typing import Callable, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class GarbageCollectionMonitor(object):
+    """Count garbage collections and measure the time they pause the program."""
+
+    def __init__(self):
+        """Initialise a new instance of the GarbageCollectionMonitor class."""
+        self.collections: List[int] = [0] * len(gc.get_count())
+        self.collected: int = 0
+        self.logger: logging.Logger = logging.getLogger("GC")
+        self.longest_pause: float = 0.0
+        self.total_pause: float = 0.0
+
+        self.__start_time: float = 0.0
+
+    def on_gc_event(self, phase: str, info: Dict[str, int]) -> None:
+        """Callback from the garbage collector at the start and end of a collection."""
+        if phase == "start":
+            self.__start_time = time.perf_counter()
+        else:
+            pause: float = time.perf_counter() - self.__start_time
+            self.collections[info["generation"]] += 1
+            self.collected += info["collected"]
+            self.total_pause += pause
+            if pause > self.longest_pause:
+                self.longest_pause = pause
+
+    def on_task_complete(self, _: Any) -> None:
+        """Log the garbage collection statistics when a task is complete."""
+        self.log_statistics()
+
+    def log_statistics(self) -> None:
+        """Log the garbage collection statistics gathered so far."""
+        self.logger.info("garbage collections: generations=%s collected=%d total_pause=%.6f longest_pause=%.6f",
+                         "/".join(map(str, self.collections)), self.collected, self.total_pause,
+                         self.longest_pause)
+
+    def start(self) -> None:
+        """Start monitoring garbage collections."""
+        gc.callbacks.append(self.on_gc_event)
+
+    def stop(self) -> None:
+        """Stop monitoring garbage collections."""
+        if self.on_gc_event in gc.callbacks:
+            gc.callbacks.remove(self.on_gc_event)
 
 
 async def create_datagram_endpoint(loop: asyncio.AbstractEventLoop,
@@ -16,16 +16,22 @@
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
 import argparse
+import json
 import multiprocessing
+import multiprocessing.pool
 import pathlib
 import subprocess
 import sys
-import time
 import traceback
 
+from typing import Any
+
 import ready_trader_go.exchange
 import ready_trader_go.trader
 
+from ready_trader_go.load_test import (DEFAULT_LOAD_TEST_MIX, DEFAULT_LOAD_TEST_RATE_FRACTION, LoadTestResults,
+                                       load_test_team_names, parse_load_test_mix, run_load_test_worker)
+
 try:
     from ready_trader_go.hud.__main__ import main as hud_main, replay as hud_replay
 except ImportError:
@@ -49,7 +55,51 @@ def replay(args) -> None:
         print("'%s' is not a regular file" % str(path), file=sys.stderr)
         return
 
-    hud_replay(path)
+    hud_replay(path, args.speed)
+
+
+def load(args) -> None:
+    """Run a load test of the exchange simulator with many synthetic auto-traders."""
+    try:
+        with open("exchange.json") as config_file:
+            config = json.load(config_file)
+        mix = parse_load_test_mix(args.mix) if args.mix else DEFAULT_LOAD_TEST_MIX
+    except (OSError, ValueError) as e:
+        print("cannot start the load test: %s" % e, file=sys.stderr)
+        return
+    if "LoadTest" not in config:
+        print("exchange.json has no LoadTest section to describe the load test teams", file=sys.stderr)
+        return
+
+    team_names = load_test_team_names(config["LoadTest"])[:args.teams]
+    limits = config["Limits"]
+    rate = args.rate or (DEFAULT_LOAD_TEST_RATE_FRACTION * limits["MessageFrequencyLimit"] * config["Engine"]["Speed"]
+                         / limits["MessageFrequencyInterval"])
+    process_count = max(1, min(args.processes, len(team_names)))
+    print("running %d teams in %d processes at %.1f requests per second each for %.0f seconds"
+          % (len(team_names), process_count, rate, args.duration))
+
+    with multiprocessing.Manager() as manager, multiprocessing.Pool(process_count + 1, maxtasksperchild=1) as pool:
+        ready_event = manager.Event()
+        # The market opens once the load test teams, rather than the configured traders, have logged in
+        exchange = pool.apply_async(ready_trader_go.exchange.main, (ready_event, team_names),
+                                    error_callback=lambda e: on_error("The exchange simulator", e))
+        if not wait_for_exchange(exchange, ready_event):
+            return
+
+        workers = [pool.apply_async(run_load_test_worker,
+                                    (config, team_names[i::process_count], rate, mix, args.duration, args.seed + i),
+                                    error_callback=lambda e: on_error("A load test process", e))
+                   for i in range(process_count)]
+
+        results = LoadTestResults()
+        for worker in workers:
+            worker.wait()
+            if worker.successful():
+                results.merge(worker.get())
+        exchange.wait()
+
+    print(results.report())
 
 
 def on_error(name: str, error: Exception) -> None:
@@ -57,6 +107,17 @@ def on_error(name: str, error: Exception) -> None:
     traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
 
 
+def wait_for_exchange(exchange: multiprocessing.pool.AsyncResult, ready_event: Any) -> bool:
+    """Wait until the exchange simulator is accepting auto-trader connections.
+
+    Return False if the exchange simulator stopped before it was ready.
+    """
+    while not ready_event.wait(0.1):
+        if exchange.ready():
+            return False
+    return True
+
+
 def run(args) -> None:
     """Run a match."""
     for auto_trader in args.autotrader:
@@ -70,13 +131,14 @@ def run(args) -> None:
             print("'%s': configuration file is missing: %s" % (auto_trader, auto_trader.with_suffix(".json")))
             return
 
-    with multiprocessing.Pool(len(args.autotrader) + 2, maxtasksperchild=1) as pool:
-        exchange = pool.apply_async(ready_trader_go.exchange.main,
+    with multiprocessing.Manager() as manager, \
+            multiprocessing.Pool(len(args.autotrader) + 2, maxtasksperchild=1) as pool:
+        ready_event = manager.Event()
+        exchange = pool.apply_async(ready_trader_go.exchange.main, (ready_event,),
                                     error_callback=lambda e: on_error("The exchange simulator", e))
+        if not wait_for_exchange(exchange, ready_event):
+            return
 
-        # Give the exchange simulator a chance to start up.
-        time.sleep(0.5)
-        
         for path in args.autotrader:
             if path.suffix.lower() == ".py":
                 pool.apply_async(ready_trader_go.trader.main, (path.with_suffix("").name,),
@@ -111,6 +173,25 @@ def main() -> None:
                             help="auto-traders to include in the match")
     run_parser.set_defaults(func=run)
 
+    load_parser = subparsers.add_parser("load", description=("Measure how many auto-traders the exchange simulator "
+                                                             "can host by running a match with many synthetic "
+                                                             "auto-traders described by the LoadTest section of "
+                                                             "exchange.json."),
+                                        help="load test the exchange simulator")
+    load_parser.add_argument("--duration", default=60.0, type=float,
+                             help="seconds for which to send requests (default 60)")
+    load_parser.add_argument("--mix", help=("relative weights of each kind of request (default '%s')"
+                                            % ",".join("%s=%g" % i for i in DEFAULT_LOAD_TEST_MIX.items())))
+    load_parser.add_argument("--processes", default=4, type=int,
+                             help="number of processes over which to spread the auto-traders (default 4)")
+    load_parser.add_argument("--rate", type=float,
+                             help=("requests per second sent by each auto-trader (default %g%% of the message "
+                                   "frequency limit)" % (DEFAULT_LOAD_TEST_RATE_FRACTION * 100.0)))
+    load_parser.add_argument("--seed", default=0, type=int, help="seed for the random requests (default 0)")
+    load_parser.add_argument("--teams", type=int,
+                             help="number of auto-traders (default: the LoadTest TeamCount)")
+    load_parser.set_defaults(func=load)
+
     replay_parser = subparsers.add_parser("replay", aliases=["re"],
                                           description=("View a replay of a Ready Trader Go match from "
                                                        " a match events file."),
@@ -118,6 +199,8 @@ def main() -> None:
     replay_parser.add_argument("filename", nargs="?", default=pathlib.Path("match_events.csv"),
                                help="name of the match events file to replay (default 'match_events.csv')",
                                type=pathlib.Path)
+    replay_parser.add_argument("--speed", default=1.0, type=float,
+                               help="playback speed multiplier (default 1.0)")
     replay_parser.set_defaults(func=replay)
 
     args = parser.parse_args()